@@ -1,6 +1,13 @@
 import psycopg2
+import psycopg2.extras
 import os
 import json
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, date
 from dotenv import load_dotenv
 
@@ -8,39 +15,307 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# ---- Connection pool config ----
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+# threads running blocking queries for async endpoints; more than DB_POOL_MAX would only queue on the pool
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(DB_POOL_MAX)))
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "").lower() in ("1", "true", "yes")
 
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be acquired within the pool timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe psycopg2 connection pool with a bounded size, an acquire
+    timeout and usage statistics.  Connections are opened lazily up to
+    `max_size`; callers beyond that wait until one is returned.
+    """
+
+    def __init__(self, dsn, min_size=DB_POOL_MIN, max_size=DB_POOL_MAX, timeout=DB_POOL_TIMEOUT):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("DB pool requires 1 <= max_size and min_size <= max_size")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._idle = []
+        self._size = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._stats = {
+            "acquired": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+        for _ in range(min_size):
+            self._idle.append(self._connect())
+            self._size += 1
+
+    def _connect(self):
+        return psycopg2.connect(self.dsn)
+
+    def getconn(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        conn = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection available within {timeout:.1f}s "
+                            f"(max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+            waited = time.monotonic() - start
+            self._stats["acquired"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+        if conn is None:
+            # open the new connection outside the lock
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def putconn(self, conn, discard=False):
+        if not discard and not conn.closed:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or self._closed:
+                self._size -= 1
+                self._stats["discarded"] += 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._cond:
+            acquired = self._stats["acquired"]
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "acquired": acquired,
+                "timeouts": self._stats["timeouts"],
+                "discarded": self._stats["discarded"],
+                "wait_time_total": round(self._stats["wait_time_total"], 6),
+                "wait_time_avg": round(self._stats["wait_time_total"] / acquired, 6) if acquired else 0.0,
+                "wait_time_max": round(self._stats["wait_time_max"], 6),
+            }
+
+
+_pool = None
+_executor = None
+_pool_lock = threading.Lock()
+
+
+def init_pool():
+    """Open the process-wide pool (called from main.py startup)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DATABASE_URL)
+        return _pool
+
+
+def close_pool():
+    """Close the process-wide pool (called from main.py shutdown)."""
+    global _pool, _executor
+    with _pool_lock:
+        pool, _pool = _pool, None
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+    if pool is not None:
+        pool.close()
+
+
+def get_pool():
+    # scripts that never run the FastAPI startup hook still get a pool
+    return _pool or init_pool()
+
+
+def pool_stats():
+    if _pool is None:
+        return {"status": "closed"}
+    stats = {"status": "open", **_pool.stats()}
+    if _executor is not None:
+        stats["executor_workers"] = _executor._max_workers
+        stats["executor_queued"] = _executor._work_queue.qsize()
+    return stats
+
+
+@contextmanager
 def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
+    """
+    Borrow a pooled connection.  Commits on success, rolls back on error
+    and always returns the connection to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            broken = True
+        raise
+    finally:
+        pool.putconn(conn, discard=broken or conn.closed)
 
 
-# ---- DSS helper functions ----
+# ---- Schema migrations ----
 
-def insert_scheme(name: str, description: str, eligibility: dict):
-    """Insert a scheme into DB and return its id."""
-    conn = get_db_connection()
-    cur = conn.cursor()
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+_MIGRATIONS_LOCK_ID = 7_301_001
+
+
+def apply_migrations(migrations_dir: str = MIGRATIONS_DIR):
+    """
+    Apply pending `migrations/NNN_name.sql` files in order, one transaction
+    per file, and record them in `schema_migrations`.  Returns the list of
+    newly applied versions.
+    """
+    files = sorted(f for f in os.listdir(migrations_dir) if f.endswith(".sql"))
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # serialize concurrent runners (several uvicorn workers starting at once)
+            cur.execute("SELECT pg_advisory_lock(%s)", (_MIGRATIONS_LOCK_ID,))
+            try:
+                applied = _apply_pending(conn, cur, migrations_dir, files)
+            finally:
+                conn.rollback()
+                cur.execute("SELECT pg_advisory_unlock(%s)", (_MIGRATIONS_LOCK_ID,))
+    return applied
+
+
+def _apply_pending(conn, cur, migrations_dir, files):
+    applied = []
     cur.execute(
-        "INSERT INTO schemes (name, description, eligibility) VALUES (%s, %s, %s) RETURNING id",
-        (name, description, json.dumps(eligibility)),
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version     TEXT PRIMARY KEY,
+            applied_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
     )
-    scheme_id = cur.fetchone()[0]
     conn.commit()
-    cur.close()
-    conn.close()
+    cur.execute("SELECT version FROM schema_migrations")
+    done = {r[0] for r in cur.fetchall()}
+    for name in files:
+        version = name[:-4]
+        if version in done:
+            continue
+        with open(os.path.join(migrations_dir, name), encoding="utf-8") as fh:
+            cur.execute(fh.read())
+        cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+        conn.commit()
+        applied.append(version)
+    return applied
+
+
+# ---- Async access ----
+
+def get_db_executor():
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+            )
+        return _executor
+
+
+async def run_db(fn, *args, **kwargs):
+    """
+    Run a blocking DB function on the bounded DB executor so async
+    endpoints never block the event loop.  Excess calls queue on the
+    executor instead of piling up on the pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), functools.partial(fn, *args, **kwargs))
+
+
+# ---- DSS helper functions ----
+
+def insert_scheme(name: str, description: str, eligibility: dict):
+    """Insert a scheme into DB and return its id."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO schemes (name, description, eligibility) VALUES (%s, %s, %s) RETURNING id",
+                (name, description, json.dumps(eligibility)),
+            )
+            scheme_id = cur.fetchone()[0]
     return scheme_id
 
 
 def get_scheme_by_name(name: str):
     """Fetch scheme details by name."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT id, name, description, eligibility FROM schemes WHERE name ILIKE %s",
-        (name,),
-    )
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT id, name, description, eligibility FROM schemes WHERE name ILIKE %s",
+                (name,),
+            )
+            row = cur.fetchone()
     if not row:
         return None
     return {"id": row[0], "name": row[1], "description": row[2], "eligibility": row[3]}
@@ -48,12 +323,10 @@ def get_scheme_by_name(name: str):
 
 def fetch_schemes():
     """Return all schemes."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, description, eligibility FROM schemes")
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id, name, description, eligibility FROM schemes")
+            rows = cur.fetchall()
     return [
         {"id": r[0], "name": r[1], "description": r[2], "eligibility": r[3]}
         for r in rows
@@ -69,21 +342,45 @@ def _json_serializer(obj):
 
 def write_dss_log(user_query: str, parsed: dict, scheme_id: int, count: int, sample: list):
     """Store DSS decision log for audit."""
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """
-        INSERT INTO dss_logs (user_query, parsed, scheme_id, result_count, sample)
-        VALUES (%s, %s, %s, %s, %s)
-        """,
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO dss_logs (user_query, parsed, scheme_id, result_count, sample)
+                VALUES (%s, %s, %s, %s, %s)
+                """,
+                (
+                    user_query,
+                    json.dumps(parsed, default=_json_serializer),
+                    scheme_id,
+                    count,
+                    json.dumps(sample, default=_json_serializer),
+                ),
+            )
+
+
+def write_dss_logs(entries: list):
+    """Store many DSS log entries with one multi-row INSERT.
+
+    Each entry is a dict with the write_dss_log keyword arguments.
+    """
+    if not entries:
+        return
+    rows = [
         (
-            user_query,
-            json.dumps(parsed, default=_json_serializer),
-            scheme_id,
-            count,
-            json.dumps(sample, default=_json_serializer),
-        ),
-    )
-    conn.commit()
-    cur.close()
-    conn.close()
+            e["user_query"],
+            json.dumps(e["parsed"], default=_json_serializer),
+            e["scheme_id"],
+            e["count"],
+            json.dumps(e["sample"], default=_json_serializer),
+        )
+        for e in entries
+    ]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(
+                cur,
+                "INSERT INTO dss_logs (user_query, parsed, scheme_id, result_count, sample) VALUES %s",
+                rows,
+                page_size=len(rows),
+            )
@@ -2,10 +2,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 
+from db import init_pool, close_pool, apply_migrations, AUTO_MIGRATE
+from services import scheme_catalog, upload_jobs, inference
+from services.thumbnail_cache import thumbnails
+from utils.audit_log import audit_log
+from utils import subsystems
 from routers.dss_router import router as dss_router
 from routers.upload_router import router as upload_router
 from routers.model_pred import router as model_pred
 from routers.Search_router import router as Search
+from routers.health_router import router as health_router
 
 app = FastAPI()
 
@@ -23,12 +29,41 @@ app.include_router(dss_router)
 app.include_router(upload_router)
 app.include_router(model_pred)
 app.include_router(Search)
+app.include_router(health_router)
+
+
+# ✅ Open the shared DB connection pool once per worker
+@app.on_event("startup")
+async def startup_event():
+    # TensorFlow / Earth Engine / Gemini load lazily; WARMUP preloads them in the background
+    subsystems.start_warmup()
+    try:
+        init_pool()
+        if AUTO_MIGRATE:
+            applied = apply_migrations()
+            if applied:
+                print("✅ Applied migrations:", ", ".join(applied))
+    except Exception as e:
+        # Requests will retry opening the pool on first DB access
+        print("⚠️ Could not open DB pool at startup:", e)
+    scheme_catalog.start_listener()
+    audit_log.start()
+    upload_jobs.start()
+    await upload_jobs.start_heartbeat()
+    await upload_jobs.resume_stale_jobs()
+
 
 # ✅ Graceful shutdown handler (prevents noisy CancelledError logs)
 @app.on_event("shutdown")
 async def shutdown_event():
     try:
-        # Example: close DB connections, flush cache, etc.
+        scheme_catalog.stop_listener()
+        await upload_jobs.stop()
+        inference.batcher.stop()
+        thumbnails.flush()
+        # flush queued audit events while the pool is still open
+        audit_log.stop()
+        close_pool()
         await asyncio.sleep(0)
     except asyncio.CancelledError:
         # Suppress cancellation errors during shutdown
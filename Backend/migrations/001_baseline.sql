@@ -0,0 +1,42 @@
+-- Baseline schema as used by the API.  Every statement is idempotent so it
+-- is safe to run against databases created before migrations existed.
+
+CREATE TABLE IF NOT EXISTS fra_documents (
+    id                      SERIAL PRIMARY KEY,
+    patta_holder_name       TEXT,
+    father_or_husband_name  TEXT,
+    age                     TEXT,
+    gender                  TEXT,
+    address                 TEXT,
+    village_name            TEXT,
+    block                   TEXT,
+    district                TEXT,
+    state                   TEXT,
+    total_area_claimed      TEXT,
+    coordinates             TEXT,
+    land_use                TEXT,
+    claim_id                TEXT,
+    date_of_application     TEXT,
+    water_bodies            TEXT,
+    forest_cover            TEXT,
+    homestead               TEXT,
+    status                  TEXT DEFAULT 'pending',
+    created_at              TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS schemes (
+    id           SERIAL PRIMARY KEY,
+    name         TEXT NOT NULL,
+    description  TEXT,
+    eligibility  JSONB NOT NULL DEFAULT '{}'::jsonb
+);
+
+CREATE TABLE IF NOT EXISTS dss_logs (
+    id            SERIAL PRIMARY KEY,
+    user_query    TEXT,
+    parsed        JSONB,
+    scheme_id     INTEGER,
+    result_count  INTEGER,
+    sample        JSONB,
+    created_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,18 @@
+-- Trigram index for /search.  The indexed expression must stay identical to
+-- SEARCH_DOC_SQL in routers/Search_router.py, otherwise the planner falls
+-- back to a sequential scan.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS fra_documents_search_trgm_idx
+    ON fra_documents
+    USING gin ((lower(
+        coalesce(patta_holder_name, '') || ' ' ||
+        coalesce(village_name, '') || ' ' ||
+        coalesce(district, '') || ' ' ||
+        coalesce(state, '') || ' ' ||
+        coalesce(claim_id, '')
+    )) gin_trgm_ops);
+
+-- exact claim ID lookups (search fast path)
+CREATE INDEX IF NOT EXISTS fra_documents_claim_id_idx ON fra_documents (claim_id);
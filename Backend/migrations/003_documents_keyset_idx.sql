@@ -0,0 +1,3 @@
+-- Keyset pagination for /upload/all: (created_at, id) DESC
+CREATE INDEX IF NOT EXISTS fra_documents_created_at_id_idx
+    ON fra_documents (created_at DESC, id DESC);
@@ -0,0 +1,24 @@
+-- Typed, normalized claim attributes parsed once at ingest
+-- (utils/claim_fields.py).  Existing rows are filled by
+-- scripts/backfill_typed_columns.py; typed_version records the parser
+-- version that produced them.
+
+DO $$
+BEGIN
+    CREATE TYPE claim_gender AS ENUM ('male', 'female', 'other');
+EXCEPTION
+    WHEN duplicate_object THEN NULL;
+END
+$$;
+
+ALTER TABLE fra_documents
+    ADD COLUMN IF NOT EXISTS age_years      INTEGER,
+    ADD COLUMN IF NOT EXISTS area_acres     NUMERIC(14, 4),
+    ADD COLUMN IF NOT EXISTS gender_code    claim_gender,
+    ADD COLUMN IF NOT EXISTS lat            DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS lon            DOUBLE PRECISION,
+    ADD COLUMN IF NOT EXISTS typed_version  SMALLINT;
+
+-- lets the backfill job find unparsed rows without scanning the table
+CREATE INDEX IF NOT EXISTS fra_documents_untyped_idx
+    ON fra_documents (id) WHERE typed_version IS NULL;
@@ -0,0 +1,14 @@
+-- Tell every API worker to drop its in-memory scheme catalog
+-- (services/scheme_catalog.py) whenever the schemes table changes.
+
+CREATE OR REPLACE FUNCTION notify_scheme_catalog_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('scheme_catalog_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS schemes_catalog_notify ON schemes;
+CREATE TRIGGER schemes_catalog_notify
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON schemes
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_scheme_catalog_changed();
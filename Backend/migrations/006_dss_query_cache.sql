@@ -0,0 +1,9 @@
+-- Persistent tier of the DSS query-parse cache (utils/query_cache.py),
+-- shared by all workers and surviving restarts.
+CREATE TABLE IF NOT EXISTS dss_query_cache (
+    query_key   TEXT PRIMARY KEY,
+    parsed      JSONB NOT NULL,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS dss_query_cache_created_at_idx ON dss_query_cache (created_at);
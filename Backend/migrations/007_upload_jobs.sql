@@ -0,0 +1,20 @@
+-- Background upload pipeline jobs (services/upload_jobs.py).
+-- `stages` holds per-stage status and timings, e.g.
+--   {"ocr": {"status": "done", "duration_ms": 812.4}, "extract": {"status": "running"}}
+CREATE TABLE IF NOT EXISTS upload_jobs (
+    id          UUID PRIMARY KEY,
+    filename    TEXT,
+    file_path   TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'queued',   -- queued | running | succeeded | failed
+    stage       TEXT,
+    stages      JSONB NOT NULL DEFAULT '{}'::jsonb,
+    doc_id      INTEGER,
+    result      JSONB,
+    error       TEXT,
+    owner       TEXT,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS upload_jobs_pending_idx
+    ON upload_jobs (updated_at) WHERE status IN ('queued', 'running');
@@ -0,0 +1,10 @@
+-- Persistent Nominatim cache (services/geocoding.py), keyed on the
+-- normalized address.  found = false records a miss so it is not retried
+-- until GEOCODE_NEGATIVE_TTL expires.
+CREATE TABLE IF NOT EXISTS geocode_cache (
+    address_key  TEXT PRIMARY KEY,
+    lat          DOUBLE PRECISION,
+    lon          DOUBLE PRECISION,
+    found        BOOLEAN NOT NULL,
+    created_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,8 @@
+-- Upload deduplication (services/document_dedup.py): exact content hash,
+-- plus an optional 64-bit perceptual hash for near-duplicate scans.
+ALTER TABLE fra_documents
+    ADD COLUMN IF NOT EXISTS content_sha256  TEXT,
+    ADD COLUMN IF NOT EXISTS phash           BIGINT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS fra_documents_content_sha256_key
+    ON fra_documents (content_sha256) WHERE content_sha256 IS NOT NULL;
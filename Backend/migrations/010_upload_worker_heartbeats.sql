@@ -0,0 +1,7 @@
+-- Liveness of the API workers that own upload_jobs rows (services/upload_jobs.py).
+-- A queued/running job is only reclaimed once its owner stops heartbeating,
+-- so jobs waiting behind a long batch on a live worker are never stolen.
+CREATE TABLE IF NOT EXISTS upload_workers (
+    worker_id     TEXT PRIMARY KEY,
+    heartbeat_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
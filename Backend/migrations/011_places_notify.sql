@@ -0,0 +1,17 @@
+-- Tell every API worker that village / district / state names in
+-- fra_documents may have changed, so its DSS gazetteer (utils/gazetteer.py)
+-- schedules a rebuild.  Statement-level: one notification per INSERT
+-- statement however many rows it writes, and identical notifications in a
+-- transaction are folded into one.
+
+CREATE OR REPLACE FUNCTION notify_fra_places_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('fra_places_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS fra_documents_places_notify ON fra_documents;
+CREATE TRIGGER fra_documents_places_notify
+    AFTER INSERT OR DELETE OR TRUNCATE OR UPDATE OF village_name, district, state ON fra_documents
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_fra_places_changed();
@@ -0,0 +1,9 @@
+-- The backfill (scripts/backfill_typed_columns.py) selects
+--   typed_version IS NULL OR typed_version < PARSER_VERSION
+-- which the 004 index (typed_version IS NULL only) cannot serve, so every
+-- chunk after a parser bump was a sequential scan.  Index exactly the rows
+-- the current parser (PARSER_VERSION = 2) still has to visit; re-create this
+-- index in a new migration whenever PARSER_VERSION is bumped.
+DROP INDEX IF EXISTS fra_documents_untyped_idx;
+CREATE INDEX IF NOT EXISTS fra_documents_untyped_v2_idx
+    ON fra_documents (id) WHERE typed_version IS NULL OR typed_version < 2;
@@ -0,0 +1,10 @@
+-- Keyset pagination (/upload/all, migration 003) orders by (created_at, id)
+-- and encodes created_at into the cursor.  Databases that predate the
+-- baseline can hold rows without it, which broke the cursor.  Such rows
+-- get the epoch (they sort last, as the oldest) and the column is made
+-- NOT NULL DEFAULT now(), as 001 declares for new databases.
+UPDATE fra_documents SET created_at = 'epoch' WHERE created_at IS NULL;
+
+ALTER TABLE fra_documents
+    ALTER COLUMN created_at SET DEFAULT now(),
+    ALTER COLUMN created_at SET NOT NULL;
@@ -0,0 +1,6 @@
+-- PARSER_VERSION = 3 (thousands separators in areas, out-of-range
+-- coordinates rejected): re-create the backfill's partial index so it covers
+-- the v2 rows the backfill now has to re-parse.  See 012_untyped_idx_v2.sql.
+DROP INDEX IF EXISTS fra_documents_untyped_v2_idx;
+CREATE INDEX IF NOT EXISTS fra_documents_untyped_v3_idx
+    ON fra_documents (id) WHERE typed_version IS NULL OR typed_version < 3;
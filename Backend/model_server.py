@@ -0,0 +1,138 @@
+"""
+Shared model server: one process per host owns the land-use classifier.
+
+API workers started with MODEL_SERVER_ADDRESS send image tensors through
+shared memory (services/model_client.py) instead of loading TensorFlow
+themselves, so the model is loaded and warmed exactly once however many
+uvicorn workers run.  Requests from every worker feed one MicroBatcher.
+
+    cd Backend
+    export MODEL_SERVER_AUTHKEY=$(python -c "import secrets; print(secrets.token_hex(32))")
+    INFERENCE_BACKEND=tflite python model_server.py --address /tmp/fra-model.sock
+    MODEL_SERVER_ADDRESS=/tmp/fra-model.sock uvicorn main:app --workers 4
+
+Connections unpickle their messages, so the server refuses to start
+without MODEL_SERVER_AUTHKEY and its socket is only accessible to the
+user running it (mode 0600).
+"""
+import argparse
+import os
+import signal
+import threading
+import time
+from multiprocessing.connection import Listener
+
+import numpy as np
+
+from services.inference import INFERENCE_BACKEND, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS
+from services.inference_backends import create_backend
+from services.model_client import MODEL_SERVER_ADDRESS, ModelServerError, attach_segment, require_authkey
+from utils.micro_batcher import MicroBatcher
+
+STARTED_AT = time.time()
+
+
+def _read_segment(segment, shape) -> np.ndarray:
+    """
+    Copy the batch out of `segment`.  No view on its buffer outlives this
+    call (not in the batcher queue, nor in a traceback after a failed
+    predict), so the segment can always be closed when the client replaces it.
+    """
+    view = np.ndarray(shape, dtype=np.float32, buffer=segment.buf)
+    try:
+        return view.copy()
+    finally:
+        del view
+
+
+def handle(conn, batcher: MicroBatcher, backend):
+    """Serve one client connection until it closes."""
+    segment = None  # the client's current segment; it only ever replaces it with a larger one
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            op = message[0]
+            try:
+                if op == "predict":
+                    _, name, shape = message
+                    if segment is None or segment.name != name:
+                        if segment is not None:
+                            segment.close()  # superseded by a larger one
+                            segment = None
+                        segment = attach_segment(name)
+                    futures = [batcher.submit(img) for img in _read_segment(segment, shape)]
+                    reply = np.stack([f.result() for f in futures])
+                elif op == "ping":
+                    reply = {
+                        "pid": os.getpid(),
+                        "backend": backend.info(),
+                        "uptime_s": round(time.time() - STARTED_AT, 1),
+                        "batcher": batcher.stats(),
+                    }
+                else:
+                    raise ValueError(f"unknown op {op!r}")
+            except Exception as e:
+                conn.send(("error", str(e)))
+            else:
+                conn.send(("ok", reply))
+    finally:
+        if segment is not None:
+            segment.close()
+        conn.close()
+
+
+def serve(address: str):
+    authkey = require_authkey()
+    backend = create_backend(INFERENCE_BACKEND)  # loads and warms up
+    print(f"✅ Classifier loaded ({backend.name}: {backend.path})")
+    batcher = MicroBatcher(backend.predict, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS, name="model-server")
+
+    if os.path.exists(address):
+        os.unlink(address)  # stale socket from a previous run
+    old_umask = os.umask(0o177)  # socket file is created 0600
+    try:
+        listener = Listener(address, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(old_umask)
+    os.chmod(address, 0o600)
+    print(f"Model server listening on {address} (pid {os.getpid()})")
+
+    def _shutdown(*_):
+        listener.close()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, EOFError):
+                break  # listener closed
+            except Exception as e:
+                # failed handshake (bad authkey); keep serving others
+                print("⚠️ Rejected model server connection:", e)
+                continue
+            threading.Thread(target=handle, args=(conn, batcher, backend), daemon=True).start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.close()
+        batcher.stop()
+        if os.path.exists(address):
+            os.unlink(address)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--address", default=MODEL_SERVER_ADDRESS or "/tmp/fra-model.sock")
+    args = parser.parse_args()
+    try:
+        serve(args.address)
+    except ModelServerError as e:
+        raise SystemExit(f"⚠️ {e}")
+
+
+if __name__ == "__main__":
+    main()
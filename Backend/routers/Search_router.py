@@ -1,74 +1,124 @@
 from fastapi import APIRouter, Query
 from typing import Optional
-import psycopg2
 import os
-from dotenv import load_dotenv
-from routers.dss_helpers import write_dss_log  # ✅ FIXED
-
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
+from db import get_db_connection, run_db
+from utils.audit_log import audit_log
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
+# word_similarity() cut-off for fuzzy matches (pg_trgm default is 0.6);
+# lower values tolerate more OCR misspellings
+SEARCH_SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", "0.4"))
 
-def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
+# Must match the expression indexed in migrations/002_search_trgm.sql
+SEARCH_DOC_SQL = """lower(
+        coalesce(patta_holder_name, '') || ' ' ||
+        coalesce(village_name, '') || ' ' ||
+        coalesce(district, '') || ' ' ||
+        coalesce(state, '') || ' ' ||
+        coalesce(claim_id, '')
+    )"""
 
 
-@router.get("/")
-async def search_claims(
-    q: Optional[str] = Query(None, description="General search query"),
-    status: Optional[str] = Query(None, description="Filter by claim status"),
-    state: Optional[str] = Query(None, description="Filter by state"),
-    district: Optional[str] = Query(None, description="Filter by district"),
-):
-    conn = get_db_connection()
-    cur = conn.cursor()
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
-    base_query = "SELECT * FROM fra_documents WHERE 1=1"
-    params = []
 
-    if q:
-        base_query += """ AND (
-            patta_holder_name ILIKE %s OR
-            village_name ILIKE %s OR
-            district ILIKE %s OR
-            state ILIKE %s OR
-            claim_id ILIKE %s
-        )"""
-        like_q = f"%{q}%"
-        params += [like_q] * 5
+def build_filters(status=None, state=None, district=None):
+    """Extra AND-ed filters shared by every search path."""
+    clauses = ""
+    params = []
 
     if status:
-        base_query += " AND status ILIKE %s"
+        clauses += " AND status ILIKE %s"
         params.append(f"%{status}%")
 
     if state:
-        base_query += " AND state ILIKE %s"
+        clauses += " AND state ILIKE %s"
         params.append(f"%{state}%")
 
     if district:
-        base_query += " AND district ILIKE %s"
+        clauses += " AND district ILIKE %s"
         params.append(f"%{district}%")
 
-    cur.execute(base_query, params)
-    rows = cur.fetchall()
-    columns = [desc[0] for desc in cur.description]
+    return clauses, params
 
-    results = [dict(zip(columns, row)) for row in rows]
 
-    # log DSS usage
-    try:
-        write_dss_log(
-            user_query=q or "",
-            parsed={"status": status, "state": state, "district": district},
-            scheme_id=None,
-            count=len(results),
-            sample=results[:3],
+def build_search_query(q=None, status=None, state=None, district=None, limit=50):
+    """
+    Ranked trigram search.  Rows match when the query is a substring of, or
+    word-similar to, the indexed search document; both operators are served
+    by the GIN trigram index.
+    """
+    filters, filter_params = build_filters(status, state, district)
+
+    if not q:
+        query = (
+            "SELECT * FROM fra_documents WHERE 1=1" + filters +
+            " ORDER BY created_at DESC LIMIT %s"
         )
-    except Exception as e:
-        print("⚠️ DSS log failed:", e)
+        return query, filter_params + [limit]
+
+    q_norm = q.strip().lower()
+    query = f"""
+        SELECT *, word_similarity(%s, {SEARCH_DOC_SQL}) AS score
+        FROM fra_documents
+        WHERE (%s <%% {SEARCH_DOC_SQL} OR {SEARCH_DOC_SQL} LIKE %s)
+        {filters}
+        ORDER BY score DESC, created_at DESC
+        LIMIT %s
+    """
+    params = [q_norm, q_norm, f"%{_escape_like(q_norm)}%"] + filter_params + [limit]
+    return query, params
+
+
+def run_search(q=None, status=None, state=None, district=None, limit=50):
+    """Returns (results, match_type)."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # Fast path: an exact claim ID hits the B-tree index directly
+            if q and " " not in q.strip():
+                filters, filter_params = build_filters(status, state, district)
+                cur.execute(
+                    "SELECT *, 1.0::real AS score FROM fra_documents WHERE claim_id = %s"
+                    + filters + " ORDER BY created_at DESC LIMIT %s",
+                    [q.strip()] + filter_params + [limit],
+                )
+                rows = cur.fetchall()
+                if rows:
+                    columns = [desc[0] for desc in cur.description]
+                    return [dict(zip(columns, row)) for row in rows], "claim_id"
+
+            query, params = build_search_query(q, status, state, district, limit)
+            if q:
+                cur.execute(
+                    "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                    (str(SEARCH_SIMILARITY_THRESHOLD),),
+                )
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            columns = [desc[0] for desc in cur.description]
+
+    return [dict(zip(columns, row)) for row in rows], ("fuzzy" if q else "filter")
+
+
+@router.get("/")
+async def search_claims(
+    q: Optional[str] = Query(None, description="General search query"),
+    status: Optional[str] = Query(None, description="Filter by claim status"),
+    state: Optional[str] = Query(None, description="Filter by state"),
+    district: Optional[str] = Query(None, description="Filter by district"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of results"),
+):
+    results, match = await run_db(run_search, q, status, state, district, limit)
+
+    # log DSS usage (queued; written in batches off the request path)
+    audit_log.enqueue(
+        user_query=q or "",
+        parsed={"status": status, "state": state, "district": district},
+        scheme_id=None,
+        count=len(results),
+        sample=results[:3],
+    )
 
-    cur.close()
-    conn.close()
-    return {"count": len(results), "results": results}
+    return {"count": len(results), "match": match, "results": results}
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
-from db import insert_scheme, get_scheme_by_name, fetch_schemes, write_dss_log
-from services.scheme_service import find_eligible_people_by_scheme
-from utils.llm_utils import parse_dss_query  # your LLM query parser
+from db import insert_scheme
+from utils.audit_log import audit_log
+from services import scheme_catalog
+from services.scheme_service import count_and_sample_eligible
+from services.eligibility_matrix import eligibility_matrix
+from utils.llm_utils import parse_dss_query_with_source  # gazetteer → cache → LLM
 
 router = APIRouter(prefix="/dss", tags=["dss"])
 
@@ -14,17 +17,45 @@ def create_scheme(payload: dict):
         raise HTTPException(status_code=400, detail="name and eligibility required")
 
     scheme_id = insert_scheme(name, payload.get("description", ""), eligibility)
+    # write-through: other workers are invalidated by the schemes NOTIFY trigger
+    scheme_catalog.invalidate()
     return {"id": scheme_id, "name": name}
 
 
 @router.get("/schemes")
 def list_schemes():
-    return fetch_schemes()
+    return scheme_catalog.list_schemes()
+
+
+@router.get("/eligibility-matrix")
+def dss_eligibility_matrix(
+    village: str = Query(None),
+    district: str = Query(None),
+    state: str = Query(None),
+    include_claims: bool = Query(False, description="Also list matching scheme IDs per claim"),
+):
+    """Per-scheme eligible counts for a region, every scheme evaluated in one pass."""
+    try:
+        matrix = eligibility_matrix(
+            scheme_catalog.list_schemes(), village=village, district=district, state=state,
+            include_claims=include_claims,
+        )
+    except Exception as e:
+        return {"status": "error", "message": f"Database error: {str(e)}"}
+
+    return {
+        "status": "ok",
+        "filters": {"village": village, "district": district, "state": state},
+        **matrix,
+    }
 
 
 @router.get("/check")
-def dss_check(q: str = Query(..., description="Natural language query")):
-    parsed = parse_dss_query(q)
+def dss_check(
+    q: str = Query(..., description="Natural language query"),
+    nocache: bool = Query(False, description="Bypass the gazetteer and parse cache and re-ask the LLM"),
+):
+    parsed, parse_path = parse_dss_query_with_source(q, use_cache=not nocache)
 
     scheme_name = parsed.get("scheme")
     village = parsed.get("village")
@@ -32,23 +63,33 @@ def dss_check(q: str = Query(..., description="Natural language query")):
     state = parsed.get("state")
 
     if not scheme_name:
-        return {"status": "error", "message": "Could not extract scheme name from query"}
+        return {"status": "error", "message": "Could not extract scheme name from query",
+                "parse_path": parse_path}
 
-    scheme = get_scheme_by_name(scheme_name)
+    scheme = scheme_catalog.get_scheme(scheme_name)
     if not scheme:
         return {"status": "error", "message": f"Scheme '{scheme_name}' not found"}
 
     try:
-        results = find_eligible_people_by_scheme(
-            scheme, village=village, district=district, state=state
+        count, sample = count_and_sample_eligible(
+            scheme, village=village, district=district, state=state, sample_size=5
         )
     except Exception as e:
         return {"status": "error", "message": f"Database error: {str(e)}"}
 
+    audit_log.enqueue(
+        user_query=q,
+        parsed={**parsed, "parse_path": parse_path},
+        scheme_id=scheme["id"],
+        count=count,
+        sample=sample[:3],
+    )
+
     return {
         "status": "ok",
         "scheme": scheme_name,
         "filters": parsed,
-        "count": len(results),
-        "results": results[:5]  # sample
+        "parse_path": parse_path,
+        "count": count,
+        "results": sample  # sample
     }
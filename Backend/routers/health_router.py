@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Response
+import asyncio
+import os
+import time
+from db import pool_stats, run_db, get_db_connection
+from utils import subsystems
+from services.scheme_catalog import catalog_stats
+from utils.query_cache import dss_query_cache
+from utils.gazetteer import gazetteer
+from utils.llm_utils import PARSE_PATH_COUNTS, EXTRACTION_PATH_COUNTS, llm_stats
+from utils.audit_log import audit_log
+from services import upload_jobs
+from services.geocoding import geocoder
+from services import document_dedup, inference
+from services.thumbnail_cache import thumbnails
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+STARTED_AT = time.time()
+READY_DB_TIMEOUT_S = float(os.getenv("READY_DB_TIMEOUT_S", "2"))
+
+
+def _ping_db():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+
+
+@router.get("/live")
+def liveness():
+    """The process is up and serving requests (never touches dependencies)."""
+    return {"status": "alive", "pid": os.getpid(), "uptime_s": round(time.time() - STARTED_AT, 1)}
+
+
+@router.get("/ready")
+async def readiness(response: Response):
+    """
+    200 once the database answers and every WARMUP subsystem has loaded,
+    503 otherwise.  Lists the state of every lazily initialized subsystem.
+    """
+    try:
+        await asyncio.wait_for(run_db(_ping_db), READY_DB_TIMEOUT_S)
+        db = {"status": "ok"}
+    except Exception as e:
+        db = {"status": "unavailable", "error": str(e) or type(e).__name__}
+    ready = db["status"] == "ok" and subsystems.ready()
+    response.status_code = 200 if ready else 503
+    return {
+        "status": "ready" if ready else "not_ready",
+        "db": db,
+        "warmup": subsystems.warmup_names(),
+        "subsystems": subsystems.states(),
+    }
+
+
+@router.get("/db")
+def db_health():
+    """Connection pool statistics (in use, waiting, wait time)."""
+    return pool_stats()
+
+
+@router.get("/audit")
+def audit_health():
+    """Audit-log writer queue depth, batch and drop counters."""
+    return audit_log.stats()
+
+
+@router.get("/uploads")
+def upload_health():
+    """In-flight upload jobs and per-stage pool sizes in this worker."""
+    return upload_jobs.stats()
+
+
+@router.get("/inference")
+def inference_health():
+    """Classifier load state and micro-batching statistics."""
+    return inference.stats()
+
+
+@router.get("/llm")
+def llm_health():
+    """Gemini client breaker state, outcomes and latency histograms."""
+    return llm_stats()
+
+
+@router.get("/caches")
+def cache_health():
+    """Hit/miss and size statistics for the in-process caches."""
+    return {
+        "scheme_catalog": catalog_stats(),
+        "dss_query_cache": dss_query_cache.stats(),
+        "gazetteer": gazetteer.stats(),
+        "dss_parse_paths": dict(PARSE_PATH_COUNTS),
+        "extraction_paths": dict(EXTRACTION_PATH_COUNTS),
+        "geocoding": geocoder.stats(),
+        "extraction_cache": document_dedup.stats(),
+        "thumbnails": thumbnails.stats(),
+    }
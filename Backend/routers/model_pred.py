@@ -1,49 +1,53 @@
 from fastapi import FastAPI, HTTPException, APIRouter
-from pydantic import BaseModel
-import ee
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
 import requests
 from PIL import Image
 import numpy as np
+import asyncio
 import io
+import json
 import os
 import math
-import tensorflow as tf
-from shapely.geometry import Polygon, Point
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from db import get_db_connection, run_db
+from utils.claim_fields import parse_coordinates, parse_area_acres, M2_PER_ACRE
+from utils import subsystems
+from services import inference
+from services.thumbnail_cache import thumbnails, thumbnail_key
 
 router = APIRouter(prefix="/model", tags=["model"])
 
 # ------------------ CONFIG ------------------
-MODEL_PATH = "model.keras"            # <- replace with your trained model file path
 IMG_SIZE = 64                        # model input size (width & height)
-SAVED_IMAGES_DIR = "saved_images"
 EE_START_DATE = "2023-01-01"
 EE_END_DATE = "2023-12-31"
 THUMB_DIM = 512                       # thumbnail pixel dimension
+# "earth_engine", or "http" to fetch from THUMBNAIL_URL_TEMPLATE instead
+# (a tile service or the local stand-in, scripts/fake_imagery_server.py)
+THUMBNAIL_SOURCE = os.getenv("THUMBNAIL_SOURCE", "earth_engine")
+THUMBNAIL_URL_TEMPLATE = os.getenv(
+    "THUMBNAIL_URL_TEMPLATE",
+    "http://127.0.0.1:8091/thumb?bbox={west},{south},{east},{north}&dim={dim}&start={start}&end={end}",
+)
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "16"))  # thumbnails in flight, all batches
+BATCH_PREDICT_MAX_CLAIMS = int(os.getenv("BATCH_PREDICT_MAX_CLAIMS", "5000"))
 # --------------------------------------------
 
-os.makedirs(SAVED_IMAGES_DIR, exist_ok=True)
 
-# Initialize Earth Engine (assumes ee.Authenticate() was already run interactively)
-try:
+# Earth Engine is initialized on first use (or WARMUP), not at import;
+# the classifier lives in services/inference.py
+def _init_earth_engine():
+    import ee
+
+    # assumes ee.Authenticate() was already run interactively
     ee.Initialize()
-except Exception as e:
-    # If EE not initialized, the endpoint will fail later with an explicit message
-    print("Warning: Earth Engine not initialized. Ensure ee.Authenticate() was run earlier.", e)
-
-# Load TensorFlow model
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "..", "best_model.h5")
-model = None
-
-if not os.path.exists(MODEL_PATH):
-    print(f"⚠️ Warning: Model file {MODEL_PATH} not found. Place your Keras model there.")
-else:
-    try:
-        model = tf.keras.models.load_model(MODEL_PATH)
-        print(f"✅ Model loaded from {MODEL_PATH}")
-    except Exception as ex:
-        print(f"⚠️ Warning: could not load model: {ex}")
+    return ee
+
+
+earth_engine = subsystems.register("earth_engine", _init_earth_engine, "Google Earth Engine client")
 
 # Example mapping: change according to your model's classes
 CLASS_NAMES = [
@@ -53,6 +57,10 @@ CLASS_NAMES = [
 ]  # update to match your model output classes
 
 
+class ThumbnailError(RuntimeError):
+    """Fetching the thumbnail failed; the message says at which step."""
+
+
 class Claim(BaseModel):
     id: int
     patta_holder_name: str
@@ -69,58 +77,34 @@ class Claim(BaseModel):
     land_use: Optional[str] = None
     claim_id: Optional[str] = None
     date_of_application: Optional[str] = None
+    # typed columns (see utils/claim_fields.py); used instead of re-parsing when present
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    area_acres: Optional[float] = None
+
+
+class BatchPredictRequest(BaseModel):
+    """Either explicit `claims`, or a region filter over fra_documents."""
+    claims: Optional[List[Claim]] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    block: Optional[str] = None
+    village_name: Optional[str] = None
+    limit: int = Field(BATCH_PREDICT_MAX_CLAIMS, ge=1, le=BATCH_PREDICT_MAX_CLAIMS)
 
 # ---------------- Utility functions ----------------
 def parse_coordinate(coord_str: str):
     """Parse 'lat, lon' or 'lon, lat' string into floats and detect order.
        Returns (lat, lon)."""
-    try:
-        parts = [p.strip() for p in coord_str.replace(',', ' ').split()]
-        if len(parts) < 2:
-            raise ValueError("coordinate string must have two numeric values")
-        a, b = float(parts[0]), float(parts[1])
-        # Heuristic: lat in [-90, 90], lon in [-180, 180]; if first value outside [-90,90], treat as lon,lat
-        if -90 <= a <= 90 and -180 <= b <= 180:
-            # assume a is lat, b is lon
-            lat, lon = a, b
-        elif -90 <= b <= 90 and -180 <= a <= 180:
-            # swapped
-            lat, lon = b, a
-        else:
-            # fallback: assume first is lat
-            lat, lon = a, b
-        return lat, lon
-    except Exception as e:
-        raise ValueError(f"Could not parse coordinates: {e}")
+    coords = parse_coordinates(coord_str)
+    if coords is None:
+        raise ValueError("Could not parse coordinates: coordinate string must have two numeric values")
+    return coords
 
 def parse_area_to_m2(area_str: str):
     """Parse area strings like '1.00 acres', '0.5 ha', '4000 m2' into square meters."""
-    if not area_str:
-        return None
-    s = area_str.strip().lower()
-    try:
-        # detect numeric and unit
-        # examples: "1.00 acres", "1 acres", "0.5 ha", "1.2 hectare", "4000 m2"
-        tokens = s.split()
-        num = float(tokens[0])
-        unit = tokens[1] if len(tokens) > 1 else "acres"
-    except Exception:
-        # try to strip trailing unit characters
-        import re
-        m = re.match(r"([\d\.]+)", s)
-        if not m:
-            return None
-        num = float(m.group(1))
-        unit = s[m.end():].strip() or "acres"
-
-    if unit.startswith("acre"):
-        return num * 4046.8564224
-    if unit.startswith("ha") or "hect" in unit:
-        return num * 10000.0
-    if unit.startswith("m") or "sq" in unit:
-        return num  # assume already m2
-    # fallback assume acres
-    return num * 4046.8564224
+    acres = parse_area_acres(area_str) if area_str else None
+    return None if acres is None else acres * M2_PER_ACRE
 
 def make_square_polygon(lat, lon, area_m2):
     """Create a simple axis-aligned square polygon (lon,lat order) around (lat,lon) with given area in m2."""
@@ -143,10 +127,11 @@ def make_square_polygon(lat, lon, area_m2):
 
 def ee_polygon_from_coords(coords_list):
     """Convert list of (lon,lat,...,lon,lat) to ee.Geometry.Polygon form."""
-    return ee.Geometry.Polygon([coords_list])
+    return earth_engine.get().Geometry.Polygon([coords_list])
 
 def fetch_satellite_thumbnail(aoi_coords, start_date=EE_START_DATE, end_date=EE_END_DATE, dim=THUMB_DIM):
     """Return a thumbnail URL (PNG) for the AOI. aoi_coords is a list of [ (lon,lat), ... ] with last repeated."""
+    ee = earth_engine.get()
     aoi = ee_polygon_from_coords(aoi_coords)
     coll = ee.ImageCollection('COPERNICUS/S2')\
             .filterBounds(aoi)\
@@ -159,10 +144,24 @@ def fetch_satellite_thumbnail(aoi_coords, start_date=EE_START_DATE, end_date=EE_
     url = coll.getThumbURL({'region': aoi, 'dimensions': dim, 'format': 'png', **vis})
     return url
 
-def download_image_from_url(url):
+def thumbnail_url(aoi_coords):
+    """Thumbnail URL for the AOI from the configured THUMBNAIL_SOURCE."""
+    if THUMBNAIL_SOURCE == "http":
+        lons = [p[0] for p in aoi_coords]
+        lats = [p[1] for p in aoi_coords]
+        return THUMBNAIL_URL_TEMPLATE.format(
+            west=min(lons), south=min(lats), east=max(lons), north=max(lats),
+            dim=THUMB_DIM, start=EE_START_DATE, end=EE_END_DATE,
+        )
+    return fetch_satellite_thumbnail(aoi_coords)
+
+def download_thumbnail_bytes(url):
     r = requests.get(url, timeout=60)
     r.raise_for_status()
-    return Image.open(io.BytesIO(r.content)).convert("RGB")
+    return r.content
+
+def download_image_from_url(url):
+    return decode_thumbnail(download_thumbnail_bytes(url))
 
 def preprocess_for_model(pil_img, size=IMG_SIZE):
     img = pil_img.resize((size, size))
@@ -171,42 +170,78 @@ def preprocess_for_model(pil_img, size=IMG_SIZE):
     return np.expand_dims(arr, axis=0)
 
 def predict_with_model(img_array):
-    if model is None:
-        raise RuntimeError("Model not loaded on server. Place your Keras model at MODEL_PATH.")
-    preds = model.predict(img_array)
-    prob = float(np.max(preds))
-    cls_idx = int(np.argmax(preds))
+    """Classify one preprocessed image; concurrent calls share a batched forward pass."""
+    try:
+        preds = inference.predict_probs(img_array)
+    except subsystems.SubsystemUnavailable as e:
+        raise RuntimeError(f"Model not loaded on server ({e}).")
+    return format_prediction(preds)
+
+def format_prediction(probs):
+    prob = float(np.max(probs))
+    cls_idx = int(np.argmax(probs))
     cls_name = CLASS_NAMES[cls_idx] if cls_idx < len(CLASS_NAMES) else str(cls_idx)
     return {"class": cls_name, "class_index": cls_idx, "confidence": prob}
 
-# ---------------- API ENDPOINT ----------------
-@router.post("/predict")
-def predict(claim: Claim):
-    # 1) parse coordinate
-    try:
+def claim_polygon(claim: Claim):
+    """(lat, lon, square polygon in lon,lat order) for a claim; ValueError on bad coordinates."""
+    # typed lat/lon / area_acres are used when supplied, skipping the text parse
+    if claim.lat is not None and claim.lon is not None:
+        lat, lon = claim.lat, claim.lon
+    else:
         lat, lon = parse_coordinate(claim.coordinates)
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid coordinate: {e}")
+    if claim.area_acres is not None:
+        area_m2 = claim.area_acres * M2_PER_ACRE
+    else:
+        area_m2 = parse_area_to_m2(claim.total_area_claimed or "")
+    return lat, lon, make_square_polygon(lat, lon, area_m2)
+
+def decode_thumbnail(data: bytes):
+    """Verified RGB image from thumbnail bytes; raises on HTML error pages or truncated files."""
+    with Image.open(io.BytesIO(data)) as img:
+        img.verify()
+    return Image.open(io.BytesIO(data)).convert("RGB")
 
-    # 2) parse area
-    area_m2 = parse_area_to_m2(claim.total_area_claimed or "")
-    # 3) create polygon coordinates (lon,lat order)
-    square_coords = make_square_polygon(lat, lon, area_m2)
-    # 4) get thumbnail URL from Earth Engine
+def load_thumbnail(square_coords):
+    """
+    (RGB image, thumbnail url, cache key) for the AOI.  The url is None on a
+    cache hit: neither Earth Engine nor the network is touched.  Only
+    images that decode are cached.
+    """
+    key = thumbnail_key(square_coords, EE_START_DATE, EE_END_DATE, THUMB_DIM, THUMBNAIL_SOURCE)
+    data = thumbnails.get(key)
+    if data is not None:
+        try:
+            return decode_thumbnail(data), None, key
+        except Exception as e:
+            print(f"⚠️ Dropping unreadable cached thumbnail {key}:", e)
+            thumbnails.discard(key)
+    try:
+        url = thumbnail_url(square_coords)
+    except Exception as e:
+        raise ThumbnailError(f"Earth Engine error: {e}")
     try:
-        thumb_url = fetch_satellite_thumbnail(square_coords)
+        data = download_thumbnail_bytes(url)
+        pil_img = decode_thumbnail(data)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Earth Engine error: {e}")
+        raise ThumbnailError(f"Failed to download thumbnail: {e}")
+    thumbnails.put_async(key, data)  # written behind the request
+    return pil_img, url, key
 
-    # 5) download thumbnail
+# ---------------- API ENDPOINT ----------------
+@router.post("/predict")
+def predict(claim: Claim):
+    # 1-3) coordinates, area and the square AOI polygon (lon,lat order)
     try:
-        pil_img = download_image_from_url(thumb_url)
+        lat, lon, square_coords = claim_polygon(claim)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to download thumbnail: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid coordinate: {e}")
 
-    # 6) save local image (optional)
-    img_filename = f"{SAVED_IMAGES_DIR}/claim_{claim.id}.png"
-    pil_img.save(img_filename)
+    # 4-6) thumbnail from the cache, else Earth Engine + download (then cached)
+    try:
+        pil_img, thumb_url, thumb_key = load_thumbnail(square_coords)
+    except ThumbnailError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     # 7) preprocess and predict
     try:
@@ -222,10 +257,154 @@ def predict(claim: Claim):
         "input_coordinates": {"lat": lat, "lon": lon},
         "polygon_coords_lonlat": square_coords,
         "thumbnail_url": thumb_url,
-        "saved_image": img_filename,
+        "thumbnail_cached": thumb_url is None,
+        "saved_image": f"/model/thumbnails/{thumb_key}.png",
         "model_prediction": pred
     }
 
+# ---------------- Batch prediction ----------------
+# Thumbnails are fetched (cache → Earth Engine → download) and decoded on a
+# bounded pool shared by all batch requests; each image goes to the shared
+# MicroBatcher the moment it is ready, so inference overlaps the fetches
+# still in flight and results stream back in completion order.
+fetch_executor = ThreadPoolExecutor(BATCH_FETCH_CONCURRENCY, thread_name_prefix="thumb-fetch")
+
+REGION_COLUMNS = (
+    "id, patta_holder_name, claim_id, village_name, block, district, state, "
+    "coordinates, total_area_claimed, lat, lon, area_acres"
+)
+
+def fetch_region_claims(filters: dict, limit: int):
+    """Claims in the region (exact, case-insensitive match on each given field)."""
+    clauses = [f"lower({column}) = lower(%s)" for column in filters]
+    query = (
+        f"SELECT {REGION_COLUMNS} FROM fra_documents WHERE " + " AND ".join(clauses) +
+        " ORDER BY id LIMIT %s"
+    )
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, list(filters.values()) + [limit])
+            colnames = [desc[0] for desc in cur.description]
+            rows = [dict(zip(colnames, row)) for row in cur.fetchall()]
+    return [
+        Claim(**{
+            **row,
+            "patta_holder_name": row["patta_holder_name"] or "",
+            "coordinates": row["coordinates"] or "",
+            "area_acres": float(row["area_acres"]) if row["area_acres"] is not None else None,
+        })
+        for row in rows
+    ]
+
+def _fetch_model_input(square_coords):
+    """Runs on fetch_executor: thumbnail → preprocessed (H, W, C) array."""
+    pil_img, thumb_url, thumb_key = load_thumbnail(square_coords)
+    return preprocess_for_model(pil_img, size=IMG_SIZE)[0], thumb_url, thumb_key
+
+async def _predict_one(index: int, claim: Claim, timings: dict):
+    row = {"index": index, "id": claim.id, "claim_id": claim.claim_id}
+    try:
+        lat, lon, square_coords = claim_polygon(claim)
+    except Exception as e:
+        return {**row, "status": "error", "error": f"Invalid coordinate: {e}"}
+
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        arr, thumb_url, thumb_key = await loop.run_in_executor(fetch_executor, _fetch_model_input, square_coords)
+    except Exception as e:
+        return {**row, "status": "error", "error": str(e)}
+    fetched = time.perf_counter()
+    timings["last_fetch"] = max(timings["last_fetch"], fetched)
+
+    try:
+        probs = await inference.apredict_probs(arr)
+    except Exception as e:
+        return {**row, "status": "error", "error": f"Model prediction error: {e}"}
+    return {
+        **row,
+        "status": "ok",
+        "input_coordinates": {"lat": lat, "lon": lon},
+        "thumbnail_cached": thumb_url is None,
+        "saved_image": f"/model/thumbnails/{thumb_key}.png",
+        "fetch_ms": round((fetched - started) * 1000, 1),
+        "inference_ms": round((time.perf_counter() - fetched) * 1000, 1),
+        "model_prediction": format_prediction(probs),
+    }
+
+async def stream_batch_predictions(claims: List[Claim], truncated: bool = False):
+    """Yield one NDJSON line per claim as it finishes, then a summary line."""
+    started = time.perf_counter()
+    timings = {"last_fetch": started}
+    tasks = [asyncio.create_task(_predict_one(i, claim, timings)) for i, claim in enumerate(claims)]
+    counts = {"ok": 0, "error": 0, "thumbnail_cached": 0}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            counts[result["status"]] += 1
+            counts["thumbnail_cached"] += bool(result.get("thumbnail_cached"))
+            yield json.dumps(result) + "\n"
+    finally:
+        # client went away: drop fetches that have not started yet
+        for task in tasks:
+            task.cancel()
+
+    yield json.dumps({
+        "status": "done",
+        "total": len(claims),
+        **counts,
+        "truncated": truncated,
+        # elapsed ≈ last_fetch means inference was hidden behind the fetches
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "last_fetch_ms": round((timings["last_fetch"] - started) * 1000, 1),
+    }) + "\n"
+
+@router.post("/predict/batch")
+async def predict_batch(req: BatchPredictRequest):
+    """
+    Classify many claims in one call: pass `claims`, or a region filter
+    (state / district / block / village_name).  Streams NDJSON: one line
+    per claim in completion order (`index` is its input position), then a
+    `{"status": "done", ...}` summary.
+    """
+    filters = {
+        column: value
+        for column, value in (("state", req.state), ("district", req.district),
+                              ("block", req.block), ("village_name", req.village_name))
+        if value
+    }
+    if req.claims is None and not filters:
+        raise HTTPException(status_code=400, detail="Provide claims or a region filter")
+    if req.claims is not None and filters:
+        raise HTTPException(status_code=400, detail="Provide claims or a region filter, not both")
+
+    if req.claims is not None:
+        claims = req.claims[:req.limit]
+        truncated = len(req.claims) > req.limit
+    else:
+        try:
+            claims = await run_db(fetch_region_claims, filters, req.limit + 1)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        truncated = len(claims) > req.limit
+        claims = claims[:req.limit]
+
+    # load the classifier up front: a missing model is one 503, not N error lines
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, inference.classifier.get)
+    except subsystems.SubsystemUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Model not loaded on server ({e}).")
+
+    return StreamingResponse(stream_batch_predictions(claims, truncated), media_type="application/x-ndjson")
+
+@router.get("/thumbnails/{key}.png")
+def get_thumbnail(key: str):
+    """A cached satellite thumbnail (as referenced by `saved_image`)."""
+    path = thumbnails.path(key) if len(key) == 64 and all(c in "0123456789abcdef" for c in key) else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="Thumbnail not cached")
+    return FileResponse(path, media_type="image/png")
+
 # Simple root
 def root():
     return {"status": "ok", "note": "POST /predict with claim JSON to run the pipeline."}
\ No newline at end of file
@@ -1,119 +1,154 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import requests
-from db import get_db_connection
-from utils.ocr_utils import extract_text_from_file
-from utils.llm_utils import clean_with_llm  # with regex fallback
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import List, Optional
+import base64
+import json
+import os
+import uuid
+from db import get_db_connection, run_db, _json_serializer
+from services import upload_jobs
+from services.bulk_upload import process_bulk, BulkUploadError
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "500"))  # rows per server-side cursor round-trip
 
-def get_coordinates_from_address(address: str):
+
+@router.post("/", status_code=202)
+async def upload_document(
+    response: Response,
+    file: UploadFile = File(...),
+    near_duplicates: bool = Query(False, description="Also match re-scans by perceptual hash"),
+):
     """
-    Get coordinates using OpenStreetMap Nominatim API.
-    Returns (lat, lon) or "" if not found.
+    Queue a document for OCR → LLM → geocode → insert; poll /upload/jobs/{job_id}.
+    A document that is already stored returns 200 with its doc_id instead.
     """
     try:
-        url = "https://nominatim.openstreetmap.org/search"
-        params = {"q": address, "format": "json", "limit": 1}
-        headers = {"User-Agent": "fra-doc-system"}  # required by Nominatim
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-
-        if response.status_code == 200:
-            results = response.json()
-            if results:
-                lat = results[0]["lat"]
-                lon = results[0]["lon"]
-                return f"{lat}, {lon}"
+        file_bytes = await file.read()
+        submitted = await upload_jobs.submit_upload(file.filename, file_bytes, near_duplicates)
     except Exception as e:
-        print(f"Coordinate fetch error: {e}")
-    return ""
+        raise HTTPException(status_code=500, detail=str(e))
 
+    if submitted["status"] == "duplicate":
+        response.status_code = 200
+        return submitted
+    job_id = submitted["job_id"]
+    return {"status": "queued", "job_id": job_id, "status_url": f"/upload/jobs/{job_id}"}
 
-@router.post("/")
-async def upload_document(file: UploadFile = File(...)):
+
+@router.post("/bulk")
+async def upload_bulk(files: List[UploadFile] = File(...)):
+    """
+    Process many scans (or ZIP archives of scans) in one request.  Returns
+    a per-file manifest with doc_id or error, stage timings and throughput.
+    """
+    uploads = [(f.filename, await f.read()) for f in files]
     try:
-        # 1. Read file
-        file_bytes = await file.read()
+        return await process_bulk(uploads)
+    except BulkUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # 2. Extract OCR text
-        ocr_text = extract_text_from_file(file_bytes)
-        print("OCR Output:", ocr_text)
-
-        # 3. Clean + Structure text using LLM
-        data = clean_with_llm(ocr_text)
-        if "error" in data:
-            raise HTTPException(status_code=500, detail=data["error"])
-
-        # 4. Ensure coordinates
-        coords = str(data.get("Coordinates") or "").strip()
-        if not coords:  
-            address_parts = [
-                data.get("Village Name", ""),
-                data.get("Block", ""),
-                data.get("District", ""),
-                data.get("State", "")
-            ]
-            address = ", ".join([p for p in address_parts if p])  
-            if address:
-                coords = get_coordinates_from_address(address)
-
-        data["Coordinates"] = coords
-
-        # 5. Insert into DB
-        insert_query = """
-        INSERT INTO fra_documents (
-            patta_holder_name, father_or_husband_name, age, gender, address,
-            village_name, block, district, state, total_area_claimed,
-            coordinates, land_use, claim_id, date_of_application,
-            water_bodies, forest_cover, homestead
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id;
-        """
-
-        values = (
-            str(data.get("Patta-Holder Name") or ""),
-            str(data.get("Father/Husband Name") or ""),
-            str(data.get("Age") or ""),
-            str(data.get("Gender") or ""),
-            str(data.get("Address") or ""),
-            str(data.get("Village Name") or ""),
-            str(data.get("Block") or ""),
-            str(data.get("District") or ""),
-            str(data.get("State") or ""),
-            str(data.get("Total Area Claimed") or ""),
-            data.get("Coordinates", ""),
-            str(data.get("Land Use") or ""),
-            str(data.get("Claim ID") or ""),
-            str(data.get("Date of Application") or ""),
-            str(data.get("Water bodies") or ""),
-            str(data.get("Forest cover") or ""),
-            str(data.get("Homestead") or "")
-        )
 
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute(insert_query, values)
-                doc_id = cur.fetchone()[0]
-                conn.commit()
+@router.get("/jobs/{job_id}")
+async def get_upload_job(job_id: uuid.UUID):
+    job = await run_db(upload_jobs.get_job, str(job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-        return {"status": "success", "doc_id": doc_id, "data": data}
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+# ---- Keyset pagination over (created_at, id) ----
 
+def encode_cursor(created_at, doc_id) -> str:
+    raw = f"{created_at.isoformat()}|{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-# ✅ New route: Fetch all FRA documents
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, doc_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_query(after, limit):
+    query = "SELECT * FROM fra_documents"
+    params = []
+    if after:
+        query += " WHERE (created_at, id) < (%s, %s)"
+        params += list(after)
+    query += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    return query, params
+
+
+def fetch_documents_page(after=None, limit=DEFAULT_PAGE_SIZE):
+    """One page plus the cursor of its last row (None on the last page)."""
+    query, params = _page_query(after, limit + 1)
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+            colnames = [desc[0] for desc in cur.description]
+
+    results = [dict(zip(colnames, row)) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+    return results, next_cursor
+
+
+def stream_documents_ndjson(after=None, limit=None):
+    """
+    Yield documents as NDJSON lines from a server-side (named) cursor, so
+    only STREAM_FETCH_SIZE rows are ever held in memory.
+    """
+    query, params = _page_query(after, limit)
+    with get_db_connection() as conn:
+        with conn.cursor(name="fra_documents_stream") as cur:
+            cur.itersize = STREAM_FETCH_SIZE
+            cur.execute(query, params)
+            colnames = None
+            for row in cur:
+                if colnames is None:
+                    colnames = [desc[0] for desc in cur.description]
+                yield json.dumps(dict(zip(colnames, row)), default=_json_serializer) + "\n"
+
+
+# ✅ Fetch FRA documents, newest first (keyset-paginated or streamed)
 @router.get("/all")
-async def get_all_documents():
+async def get_all_documents(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="ndjson streams every row"),
+):
+    after_key = decode_cursor(after) if after else None
+
+    if format == "ndjson":
+        # The sync generator is iterated in Starlette's threadpool
+        return StreamingResponse(
+            stream_documents_ndjson(after_key), media_type="application/x-ndjson"
+        )
+
     try:
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT * FROM fra_documents ORDER BY created_at DESC;")
-                rows = cur.fetchall()
-                colnames = [desc[0] for desc in cur.description]
-
-        results = [dict(zip(colnames, row)) for row in rows]
-        return {"status": "success", "count": len(results), "results": results}
+        results, next_cursor = await run_db(fetch_documents_page, after_key, limit)
+        return {
+            "status": "success",
+            "count": len(results),
+            "next_cursor": next_cursor,
+            "results": results,
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,100 @@
+"""
+Backfill the typed claim columns (age_years, area_acres, gender_code,
+lat, lon) for rows ingested before migration 004, or parsed by an older
+PARSER_VERSION.
+
+Rows are processed in id order, one chunk per transaction, with the
+vectorized parser in utils/claim_fields.parse_frame.  Every processed row
+gets typed_version set, so an interrupted run simply resumes where it
+stopped.
+
+    cd Backend
+    python -m scripts.backfill_typed_columns --chunk-size 5000
+"""
+import argparse
+import time
+
+import pandas as pd
+import psycopg2.extras
+
+import db
+from utils.claim_fields import parse_frame, PARSER_VERSION
+
+SELECT_CHUNK = """
+SELECT id, age, total_area_claimed, gender, coordinates
+FROM fra_documents
+WHERE (typed_version IS NULL OR typed_version < %s) AND id > %s
+ORDER BY id
+LIMIT %s
+"""
+
+UPDATE_CHUNK = """
+UPDATE fra_documents AS d SET
+    age_years = v.age_years,
+    area_acres = v.area_acres,
+    gender_code = v.gender_code,
+    lat = v.lat,
+    lon = v.lon,
+    typed_version = %s
+FROM (VALUES %%s) AS v(id, age_years, area_acres, gender_code, lat, lon)
+WHERE d.id = v.id
+"""
+# explicit casts: an all-NULL VALUES column would otherwise be typed as text
+UPDATE_TEMPLATE = "(%s::int, %s::int, %s::numeric, %s::claim_gender, %s::float8, %s::float8)"
+
+
+def _records(ids, typed):
+    typed = typed.astype(object).where(typed.notna(), None)
+    return [
+        (int(i), r.age_years, r.area_acres, r.gender_code, r.lat, r.lon)
+        for i, r in zip(ids, typed.itertuples(index=False))
+    ]
+
+
+def backfill(chunk_size: int, start_id: int = 0, max_chunks: int = None):
+    last_id = start_id
+    total = 0
+    chunks = 0
+    started = time.perf_counter()
+    while max_chunks is None or chunks < max_chunks:
+        with db.get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(SELECT_CHUNK, (PARSER_VERSION, last_id, chunk_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                df = pd.DataFrame(rows, columns=["id", "age", "total_area_claimed", "gender", "coordinates"])
+                typed = parse_frame(df)
+                psycopg2.extras.execute_values(
+                    cur,
+                    cur.mogrify(UPDATE_CHUNK, (PARSER_VERSION,)).decode(),
+                    _records(df["id"], typed),
+                    template=UPDATE_TEMPLATE,
+                    page_size=chunk_size,
+                )
+            # committed by get_db_connection on exit
+        last_id = int(df["id"].iloc[-1])
+        total += len(df)
+        chunks += 1
+        rate = total / max(time.perf_counter() - started, 1e-9)
+        print(f"chunk {chunks}: {len(df)} rows up to id {last_id} ({total} total, {rate:.0f} rows/s)")
+    return total, last_id
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunk-size", type=int, default=5000)
+    ap.add_argument("--start-id", type=int, default=0, help="skip rows with id <= this value")
+    ap.add_argument("--max-chunks", type=int, default=None, help="stop after this many chunks")
+    args = ap.parse_args()
+
+    db.init_pool()
+    try:
+        total, last_id = backfill(args.chunk_size, args.start_id, args.max_chunks)
+        print(f"✅ Backfilled {total} rows (last id {last_id}, parser v{PARSER_VERSION}).")
+    finally:
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
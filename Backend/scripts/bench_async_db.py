@@ -0,0 +1,82 @@
+"""
+Event-loop blocking benchmark for the async DB path.
+
+Fires N concurrent "slow queries" (pg_sleep) from one event loop while a
+heartbeat coroutine measures how late it gets scheduled.  In `blocking`
+mode the queries run directly on the loop, like the old endpoints did; in
+`executor` mode they go through db.run_db.
+
+    cd Backend
+    python -m scripts.bench_async_db --concurrency 200 --query-ms 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import db
+
+
+def slow_query(seconds: float):
+    with db.get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_sleep(%s)", (seconds,))
+            cur.fetchall()
+
+
+async def heartbeat(interval: float, lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(mode: str, concurrency: int, query_s: float, interval: float):
+    lags = []
+    stop = asyncio.Event()
+    hb = asyncio.create_task(heartbeat(interval, lags, stop))
+    await asyncio.sleep(interval * 2)
+
+    async def one_blocking():
+        slow_query(query_s)
+
+    async def one_executor():
+        await db.run_db(slow_query, query_s)
+
+    worker = one_blocking if mode == "blocking" else one_executor
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await hb
+    lags_ms = sorted(l * 1000 for l in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{mode:>9}: {concurrency} queries in {elapsed:.2f}s "
+        f"({concurrency / elapsed:.0f} q/s) | loop lag "
+        f"median={statistics.median(lags_ms):.1f}ms p99={p99:.1f}ms max={lags_ms[-1]:.1f}ms "
+        f"| heartbeats={len(lags)}"
+    )
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--query-ms", type=float, default=50.0)
+    ap.add_argument("--heartbeat-ms", type=float, default=10.0)
+    ap.add_argument("--mode", choices=["blocking", "executor", "both"], default="both")
+    args = ap.parse_args()
+
+    db.init_pool()
+    try:
+        modes = ["blocking", "executor"] if args.mode == "both" else [args.mode]
+        for mode in modes:
+            asyncio.run(run(mode, args.concurrency, args.query_ms / 1000, args.heartbeat_ms / 1000))
+        print("pool:", db.pool_stats())
+    finally:
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
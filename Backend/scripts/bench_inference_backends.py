@@ -0,0 +1,62 @@
+"""
+Latency and memory per inference backend.  Each backend runs in a fresh
+interpreter so load time and RSS are not shared: reports load + warm-up
+time, p50/p99 latency at batch 1 and at INFERENCE_MAX_BATCH, and peak RSS.
+
+    cd Backend
+    python -m scripts.bench_inference_backends --backends keras,tflite,tflite-int8 --iters 200
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+PROBE = r"""
+import json, resource, sys, time
+import numpy as np
+from services.inference_backends import create_backend, INPUT_SHAPE
+name, iters, batch = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+t = time.perf_counter()
+backend = create_backend(name)
+load_ms = (time.perf_counter() - t) * 1000
+rng = np.random.default_rng(0)
+out = {"load_ms": load_ms}
+for size in (1, batch):
+    x = rng.random((size, *INPUT_SHAPE), dtype=np.float32)
+    times = []
+    for _ in range(iters):
+        t = time.perf_counter()
+        backend.predict(x)
+        times.append((time.perf_counter() - t) * 1000)
+    times.sort()
+    out[f"b{size}"] = {"p50": times[len(times) // 2], "p99": times[min(len(times) - 1, int(len(times) * 0.99))]}
+out["rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(out))
+"""
+
+
+def main():
+    from services.inference import INFERENCE_MAX_BATCH
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", default="keras,tflite,tflite-int8")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=INFERENCE_MAX_BATCH)
+    args = parser.parse_args()
+
+    print(f"{'backend':<12} {'load ms':>8} {'b1 p50':>7} {'b1 p99':>7} "
+          f"{f'b{args.batch} p50':>8} {f'b{args.batch} p99':>8} {'per img':>8} {'RSS MB':>7}")
+    for name in args.backends.split(","):
+        proc = subprocess.run([sys.executable, "-c", PROBE, name, str(args.iters), str(args.batch)],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{name:<12} unavailable: {proc.stderr.strip().splitlines()[-1] if proc.stderr else proc.returncode}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        big = r[f"b{args.batch}"]
+        print(f"{name:<12} {r['load_ms']:>8.0f} {r['b1']['p50']:>7.2f} {r['b1']['p99']:>7.2f} "
+              f"{big['p50']:>8.2f} {big['p99']:>8.2f} {big['p50'] / args.batch:>8.3f} {r['rss_mb']:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
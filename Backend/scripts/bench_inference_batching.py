@@ -0,0 +1,111 @@
+"""
+Micro-batching benchmark: throughput and p50/p99 latency of the inference
+scheduler against max batch size, with N concurrent closed-loop clients
+(each sends its next request as soon as the previous one returns).
+
+Uses the configured INFERENCE_BACKEND when it can be loaded; --synthetic (or their absence) substitutes a NumPy dense
+network with a fixed per-call overhead, to show the scheduling effect on
+any CPU-only box.
+
+    cd Backend
+    python -m scripts.bench_inference_batching --clients 32 --requests 2000 --batch-sizes 1,4,8,16,32,64
+"""
+import argparse
+import statistics
+import threading
+import time
+
+import numpy as np
+
+from services import inference
+from utils.micro_batcher import MicroBatcher
+
+IMG_SHAPE = (64, 64, 3)
+
+
+class SyntheticModel:
+    """Dense 12288→256→10 network plus a fixed per-call cost (framework overhead)."""
+
+    def __init__(self, call_overhead_ms: float):
+        rng = np.random.default_rng(0)
+        self.w1 = rng.standard_normal((np.prod(IMG_SHAPE), 256)).astype(np.float32) * 0.01
+        self.w2 = rng.standard_normal((256, 10)).astype(np.float32) * 0.1
+        self.overhead_s = call_overhead_ms / 1000
+
+    def predict(self, batch):
+        time.sleep(self.overhead_s)
+        hidden = np.maximum(batch.reshape(len(batch), -1) @ self.w1, 0)
+        logits = hidden @ self.w2
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+def load_model(synthetic: bool, call_overhead_ms: float):
+    if not synthetic:
+        try:
+            backend = inference.classifier.get()
+            print(f"Using the {backend.name} backend ({backend.path})")
+            return backend
+        except Exception as e:
+            print(f"{inference.INFERENCE_BACKEND} backend unavailable ({e}); using the synthetic model")
+    print(f"Synthetic model with {call_overhead_ms} ms per-call overhead")
+    return SyntheticModel(call_overhead_ms)
+
+
+def run(model, max_batch: int, max_wait_ms: float, clients: int, requests: int):
+    batcher = MicroBatcher(model.predict, max_batch, max_wait_ms)
+    image = np.random.default_rng(1).random(IMG_SHAPE, dtype=np.float32)
+    batcher.predict(image)  # warm-up (and model build)
+
+    latencies = []
+    lock = threading.Lock()
+    per_client = requests // clients
+
+    def client():
+        mine = []
+        for _ in range(per_client):
+            started = time.perf_counter()
+            batcher.predict(image)
+            mine.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    stats = batcher.stats()
+    batcher.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(ordered),
+        "p99": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        "mean_batch": stats["mean_batch_size"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-sizes", default="1,2,4,8,16,32,64")
+    parser.add_argument("--max-wait-ms", type=float, default=inference.INFERENCE_MAX_WAIT_MS)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--call-overhead-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    model = load_model(args.synthetic, args.call_overhead_ms)
+    print(f"{args.clients} clients, {args.requests} requests, max wait {args.max_wait_ms} ms\n")
+    print(f"{'max_batch':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for size in [int(s) for s in args.batch_sizes.split(",")]:
+        r = run(model, size, args.max_wait_ms, args.clients, args.requests)
+        print(f"{size:>9} {r['throughput']:>9.0f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['mean_batch']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+OCR engine benchmark: one tesseract subprocess per document (pytesseract,
+the old path) vs. a resident libtesseract engine (tesserocr), plus pool
+throughput with OCR_WORKERS resident engines.
+
+Uses the given scans, or renders a synthetic FRA form when none are given.
+
+    cd Backend
+    python -m scripts.bench_ocr_engine --docs 20 [scan1.png scan2.jpg ...]
+"""
+import argparse
+import io
+import statistics
+import time
+
+from PIL import Image, ImageDraw
+
+from utils import ocr_engine
+from utils.ocr_utils import extract_text_from_file
+
+SAMPLE_LINES = [
+    "FORM - A: CLAIM FOR RIGHTS AS FOREST DWELLING SCHEDULED TRIBE",
+    "Patta-Holder Name: Ramesh Kumar",
+    "Father/Husband Name: Suresh Kumar",
+    "Age: 46    Gender: Male",
+    "Village Name: Bhimganga    Block: Bichhiya",
+    "District: Mandla    State: Madhya Pradesh",
+    "Total Area Claimed: 2.5 acres",
+    "Claim ID: FRA-MP-2023-00412",
+    "Date of Application: 12/03/2023",
+]
+
+
+def synthetic_scan() -> bytes:
+    img = Image.new("L", (1700, 1100), 255)
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(SAMPLE_LINES):
+        draw.text((80, 80 + i * 100), line, fill=0)
+    img = img.resize((img.width * 2, img.height * 2))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def time_engine(engine, scans, docs):
+    images = [Image.open(io.BytesIO(s)) for s in scans]
+    for img in images:
+        img.load()
+    engine.recognize(images[0])  # warm-up
+    timings = []
+    for i in range(docs):
+        started = time.perf_counter()
+        engine.recognize(images[i % len(images)])
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name, timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:>22}: median={statistics.median(ordered):8.1f}ms  p95={p95:8.1f}ms  n={len(ordered)}")
+    return statistics.median(ordered)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("scans", nargs="*", help="image files to OCR")
+    ap.add_argument("--docs", type=int, default=20)
+    ap.add_argument("--pool-docs", type=int, default=0, help="also measure pool throughput with N docs")
+    args = ap.parse_args()
+
+    scans = []
+    for path in args.scans:
+        with open(path, "rb") as fh:
+            scans.append(fh.read())
+    scans = scans or [synthetic_scan()]
+
+    results = {}
+    for name, cls in ocr_engine.ENGINES.items():
+        try:
+            engine = cls()
+        except ImportError as e:
+            print(f"{name:>22}: unavailable ({e})")
+            continue
+        results[name] = report(f"{name} per doc", time_engine(engine, scans, args.docs))
+        engine.close()
+
+    if "tesserocr" in results and "pytesseract" in results:
+        print(f"{'overhead removed':>22}: {results['pytesseract'] - results['tesserocr']:8.1f}ms per document")
+
+    if args.pool_docs:
+        pool = ocr_engine.get_ocr_pool()
+        list(pool.map(extract_text_from_file, scans * ocr_engine.OCR_WORKERS))  # start + warm workers
+        started = time.perf_counter()
+        list(pool.map(extract_text_from_file, (scans[i % len(scans)] for i in range(args.pool_docs))))
+        elapsed = time.perf_counter() - started
+        print(f"{'pool throughput':>22}: {args.pool_docs / elapsed * 60:8.1f} docs/min "
+              f"with {ocr_engine.OCR_WORKERS} workers ({ocr_engine.engine_info()['engine']})")
+        ocr_engine.shutdown_ocr_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Startup benchmark: how long a fresh worker takes to import the app, and
+what each lazily initialized subsystem (model, earth_engine, gemini) costs
+when it is finally loaded.
+
+Each run is a new interpreter, so module caches do not hide import cost.
+
+    cd Backend
+    python -m scripts.bench_startup --runs 5 [--load model,gemini] [--top 15]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, resource, sys, time
+t0 = time.perf_counter()
+import main
+import_s = time.perf_counter() - t0
+from utils import subsystems
+loads = {}
+for name in [n for n in sys.argv[1].split(",") if n]:
+    t = time.perf_counter()
+    try:
+        subsystems.get(name)
+        state = "ready"
+    except Exception as e:
+        state = f"failed: {e}"
+    loads[name] = {"ms": round((time.perf_counter() - t) * 1000, 1), "state": state}
+print(json.dumps({
+    "import_s": import_s,
+    "loads": loads,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in ("tensorflow", "ee", "langchain_google_genai", "pandas") if m in sys.modules],
+}))
+"""
+
+
+def run_probe(load: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE, load], capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int):
+    """Import time (self time summed per top-level package) from -X importtime."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True, text=True,
+    ).stderr
+    totals = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(self_us)
+    for name, us in sorted(totals.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--load", default="", help="comma-separated subsystems to load after import")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest packages to import")
+    args = parser.parse_args()
+
+    results = [run_probe(args.load) for _ in range(args.runs)]
+    imports = [r["import_s"] * 1000 for r in results]
+    print(f"import main: median {statistics.median(imports):.0f} ms, "
+          f"min {min(imports):.0f} ms, max {max(imports):.0f} ms over {args.runs} runs")
+    print(f"max RSS after import/loads: {statistics.median(r['max_rss_mb'] for r in results):.0f} MB")
+    print(f"heavy modules imported: {', '.join(results[-1]['heavy_modules']) or 'none'}")
+    for name, info in results[-1]["loads"].items():
+        ms = statistics.median(r["loads"][name]["ms"] for r in results)
+        print(f"load {name}: {ms:.0f} ms ({info['state']})")
+    if args.top:
+        print("slowest packages to import:")
+        slowest_imports(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Accuracy parity of the inference backends against the Keras path on a
+held-out set laid out as <dir>/<ClassName>/<image> (the EuroSAT layout,
+class names as in routers/model_pred.CLASS_NAMES).
+
+Reports top-1 accuracy per backend, top-1 agreement with Keras and the
+largest probability difference.
+
+    cd Backend
+    python -m scripts.eval_backend_parity --data heldout/ --backends keras,tflite,tflite-int8 [--limit 2000]
+"""
+import argparse
+import os
+
+import numpy as np
+from PIL import Image
+
+from routers.model_pred import CLASS_NAMES, IMG_SIZE, preprocess_for_model
+from services.inference_backends import create_backend
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff")
+
+
+def load_labelled_images(data_dir: str, limit: int = None, seed: int = 0):
+    """(images[N, 64, 64, 3] float32, labels[N]) sampled evenly across class folders."""
+    files = []
+    for idx, name in enumerate(CLASS_NAMES):
+        folder = os.path.join(data_dir, name)
+        if os.path.isdir(folder):
+            files += [(os.path.join(folder, f), idx) for f in sorted(os.listdir(folder))
+                      if f.lower().endswith(IMAGE_EXTENSIONS)]
+    if not files:
+        raise SystemExit(f"No images found under {data_dir}/<{'|'.join(CLASS_NAMES)}>/")
+    rng = np.random.default_rng(seed)
+    rng.shuffle(files)
+    files = files[:limit] if limit else files
+    images = np.concatenate([
+        preprocess_for_model(Image.open(path).convert("RGB"), size=IMG_SIZE) for path, _ in files
+    ])
+    return images, np.array([label for _, label in files])
+
+
+def predict_all(backend, images: np.ndarray, batch: int = 32) -> np.ndarray:
+    return np.concatenate([backend.predict(images[i:i + batch]) for i in range(0, len(images), batch)])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", required=True)
+    parser.add_argument("--backends", default="keras,tflite,tflite-int8")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    images, labels = load_labelled_images(args.data, args.limit)
+    print(f"{len(images)} held-out images from {args.data}\n")
+
+    reference = None
+    print(f"{'backend':<12} {'accuracy':>9} {'agree w/ keras':>15} {'max |Δp|':>9}")
+    for name in args.backends.split(","):
+        try:
+            probs = predict_all(create_backend(name), images)
+        except Exception as e:
+            print(f"{name:<12} unavailable: {e}")
+            continue
+        top1 = probs.argmax(axis=1)
+        if name == "keras":
+            reference = probs
+        agree = diff = "-"
+        if reference is not None and name != "keras":
+            agree = f"{(top1 == reference.argmax(axis=1)).mean():.2%}"
+            diff = f"{np.abs(probs - reference).max():.4f}"
+        print(f"{name:<12} {(top1 == labels).mean():>9.2%} {agree:>15} {diff:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Export best_model.h5 to TFLite for the `tflite` / `tflite-int8` inference
+backends (services/inference_backends.py).
+
+The float model keeps float32 weights.  --int8 applies full-integer
+post-training quantization, calibrated on images from a held-out
+directory (<dir>/<ClassName>/<image>).  Calibrate on real imagery:
+random data gives poor activation ranges.
+
+    cd Backend
+    python -m scripts.export_tflite                     # -> best_model.tflite
+    python -m scripts.export_tflite --int8 --calibration heldout/ --samples 500
+"""
+import argparse
+
+import numpy as np
+
+from services.inference_backends import MODEL_PATH, TFLITE_MODEL_PATH, TFLITE_INT8_MODEL_PATH, INPUT_SHAPE
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--int8", action="store_true", help="full-integer quantization")
+    parser.add_argument("--calibration", help="held-out image directory for int8 calibration")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    import tensorflow as tf
+
+    model = tf.keras.models.load_model(MODEL_PATH)
+    # fixed signature: any batch size, 64x64 RGB float32
+    fn = tf.function(lambda x: model(x, training=False),
+                     input_signature=[tf.TensorSpec((None, *INPUT_SHAPE), tf.float32)])
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([fn.get_concrete_function()], model)
+
+    output = args.output or (TFLITE_INT8_MODEL_PATH if args.int8 else TFLITE_MODEL_PATH)
+    if args.int8:
+        if args.calibration:
+            from scripts.eval_backend_parity import load_labelled_images
+
+            samples, _ = load_labelled_images(args.calibration, args.samples, seed=1)
+        else:
+            print("⚠️ No --calibration set; calibrating on random images (accuracy will suffer)")
+            samples = np.random.default_rng(0).random((args.samples, *INPUT_SHAPE), dtype=np.float32)
+
+        def representative_dataset():
+            for img in samples:
+                yield [img[None, ...]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    with open(output, "wb") as fh:
+        fh.write(converter.convert())
+    print(f"✅ Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
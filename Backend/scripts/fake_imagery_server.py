@@ -0,0 +1,86 @@
+"""
+Local stand-in for Earth Engine thumbnails, for exercising /model/predict
+and /model/predict/batch without Earth Engine credentials or network.
+
+Answers GET /thumb?bbox=west,south,east,north&dim=512 (the default
+THUMBNAIL_URL_TEMPLATE) with a PNG whose colours are derived from the
+bbox, so every AOI gets its own deterministic image.  Latency and
+failures are configurable, so a slow imagery backend can be reproduced.
+
+    cd Backend
+    python -m scripts.fake_imagery_server --port 8091 --delay-ms 400 --jitter-ms 200
+    THUMBNAIL_SOURCE=http uvicorn main:app
+"""
+import argparse
+import hashlib
+import io
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+from PIL import Image
+
+
+def render(bbox: str, dim: int) -> bytes:
+    """A blocky PNG seeded by the bbox; cheap to encode, so the server is never the bottleneck."""
+    seed = int.from_bytes(hashlib.sha256(bbox.encode()).digest()[:4], "big")
+    blocks = np.random.default_rng(seed).integers(0, 256, size=(16, 16, 3), dtype=np.uint8)
+    image = Image.fromarray(blocks, "RGB").resize((dim, dim), Image.NEAREST)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", compress_level=1)
+    return buf.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    options = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/thumb":
+            return self._send(404, b"not found", "text/plain")
+        query = parse_qs(url.query)
+        bbox = query.get("bbox", [""])[0]
+        if len(bbox.split(",")) != 4:
+            return self._send(400, b"bbox=west,south,east,north required", "text/plain")
+        dim = min(int(query.get("dim", ["512"])[0]), 2048)
+
+        opts = self.options
+        time.sleep(max(0.0, opts.delay_ms + random.uniform(-opts.jitter_ms, opts.jitter_ms)) / 1000)
+        if random.random() < opts.fail_rate:
+            return self._send(503, b"fake overload", "text/plain")
+        self._send(200, render(bbox, dim), "image/png")
+
+    def _send(self, status: int, data: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if self.options.verbose:
+            super().log_message(fmt, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--delay-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--verbose", action="store_true")
+    Handler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((Handler.options.host, Handler.options.port), Handler)
+    print(f"Fake imagery server listening on http://{Handler.options.host}:{Handler.options.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
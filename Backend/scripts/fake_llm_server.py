@@ -0,0 +1,99 @@
+"""
+Local stand-in for the Gemini REST API, for exercising the LLM client's
+deadlines, circuit breaker and batching without network access or quota.
+
+Answers POST /v1beta/models/{model}:generateContent.  Extraction prompts
+get the rule extractor's JSON for the OCR text; DSS prompts get a filter
+object.  Latency and failures are configurable, so a slow or failing
+upstream can be reproduced.
+
+    cd Backend
+    python -m scripts.fake_llm_server --port 8090 --delay-ms 300 --jitter-ms 200 --fail-rate 0.1
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8090 GEMINI_API_KEY=fake uvicorn main:app
+"""
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.form_extractor import extract_fields
+
+
+def answer(prompt: str) -> str:
+    if "OCR Text:" in prompt:
+        data, _ = extract_fields(prompt.split("OCR Text:", 1)[1])
+        return json.dumps(data)
+    question = prompt.rsplit("Question:", 1)[-1]
+    m = re.search(r"in ([A-Z][A-Za-z]+)", question)
+    return json.dumps({"scheme": None, "village": m.group(1) if m else None, "district": None, "state": None})
+
+
+class Handler(BaseHTTPRequestHandler):
+    options = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        if not self.path.split("?")[0].endswith(":generateContent"):
+            return self._send(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        opts = self.options
+        time.sleep(max(0.0, opts.delay_ms + random.uniform(-opts.jitter_ms, opts.jitter_ms)) / 1000)
+        if random.random() < opts.fail_rate:
+            return self._send(503, {"error": {"code": 503, "message": "fake overload", "status": "UNAVAILABLE"}})
+
+        request = json.loads(body or b"{}")
+        prompt = "\n".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        text = answer(prompt)
+        self._send(200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": len(prompt) // 4,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": (len(prompt) + len(text)) // 4,
+            },
+            "modelVersion": "fake-gemini",
+        })
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if self.options.verbose:
+            super().log_message(fmt, *args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--delay-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--verbose", action="store_true")
+    Handler.options = parser.parse_args()
+
+    server = ThreadingHTTPServer((Handler.options.host, Handler.options.port), Handler)
+    print(f"Fake Gemini listening on http://{Handler.options.host}:{Handler.options.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""
+Apply pending SQL migrations from Backend/migrations.
+
+    cd Backend
+    python -m scripts.migrate
+"""
+import db
+
+
+def main():
+    db.init_pool()
+    try:
+        applied = db.apply_migrations()
+        if applied:
+            for version in applied:
+                print(f"✅ applied {version}")
+        else:
+            print("Schema is up to date.")
+    finally:
+        db.close_pool()
+
+
+if __name__ == "__main__":
+    main()
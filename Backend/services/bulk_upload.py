@@ -0,0 +1,260 @@
+import asyncio
+import io
+import os
+import time
+import uuid
+import zipfile
+
+from db import run_db
+from services import document_dedup, upload_jobs
+from services.upload_pipeline import aextract_many, geocode_stage, insert_documents
+from utils.ocr_utils import ocr_document
+
+# ---------------------------------------------------------------------------
+# Bulk upload: many scans (or ZIP archives of scans) in one request
+#
+# Files are OCR'd concurrently on the OCR pool, extracted together with one
+# batched LLM call (forms the rule extractor handles never reach it), then
+# geocoded on the bounded geocoding pool.  All rows that made it through
+# are written with one multi-row INSERT.  Files whose
+# content hash is already stored, or repeated within the request, are
+# reported as duplicates and not processed.
+# ---------------------------------------------------------------------------
+
+BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "500"))
+BULK_MAX_FILE_BYTES = int(os.getenv("BULK_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+BULK_MAX_TOTAL_BYTES = int(os.getenv("BULK_MAX_TOTAL_BYTES", str(512 * 1024 * 1024)))  # after unzipping
+SCAN_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp", ".pdf")
+
+
+class BulkUploadError(ValueError):
+    """The request itself is unusable (too many files, bad archive)."""
+
+
+def _scan_members(archive: zipfile.ZipFile) -> list:
+    members = []
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        if info.is_dir() or not base or base.startswith(".") or "__MACOSX" in info.filename:
+            continue
+        if base.lower().endswith(SCAN_EXTENSIONS):
+            members.append(info)
+    return members
+
+
+def expand_archives(uploads: list) -> list:
+    """
+    [(name, bytes)] with every ZIP replaced by the scans it contains.  File
+    count and total uncompressed size are checked from the archive
+    directories before any member is decompressed.
+    """
+    planned = []  # (name, bytes | None) or (name, (archive, info))
+    total_bytes = 0
+    for name, data in uploads:
+        if (name or "").lower().endswith(".zip") or zipfile.is_zipfile(io.BytesIO(data)):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(data))
+            except zipfile.BadZipFile as e:
+                raise BulkUploadError(f"{name}: {e}")
+            for info in _scan_members(archive):
+                if info.file_size > BULK_MAX_FILE_BYTES:
+                    planned.append((f"{name}/{info.filename}", None))  # reported as too large
+                else:
+                    planned.append((f"{name}/{info.filename}", (archive, info)))
+                    total_bytes += info.file_size
+        elif len(data) <= BULK_MAX_FILE_BYTES:
+            planned.append((name, data))
+            total_bytes += len(data)
+        else:
+            planned.append((name, None))
+        if len(planned) > BULK_MAX_FILES:
+            raise BulkUploadError(f"At most {BULK_MAX_FILES} files per bulk upload")
+        if total_bytes > BULK_MAX_TOTAL_BYTES:
+            raise BulkUploadError(f"At most {BULK_MAX_TOTAL_BYTES} bytes (uncompressed) per bulk upload")
+
+    entries = []
+    for name, source in planned:
+        if isinstance(source, tuple):
+            archive, info = source
+            try:
+                source = archive.read(info)
+            except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError) as e:
+                raise BulkUploadError(f"{name}: {e}")
+        entries.append((name, source))
+    return entries
+
+
+async def _timed(item: dict, stage: str, fn, *args):
+    item["stage"] = stage
+    started = time.perf_counter()
+    executor = upload_jobs.executor_for(stage)
+    if asyncio.iscoroutinefunction(fn):
+        result = await fn(*args, executor)
+    else:
+        result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+    item["timings_ms"][stage] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def _spool(name: str, data: bytes) -> str:
+    """Write a member to UPLOAD_DIR so OCR workers read it from disk."""
+    ext = os.path.splitext(name)[1]
+    path = os.path.join(upload_jobs.UPLOAD_DIR, f"bulk-{uuid.uuid4()}{ext}")
+    os.makedirs(upload_jobs.UPLOAD_DIR, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+async def _ocr_spooled(item: dict, name: str, data: bytes) -> str:
+    loop = asyncio.get_running_loop()
+    path = await loop.run_in_executor(None, _spool, name, data)
+    try:
+        return await _timed(item, "ocr", ocr_document, path)
+    finally:
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f"⚠️ Could not remove spooled file {path}: {e}")
+
+
+async def _ocr_file(name: str, data: bytes, digest: str) -> dict:
+    """OCR one file (or reuse cached OCR / extraction results for its hash)."""
+    item = {"file": name, "status": "failed", "timings_ms": {}}
+    if data is None:
+        item["error"] = f"file larger than {BULK_MAX_FILE_BYTES} bytes"
+        return item
+    loop = asyncio.get_running_loop()
+    try:
+        extracted = await loop.run_in_executor(None, document_dedup.cached_extraction, digest)
+        if extracted is not None:
+            item["cached"] = True
+            item["extracted"] = extracted
+        else:
+            text = await loop.run_in_executor(None, document_dedup.cached_ocr, digest)
+            if text is None:
+                text = await _ocr_spooled(item, name, data)
+                await loop.run_in_executor(None, document_dedup.store_ocr, digest, text)
+            item["text"] = text
+        item["status"] = "ocr_done"
+    except Exception as e:
+        item["error"] = f"{item.get('stage', 'cache')}: {e}"
+    item.pop("stage", None)
+    return item
+
+
+async def _extract_batch(items: list, digests: list):
+    """One batched extraction for every item still holding OCR text."""
+    if not items:
+        return
+    started = time.perf_counter()
+    results = await aextract_many([item.pop("text") for item in items])
+    batch_ms = round((time.perf_counter() - started) * 1000, 1)
+    loop = asyncio.get_running_loop()
+    for item, digest, result in zip(items, digests, results):
+        item["timings_ms"]["extract_batch"] = batch_ms
+        if isinstance(result, Exception):
+            item["status"] = "failed"
+            item["error"] = f"extract: {result}"
+            continue
+        item["extracted"] = result
+        # results produced while the LLM was unavailable are not worth keeping
+        if result["_extraction"]["source"] != "fallback":
+            await loop.run_in_executor(None, document_dedup.store_extraction, digest, result)
+
+
+async def _geocode_file(item: dict, data: bytes) -> dict:
+    extracted = item.pop("extracted")
+    item["extracted_by"] = extracted.get("_extraction", {}).get("source")
+    try:
+        if document_dedup.PHASH_ENABLED:
+            item["phash"] = await asyncio.get_running_loop().run_in_executor(
+                None, document_dedup.perceptual_hash, data)
+        item["data"] = await _timed(item, "geocode", geocode_stage, extracted)
+        item["status"] = "extracted"
+    except Exception as e:
+        item["status"] = "failed"
+        item["error"] = f"{item.get('stage', 'phash')}: {e}"
+    item.pop("stage", None)
+    return item
+
+
+def _hash_entries(entries: list) -> list:
+    return [document_dedup.content_hash(data) if data is not None else None for _, data in entries]
+
+
+async def process_bulk(uploads: list) -> dict:
+    """Run the pipeline for every file and return a per-file manifest."""
+    started = time.perf_counter()
+    entries = expand_archives(uploads)
+    digests = await asyncio.get_running_loop().run_in_executor(None, _hash_entries, entries)
+    stored = await run_db(document_dedup.find_documents_by_hash, [d for d in digests if d])
+
+    manifest = [None] * len(entries)
+    first_index = {}  # digest -> index of its first occurrence in this request
+    pending = []
+    for i, ((name, data), digest) in enumerate(zip(entries, digests)):
+        if digest in stored:
+            manifest[i] = {"file": name, "status": "duplicate", "doc_id": stored[digest], "timings_ms": {}}
+        elif digest is not None and digest in first_index:
+            manifest[i] = {"file": name, "status": "duplicate",
+                           "duplicate_of": entries[first_index[digest]][0], "timings_ms": {}}
+        else:
+            if digest is not None:
+                first_index[digest] = i
+            pending.append(i)
+    results = await asyncio.gather(*(_ocr_file(*entries[i], digests[i]) for i in pending))
+    for i, item in zip(pending, results):
+        manifest[i] = item
+
+    to_extract = [i for i in pending if "text" in manifest[i]]
+    await _extract_batch([manifest[i] for i in to_extract], [digests[i] for i in to_extract])
+    await asyncio.gather(*(
+        _geocode_file(manifest[i], entries[i][1]) for i in pending if "extracted" in manifest[i]
+    ))
+
+    ready = [i for i in pending if manifest[i]["status"] == "extracted"]
+    if ready:
+        insert_started = time.perf_counter()
+        try:
+            ids = await run_db(
+                insert_documents,
+                [manifest[i]["data"] for i in ready],
+                [digests[i] for i in ready],
+                [manifest[i].pop("phash", None) for i in ready],
+            )
+        except Exception as e:
+            for i in ready:
+                manifest[i]["status"] = "failed"
+                manifest[i]["error"] = f"insert: {e}"
+        else:
+            insert_ms = round((time.perf_counter() - insert_started) * 1000, 1)
+            for i, doc_id in zip(ready, ids):
+                manifest[i]["status"] = "inserted"
+                manifest[i]["doc_id"] = doc_id
+                manifest[i]["timings_ms"]["insert_batch"] = insert_ms
+
+    # repeats within the request share the first copy's doc_id
+    for i, item in enumerate(manifest):
+        if item["status"] == "duplicate" and "duplicate_of" in item:
+            first = manifest[first_index[digests[i]]]
+            if first["status"] != "inserted":
+                item["status"] = first["status"]
+                item["error"] = first.get("error")
+            else:
+                item["doc_id"] = first["doc_id"]
+
+    elapsed = time.perf_counter() - started
+    inserted = sum(1 for item in manifest if item["status"] == "inserted")
+    duplicates = sum(1 for item in manifest if item["status"] == "duplicate")
+    ok = inserted + duplicates
+    return {
+        "status": "success" if ok == len(manifest) else "partial" if ok else "failed",
+        "files": len(manifest),
+        "inserted": inserted,
+        "duplicates": duplicates,
+        "failed": len(manifest) - ok,
+        "elapsed_s": round(elapsed, 2),
+        "docs_per_minute": round(len(manifest) / elapsed * 60, 1) if elapsed > 0 else None,
+        "results": manifest,
+    }
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+from db import get_db_connection, _json_serializer
+from utils.disk_cache import DiskCache
+from utils.ocr_utils import _read, load_page
+
+# ---------------------------------------------------------------------------
+# Upload deduplication and the OCR / extraction result cache
+#
+# Every upload is identified by the SHA-256 of its bytes.  OCR text and the
+# extracted JSON are cached on disk under that hash, and fra_documents
+# stores it (migration 009) so re-uploading the same scan returns the
+# existing doc_id without running the pipeline again.
+#
+# Near-duplicates (a re-scan or re-compressed copy of the same page) have
+# different bytes; with PHASH_ENABLED a 64-bit difference hash of the first
+# page is stored as well and `find_near_duplicate` matches by Hamming
+# distance.
+# ---------------------------------------------------------------------------
+
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR", "cache/extraction")
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PHASH_ENABLED = os.getenv("PHASH_ENABLED", "false").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv("NEAR_DUPLICATE_MAX_DISTANCE", "6"))  # of 64 bits
+
+# bump when OCR preprocessing or the extraction prompt changes meaningfully
+CACHE_VERSION = 1
+
+extraction_cache = DiskCache(EXTRACTION_CACHE_DIR, EXTRACTION_CACHE_MAX_BYTES)
+
+
+def content_hash(source) -> str:
+    """SHA-256 hex digest of an upload (bytes or a path to it)."""
+    return hashlib.sha256(_read(source)).hexdigest()
+
+
+# ---- Perceptual hash ----
+
+def perceptual_hash(source) -> int:
+    """
+    64-bit dHash of the first page: shrink to 9x8 grayscale and record
+    whether each pixel is brighter than its right neighbour.  Returned as a
+    signed int so it fits a Postgres BIGINT.
+    """
+    page = load_page(_read(source), 0).convert("L").resize((9, 8))
+    pixels = np.asarray(page, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).ravel()
+    value = int("".join("1" if b else "0" for b in bits), 2)
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+# ---- Lookups ----
+
+def find_document_by_hash(digest: str) -> Optional[dict]:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM fra_documents WHERE content_sha256 = %s", (digest,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cur.description]
+    return dict(zip(columns, row))
+
+
+def find_documents_by_hash(digests: list) -> dict:
+    """{content_sha256: doc_id} for the hashes already stored."""
+    if not digests:
+        return {}
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT content_sha256, id FROM fra_documents WHERE content_sha256 = ANY(%s)",
+                (list(digests),),
+            )
+            return dict(cur.fetchall())
+
+
+def find_near_duplicate(phash: int, max_distance: int = NEAR_DUPLICATE_MAX_DISTANCE):
+    """(document row, distance) of the closest stored phash within max_distance, else None."""
+    # sequential scan over the phash column; fine at district-office scale
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT * FROM (
+                    SELECT d.*,
+                           length(replace(((d.phash # %s)::bit(64))::text, '0', '')) AS phash_distance
+                    FROM fra_documents d
+                    WHERE d.phash IS NOT NULL
+                ) t
+                WHERE phash_distance <= %s
+                ORDER BY phash_distance
+                LIMIT 1
+                """,
+                (phash, max_distance),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cur.description]
+    doc = dict(zip(columns, row))
+    return doc, doc.pop("phash_distance")
+
+
+# ---- Result cache ----
+
+def _key(digest: str, kind: str) -> str:
+    return f"{digest}.{kind}.v{CACHE_VERSION}"
+
+
+def cached_ocr(digest: str) -> Optional[str]:
+    data = extraction_cache.get(_key(digest, "ocr"))
+    return data.decode("utf-8") if data is not None else None
+
+
+def store_ocr(digest: str, text: str):
+    extraction_cache.put(_key(digest, "ocr"), text.encode("utf-8"))
+
+
+def cached_extraction(digest: str) -> Optional[dict]:
+    data = extraction_cache.get(_key(digest, "extract"))
+    return json.loads(data) if data is not None else None
+
+
+def store_extraction(digest: str, data: dict):
+    extraction_cache.put(_key(digest, "extract"), json.dumps(data, default=_json_serializer).encode("utf-8"))
+
+
+def stats():
+    return {
+        **extraction_cache.stats(),
+        "phash_enabled": PHASH_ENABLED,
+        "near_duplicate_max_distance": NEAR_DUPLICATE_MAX_DISTANCE,
+    }
@@ -0,0 +1,149 @@
+import io
+import time
+
+import numpy as np
+
+from db import get_db_connection as get_conn
+from services.scheme_service import ELIGIBILITY_RULES, SKIP_IF_FALSY, build_region_filter
+
+# ---------------------------------------------------------------------------
+# Multi-scheme eligibility matrix
+#
+# Claim attributes for a region are loaded once into NumPy columns and every
+# scheme is evaluated as a boolean mask.  Mask rules mirror ELIGIBILITY_RULES
+# (same keys, same value coercion, NULL never matches).
+# ---------------------------------------------------------------------------
+
+GENDER_CODES = {"male": 1, "female": 2, "other": 3}  # 0 = unknown
+
+
+def load_claim_columns(village: str = None, district: str = None, state: str = None) -> dict:
+    """Typed claim attributes for a region as NumPy arrays (streamed with COPY)."""
+    region_sql, params = build_region_filter(village, district, state)
+    select = (
+        "SELECT id, age_years, area_acres, gender_code::text AS gender_code, "
+        "lower(btrim(state)) AS state_norm "
+        f"FROM fra_documents WHERE 1=1{region_sql}"
+    )
+    buf = io.StringIO()
+    with get_conn() as conn:
+        with conn.cursor() as cur:
+            copy_sql = cur.mogrify(select, params).decode()
+            cur.copy_expert(f"COPY ({copy_sql}) TO STDOUT WITH CSV HEADER", buf)
+    buf.seek(0)
+    import pandas as pd  # only this endpoint needs pandas; keep it off the import path
+
+    df = pd.read_csv(
+        buf,
+        dtype={"id": "int64", "age_years": "float64", "area_acres": "float64",
+               "gender_code": "string", "state_norm": "string"},
+        keep_default_na=False, na_values={"age_years": [""], "area_acres": [""]},
+    )
+
+    state_codes, state_vocab = pd.factorize(df["state_norm"].fillna(""))
+    return {
+        "id": df["id"].to_numpy(),
+        "age": df["age_years"].to_numpy(),
+        "area": np.nan_to_num(df["area_acres"].to_numpy(), nan=0.0),  # COALESCE(area_acres, 0)
+        "gender": df["gender_code"].map(GENDER_CODES).fillna(0).astype("int8").to_numpy(),
+        "state": state_codes.astype("int32"),
+        "state_index": {s: i for i, s in enumerate(state_vocab)},
+    }
+
+
+def _state_mask(cols, value):
+    code = cols["state_index"].get(value)
+    if code is None or value == "":
+        return np.zeros(len(cols["id"]), dtype=bool)
+    return cols["state"] == code
+
+
+def _gender_mask(cols, value):
+    code = GENDER_CODES.get(value)
+    if code is None:
+        return np.zeros(len(cols["id"]), dtype=bool)
+    return cols["gender"] == code
+
+
+# eligibility key -> mask builder(cols, coerced value); NaN comparisons are False
+MASK_RULES = {
+    "min_age": lambda cols, v: cols["age"] >= v,
+    "max_age": lambda cols, v: cols["age"] <= v,
+    "state": _state_mask,
+    "gender": _gender_mask,
+    "min_land_area_acres": lambda cols, v: cols["area"] >= v,
+}
+
+
+def scheme_mask(cols: dict, criteria: dict, memo: dict = None) -> np.ndarray:
+    """Boolean mask of claims satisfying one scheme's eligibility JSON."""
+    mask = np.ones(len(cols["id"]), dtype=bool)
+    for key, value in (criteria or {}).items():
+        if key not in MASK_RULES or key not in ELIGIBILITY_RULES:
+            continue
+        if value is None or (key in SKIP_IF_FALSY and not value):
+            continue
+        coerced = ELIGIBILITY_RULES[key][1](value)
+        # schemes often share thresholds (e.g. min_age 60); build each mask once
+        memo_key = (key, coerced)
+        if memo is not None and memo_key in memo:
+            rule_mask = memo[memo_key]
+        else:
+            rule_mask = MASK_RULES[key](cols, coerced)
+            if memo is not None:
+                memo[memo_key] = rule_mask
+        mask &= rule_mask
+    return mask
+
+
+def eligibility_matrix(
+    schemes: list,
+    village: str = None,
+    district: str = None,
+    state: str = None,
+    include_claims: bool = False,
+) -> dict:
+    started = time.perf_counter()
+    cols = load_claim_columns(village, district, state)
+    loaded = time.perf_counter()
+
+    n = len(cols["id"])
+    memo = {}
+    counts = []
+    # per-claim output only needs the matching rows, never a schemes × claims matrix
+    matched_claims, matched_schemes = [], []
+    for scheme in schemes:
+        mask = scheme_mask(cols, scheme.get("eligibility") or {}, memo)
+        counts.append(int(mask.sum()))
+        if include_claims and counts[-1]:
+            idx = np.flatnonzero(mask)
+            matched_claims.append(idx)
+            matched_schemes.append(np.full(len(idx), scheme["id"]))
+
+    result = {
+        "claims": n,
+        "schemes": [
+            {"id": s["id"], "name": s["name"], "count": c}
+            for s, c in zip(schemes, counts)
+        ],
+        "timings_ms": {
+            "load": round((loaded - started) * 1000, 1),
+            "evaluate": round((time.perf_counter() - loaded) * 1000, 1),
+        },
+    }
+
+    if include_claims:
+        result["per_claim"] = []
+        if matched_claims:
+            claim_idx = np.concatenate(matched_claims)
+            scheme_ids = np.concatenate(matched_schemes)
+            # stable sort keeps each claim's schemes in request order
+            order = np.argsort(claim_idx, kind="stable")
+            claim_idx, scheme_ids = claim_idx[order], scheme_ids[order]
+            splits = np.flatnonzero(np.diff(claim_idx)) + 1
+            result["per_claim"] = [
+                {"id": int(cols["id"][c[0]]), "schemes": s.tolist()}
+                for c, s in zip(np.split(claim_idx, splits), np.split(scheme_ids, splits))
+            ]
+
+    return result
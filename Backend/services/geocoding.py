@@ -0,0 +1,334 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+
+from db import get_db_connection
+
+# ---------------------------------------------------------------------------
+# Geocoding service
+#
+# One entry point for every address → coordinates lookup:
+#   1. village / district centroids computed from already-geocoded claims
+#      (no network),
+#   2. in-memory LRU, then the geocode_cache table (migration 008),
+#   3. Nominatim, behind a token-bucket limiter (GEOCODE_RATE req/s; the
+#      public service allows 1 req/s, so divide by the number of API
+#      workers) with concurrent identical lookups coalesced into one call.
+# Coordinates are returned as "lat, lon" strings, "" when not found.
+# ---------------------------------------------------------------------------
+
+NOMINATIM_URL = os.getenv("NOMINATIM_URL", "https://nominatim.openstreetmap.org/search")
+NOMINATIM_USER_AGENT = os.getenv("NOMINATIM_USER_AGENT", "FRA-System/1.0")  # required by Nominatim
+GEOCODE_RATE = float(os.getenv("GEOCODE_RATE", "1.0"))  # requests per second, per process
+GEOCODE_TIMEOUT = float(os.getenv("GEOCODE_TIMEOUT", "10"))
+GEOCODE_NEGATIVE_TTL = float(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))  # seconds
+GEOCODE_MEMORY_SIZE = int(os.getenv("GEOCODE_MEMORY_SIZE", "4096"))
+CENTROID_TTL = float(os.getenv("CENTROID_TTL", "3600"))  # seconds between centroid rebuilds
+
+_WS_RE = re.compile(r"\s+")
+_COORDS_RE = re.compile(r"^-?\d+\.\d+,\s*-?\d+\.\d+$")
+_PINCODE_RE = re.compile(r"\b\d{6}\b")
+
+
+def normalize_address(address: str) -> str:
+    parts = [_WS_RE.sub(" ", p).strip() for p in (address or "").casefold().split(",")]
+    return ", ".join(p for p in parts if p)
+
+
+def _norm(value) -> str:
+    return _WS_RE.sub(" ", str(value or "")).strip().casefold()
+
+
+def format_coords(lat, lon) -> str:
+    return f"{lat}, {lon}"
+
+
+def is_valid_coordinates(coords: str) -> bool:
+    if not coords:
+        return False
+    return bool(_COORDS_RE.match(coords))
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if needed; returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class GeocodingService:
+    def __init__(self):
+        self._limiter = TokenBucket(GEOCODE_RATE)
+        self._memory = OrderedDict()  # address_key -> (coords, expires_at or None)
+        self._lock = threading.Lock()
+        self._inflight = {}  # address_key -> Future
+        self._centroids = None  # (villages, districts)
+        self._centroids_at = 0.0
+        self._centroid_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0, "db_hits": 0, "centroid_hits": 0, "network_calls": 0,
+            "network_errors": 0, "coalesced": 0, "not_found": 0, "throttle_wait_s": 0.0,
+        }
+
+    # ---- address lookups ----
+    def geocode_address(self, address: str) -> str:
+        key = normalize_address(address)
+        if not key:
+            return ""
+
+        cached = self._memory_get(key)
+        if cached is not None:
+            self._stats["memory_hits"] += 1
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            # someone is already resolving this address; share their answer
+            self._stats["coalesced"] += 1
+            return future.result()
+
+        try:
+            coords = self._lookup(key)
+            future.set_result(coords)
+            return coords
+        except Exception as e:
+            future.set_result("")
+            print("Geocoding error:", e)
+            return ""
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _lookup(self, key: str) -> str:
+        try:
+            row = self._db_get(key)
+        except Exception as e:
+            print("⚠️ Geocode cache read failed:", e)
+            row = None
+        if row is not None:
+            self._stats["db_hits"] += 1
+            coords, expires_at = row
+            self._memory_put(key, coords, expires_at)
+            return coords
+
+        coords = self._nominatim(key)
+        if coords is None:
+            return ""  # transport error: don't cache
+        if not coords:
+            self._stats["not_found"] += 1
+        expires_at = None if coords else time.monotonic() + GEOCODE_NEGATIVE_TTL
+        self._memory_put(key, coords, expires_at)
+        try:
+            self._db_put(key, coords)
+        except Exception as e:
+            print("⚠️ Geocode cache write failed:", e)
+        return coords
+
+    def _nominatim(self, key: str):
+        """"lat, lon", "" for no result, or None on a transport error."""
+        self._stats["throttle_wait_s"] += self._limiter.acquire()
+        self._stats["network_calls"] += 1
+        try:
+            resp = requests.get(
+                NOMINATIM_URL,
+                params={"q": key, "format": "json", "limit": 1},
+                headers={"User-Agent": NOMINATIM_USER_AGENT},
+                timeout=GEOCODE_TIMEOUT,
+            )
+            resp.raise_for_status()
+            results = resp.json()
+        except Exception as e:
+            self._stats["network_errors"] += 1
+            print("Geocoding error:", e)
+            return None
+        if results:
+            return format_coords(results[0]["lat"], results[0]["lon"])
+        return ""
+
+    # ---- cache tiers ----
+    def _memory_get(self, key):
+        with self._lock:
+            item = self._memory.get(key)
+            if item is None:
+                return None
+            coords, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return coords
+
+    def _memory_put(self, key, coords, expires_at):
+        with self._lock:
+            self._memory[key] = (coords, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > GEOCODE_MEMORY_SIZE:
+                self._memory.popitem(last=False)
+
+    def _db_get(self, key):
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT lat, lon, found, EXTRACT(EPOCH FROM (now() - created_at))
+                    FROM geocode_cache WHERE address_key = %s
+                    """,
+                    (key,),
+                )
+                row = cur.fetchone()
+        if row is None:
+            return None
+        lat, lon, found, age = row
+        if found:
+            return format_coords(lat, lon), None
+        remaining = GEOCODE_NEGATIVE_TTL - float(age)
+        if remaining <= 0:
+            return None  # expired miss: ask Nominatim again
+        return "", time.monotonic() + remaining
+
+    def _db_put(self, key, coords):
+        lat = lon = None
+        if coords:
+            lat, lon = (float(p) for p in coords.split(","))
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO geocode_cache (address_key, lat, lon, found) VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (address_key) DO UPDATE
+                        SET lat = EXCLUDED.lat, lon = EXCLUDED.lon,
+                            found = EXCLUDED.found, created_at = now()
+                    """,
+                    (key, lat, lon, bool(coords)),
+                )
+
+    # ---- offline centroids ----
+    def _load_centroids(self):
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT lower(btrim(village_name)), lower(btrim(district)), lower(btrim(state)),
+                           avg(lat), avg(lon), count(*)
+                    FROM fra_documents
+                    WHERE lat IS NOT NULL AND lon IS NOT NULL
+                    GROUP BY 1, 2, 3
+                    """
+                )
+                rows = cur.fetchall()
+        villages = {}
+        sums = {}
+        for village, district, state, lat, lon, n in rows:
+            if village:
+                villages[(village, district or "", state or "")] = format_coords(round(lat, 6), round(lon, 6))
+            if district:
+                acc = sums.setdefault((district, state or ""), [0.0, 0.0, 0])
+                acc[0] += lat * n
+                acc[1] += lon * n
+                acc[2] += n
+        districts = {
+            k: format_coords(round(la / n, 6), round(lo / n, 6)) for k, (la, lo, n) in sums.items()
+        }
+        return villages, districts
+
+    def _current_centroids(self):
+        if self._centroids is None or time.monotonic() - self._centroids_at > CENTROID_TTL:
+            with self._centroid_lock:
+                if self._centroids is None or time.monotonic() - self._centroids_at > CENTROID_TTL:
+                    try:
+                        self._centroids = self._load_centroids()
+                    except Exception as e:
+                        print("⚠️ Could not load place centroids:", e)
+                        self._centroids = self._centroids or ({}, {})
+                    self._centroids_at = time.monotonic()
+        return self._centroids
+
+    def village_centroid(self, village, district, state) -> str:
+        villages, _ = self._current_centroids()
+        coords = villages.get((_norm(village), _norm(district), _norm(state)), "")
+        if coords:
+            self._stats["centroid_hits"] += 1
+        return coords
+
+    def district_centroid(self, district, state) -> str:
+        _, districts = self._current_centroids()
+        coords = districts.get((_norm(district), _norm(state)), "")
+        if coords:
+            self._stats["centroid_hits"] += 1
+        return coords
+
+    # ---- claim-level resolution ----
+    def resolve_coordinates(self, data: dict) -> dict:
+        """Fill data["Coordinates"] when missing or invalid, cheapest source first."""
+        coords = str(data.get("Coordinates") or "").strip()
+        if is_valid_coordinates(coords):
+            return data
+
+        village, district, state = data.get("Village Name"), data.get("District"), data.get("State")
+        full_address = ", ".join(
+            filter(None, [data.get("Address", ""), village, data.get("Block", ""), district, state, "India"])
+        )
+
+        new_coords = ""
+        if village:
+            new_coords = self.village_centroid(village, district, state)
+        if not new_coords:
+            new_coords = self.geocode_address(full_address)
+        # If still empty, try District+State
+        if not new_coords and district and state:
+            new_coords = (self.district_centroid(district, state)
+                          or self.geocode_address(f"{district}, {state}, India"))
+        # If still empty, try pincode inside Address
+        if not new_coords:
+            pincode_match = _PINCODE_RE.search(full_address)
+            if pincode_match:
+                new_coords = self.geocode_address(pincode_match.group(0) + ", India")
+        # Last resort: village/block/district/state without the free-text address
+        if not new_coords:
+            short = ", ".join(p for p in [village, data.get("Block", ""), district, state] if p)
+            if short:
+                new_coords = self.geocode_address(short)
+
+        data["Coordinates"] = new_coords or coords
+        return data
+
+    def stats(self):
+        villages, districts = self._centroids or ({}, {})
+        return {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self._stats.items()},
+            "memory_size": len(self._memory),
+            "inflight": len(self._inflight),
+            "centroids": {"villages": len(villages), "districts": len(districts)},
+            "rate_per_s": GEOCODE_RATE,
+        }
+
+
+geocoder = GeocodingService()
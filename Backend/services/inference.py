@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+
+from services.inference_backends import create_backend
+from services.model_client import ModelClient, MODEL_SERVER_ADDRESS
+from utils import subsystems
+from utils.micro_batcher import MicroBatcher
+
+# ---------------------------------------------------------------------------
+# Land-use classifier inference
+#
+# The classifier is a lazily loaded subsystem (see utils/subsystems.py)
+# running on the backend named by INFERENCE_BACKEND: keras | tflite |
+# tflite-int8 (services/inference_backends.py).  Requests go through a
+# MicroBatcher, so concurrent /model/predict calls share one forward pass:
+# up to INFERENCE_MAX_BATCH images, waiting at most INFERENCE_MAX_WAIT_MS
+# for stragglers after the first arrives.
+#
+# With MODEL_SERVER_ADDRESS set, the "backend" is a client of the shared
+# model server (model_server.py): each batch goes over local IPC and this
+# worker never imports TensorFlow.
+# ---------------------------------------------------------------------------
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras")
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", "32"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "5"))
+
+
+def _load_backend():
+    if MODEL_SERVER_ADDRESS:
+        client = ModelClient(MODEL_SERVER_ADDRESS)
+        server = client.ping()  # fail readiness while the server is down
+        print(f"✅ Using model server at {MODEL_SERVER_ADDRESS} ({server['backend']['backend']})")
+        return client
+    backend = create_backend(INFERENCE_BACKEND)
+    print(f"✅ Classifier loaded ({backend.name}: {backend.path})")
+    return backend
+
+
+classifier = subsystems.register(
+    "model", _load_backend,
+    f"Model server at {MODEL_SERVER_ADDRESS}" if MODEL_SERVER_ADDRESS
+    else f"Land-use classifier ({INFERENCE_BACKEND} backend)",
+)
+
+
+def _predict_batch(batch: np.ndarray) -> np.ndarray:
+    return classifier.get().predict(batch)
+
+
+batcher = MicroBatcher(_predict_batch, INFERENCE_MAX_BATCH, INFERENCE_MAX_WAIT_MS, name="inference")
+
+
+def _single(img_array: np.ndarray) -> np.ndarray:
+    """Accept (H, W, C) or the legacy (1, H, W, C)."""
+    return img_array[0] if img_array.ndim == 4 else img_array
+
+
+def predict_probs(img_array: np.ndarray) -> np.ndarray:
+    """Class probabilities for one preprocessed image, via the shared batch."""
+    return batcher.predict(_single(img_array))
+
+
+async def apredict_probs(img_array: np.ndarray) -> np.ndarray:
+    return await batcher.apredict(_single(img_array))
+
+
+def stats():
+    info = {"model": classifier.info(), "batcher": batcher.stats()}
+    if classifier.state == subsystems.READY:
+        info["backend"] = classifier.get().info()
+    return info
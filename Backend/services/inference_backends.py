@@ -0,0 +1,140 @@
+import os
+import threading
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Inference backends for the land-use classifier
+#
+# `keras` runs best_model.h5 through full TensorFlow, behind a tf.function
+# with a fixed (None, 64, 64, 3) float32 signature so it is traced once.
+# `tflite` / `tflite-int8` run the exported model (scripts/export_tflite.py)
+# in the TFLite interpreter: `tflite_runtime` when installed (no TensorFlow
+# import at all), otherwise tf.lite.  The interpreter has static shapes, so
+# batches are padded up to a few fixed sizes with one interpreter each.
+#
+# Every backend runs a warm-up pass when loaded, so the first real request
+# does not pay for graph building or tensor allocation.
+# ---------------------------------------------------------------------------
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.getenv("MODEL_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "best_model.h5")))
+TFLITE_MODEL_PATH = os.getenv("TFLITE_MODEL_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "best_model.tflite")))
+TFLITE_INT8_MODEL_PATH = os.getenv(
+    "TFLITE_INT8_MODEL_PATH", os.path.normpath(os.path.join(BASE_DIR, "..", "best_model.int8.tflite")))
+TFLITE_THREADS = int(os.getenv("TFLITE_THREADS", str(os.cpu_count() or 1)))
+
+INPUT_SHAPE = (64, 64, 3)
+# fixed batch sizes the TFLite backend pads to (largest should match INFERENCE_MAX_BATCH)
+TFLITE_BATCH_SIZES = tuple(int(b) for b in os.getenv("TFLITE_BATCH_SIZES", "1,8,32").split(","))
+
+
+class KerasBackend:
+    name = "keras"
+
+    def __init__(self, path: str = MODEL_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file {path} not found. Place your Keras model there.")
+        import tensorflow as tf
+
+        self.path = path
+        self._model = tf.keras.models.load_model(path)
+        self._fn = tf.function(
+            lambda x: self._model(x, training=False),
+            input_signature=[tf.TensorSpec((None, *INPUT_SHAPE), tf.float32)],
+        )
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self._fn(np.asarray(batch, dtype=np.float32)).numpy()
+
+    def info(self):
+        return {"backend": self.name, "path": self.path}
+
+
+def _tflite_interpreter(path: str):
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=path, num_threads=TFLITE_THREADS)
+
+
+class TFLiteBackend:
+    name = "tflite"
+
+    def __init__(self, path: str = TFLITE_MODEL_PATH, batch_sizes=TFLITE_BATCH_SIZES):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} not found; create it with scripts/export_tflite.py")
+        self.path = path
+        self.batch_sizes = tuple(sorted(batch_sizes))
+        self._interpreters = {}
+        for size in self.batch_sizes:
+            interpreter = _tflite_interpreter(path)
+            interpreter.resize_tensor_input(interpreter.get_input_details()[0]["index"], (size, *INPUT_SHAPE))
+            interpreter.allocate_tensors()
+            self._interpreters[size] = interpreter
+        self._lock = threading.Lock()  # interpreters are not thread-safe
+        details = self._interpreters[self.batch_sizes[0]]
+        self._input = details.get_input_details()[0]
+        self._output = details.get_output_details()[0]
+
+    def _quantize(self, batch: np.ndarray) -> np.ndarray:
+        dtype = self._input["dtype"]
+        if dtype == np.float32:
+            return batch.astype(np.float32)
+        scale, zero_point = self._input["quantization"]
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    def _dequantize(self, out: np.ndarray) -> np.ndarray:
+        if self._output["dtype"] == np.float32:
+            return out
+        scale, zero_point = self._output["quantization"]
+        return (out.astype(np.float32) - zero_point) * scale
+
+    def _run(self, chunk: np.ndarray) -> np.ndarray:
+        n = len(chunk)
+        size = next(s for s in self.batch_sizes if s >= n)
+        if size > n:
+            chunk = np.concatenate([chunk, np.zeros((size - n, *INPUT_SHAPE), dtype=chunk.dtype)])
+        interpreter = self._interpreters[size]
+        interpreter.set_tensor(self._input["index"], self._quantize(chunk))
+        interpreter.invoke()
+        return self._dequantize(interpreter.get_tensor(self._output["index"]))[:n]
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        batch = np.asarray(batch, dtype=np.float32)
+        largest = self.batch_sizes[-1]
+        with self._lock:
+            return np.concatenate([self._run(batch[i:i + largest]) for i in range(0, len(batch), largest)])
+
+    def info(self):
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "batch_sizes": list(self.batch_sizes),
+            "input_dtype": np.dtype(self._input["dtype"]).name,
+        }
+
+
+class TFLiteInt8Backend(TFLiteBackend):
+    name = "tflite-int8"
+
+    def __init__(self, path: str = TFLITE_INT8_MODEL_PATH, batch_sizes=TFLITE_BATCH_SIZES):
+        super().__init__(path, batch_sizes)
+
+
+BACKENDS = {"keras": KerasBackend, "tflite": TFLiteBackend, "tflite-int8": TFLiteInt8Backend}
+
+
+def create_backend(name: str):
+    """Load and warm up a backend by name."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown INFERENCE_BACKEND {name!r}; choose one of {', '.join(BACKENDS)}")
+    backend = BACKENDS[name]()
+    # warm-up: trace the graph / touch every allocated interpreter once
+    for size in getattr(backend, "batch_sizes", (1,)):
+        backend.predict(np.zeros((size, *INPUT_SHAPE), dtype=np.float32))
+    return backend
@@ -0,0 +1,135 @@
+import atexit
+import os
+import threading
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# ---------------------------------------------------------------------------
+# Client for the shared model server (model_server.py)
+#
+# API workers that set MODEL_SERVER_ADDRESS do not load the classifier;
+# they write image tensors into a shared-memory segment and send only its
+# name and shape over a Unix socket.  The server answers with the class
+# probabilities.  Connections and segments are per thread (a
+# multiprocessing Connection is not thread-safe), so concurrent requests
+# from one worker arrive at the server together and share its batches.
+# ---------------------------------------------------------------------------
+
+MODEL_SERVER_ADDRESS = os.getenv("MODEL_SERVER_ADDRESS")  # Unix socket path, e.g. /tmp/fra-model.sock
+# shared secret for the socket handshake; required, since messages are pickled
+MODEL_SERVER_AUTHKEY = os.getenv("MODEL_SERVER_AUTHKEY", "").encode()
+MODEL_SERVER_TIMEOUT_S = float(os.getenv("MODEL_SERVER_TIMEOUT_S", "30"))
+
+
+class ModelServerError(RuntimeError):
+    """The model server is unreachable, timed out or reported an error."""
+
+
+def attach_segment(name: str) -> SharedMemory:
+    """Open a segment owned by another process without adopting it for cleanup."""
+    shm = SharedMemory(name=name)
+    # the creator unlinks it; without this our resource tracker would too
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def require_authkey() -> bytes:
+    if not MODEL_SERVER_AUTHKEY:
+        raise ModelServerError("MODEL_SERVER_AUTHKEY must be set (the same secret on server and workers)")
+    return MODEL_SERVER_AUTHKEY
+
+
+class ModelClient:
+    name = "model-server"
+
+    def __init__(self, address: str = MODEL_SERVER_ADDRESS, timeout_s: float = MODEL_SERVER_TIMEOUT_S):
+        require_authkey()
+        self.path = address
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+        self._segments = []  # every segment we created, unlinked at exit
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = self._local.conn = Client(self.path, family="AF_UNIX", authkey=MODEL_SERVER_AUTHKEY)
+            except OSError as e:
+                raise ModelServerError(f"cannot reach model server at {self.path}: {e}")
+        return conn
+
+    def _drop_conn(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+
+    def _segment(self, nbytes: int) -> SharedMemory:
+        shm = getattr(self._local, "shm", None)
+        if shm is None or shm.size < nbytes:
+            if shm is not None:
+                self._release(shm)
+            shm = self._local.shm = SharedMemory(create=True, size=nbytes)
+            with self._lock:
+                self._segments.append(shm)
+        return shm
+
+    def _release(self, shm: SharedMemory):
+        with self._lock:
+            if shm in self._segments:
+                self._segments.remove(shm)
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _call(self, message):
+        conn = self._conn()
+        try:
+            conn.send(message)
+            if not conn.poll(self.timeout_s):
+                raise TimeoutError(f"no reply within {self.timeout_s}s")
+            status, payload = conn.recv()
+        except (OSError, EOFError, TimeoutError) as e:
+            # the stream may hold a late reply now; start over on a fresh connection
+            self._drop_conn()
+            raise ModelServerError(f"model server: {e}")
+        if status != "ok":
+            raise ModelServerError(f"model server: {payload}")
+        return payload
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (N, 64, 64, 3) batch."""
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+        shm = self._segment(batch.nbytes)
+        np.ndarray(batch.shape, dtype=np.float32, buffer=shm.buf)[...] = batch
+        return self._call(("predict", shm.name, batch.shape))
+
+    def ping(self) -> dict:
+        return self._call(("ping",))
+
+    def info(self):
+        try:
+            return {"backend": self.name, "address": self.path, "server": self.ping()}
+        except ModelServerError as e:
+            return {"backend": self.name, "address": self.path, "error": str(e)}
+
+    def close(self):
+        self._drop_conn()
+        with self._lock:
+            segments, self._segments = self._segments, []
+        for shm in segments:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
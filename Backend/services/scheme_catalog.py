@@ -0,0 +1,191 @@
+import os
+import select
+import threading
+import time
+
+import psycopg2
+
+from db import DATABASE_URL, fetch_schemes
+
+# ---------------------------------------------------------------------------
+# In-process scheme catalog
+#
+# The schemes table is tiny and rarely written, so each worker keeps it in
+# memory, indexed by case-folded name and by id.  It is invalidated
+#   * locally, right after create_scheme inserts a row (write-through), and
+#   * in every worker via Postgres LISTEN/NOTIFY (migration 005),
+# with a TTL as a safety net in case the listener connection is down.
+# Returned scheme dicts are shared: treat them as read-only.
+# ---------------------------------------------------------------------------
+
+SCHEME_CATALOG_TTL = float(os.getenv("SCHEME_CATALOG_TTL", "300"))  # seconds
+NOTIFY_CHANNEL = "scheme_catalog_changed"
+
+
+class SchemeCatalog:
+    def __init__(self, loader=fetch_schemes, ttl=SCHEME_CATALOG_TTL):
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None  # (schemes, by_name, by_id)
+        self._loaded_at = 0.0
+        self._version = 0
+        self._stats = {"hits": 0, "loads": 0, "invalidations": 0}
+
+    def _current(self):
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._loaded_at < self._ttl:
+            self._stats["hits"] += 1
+            return snap
+        with self._lock:
+            # another thread may have reloaded while we waited
+            if self._snapshot is not None and time.monotonic() - self._loaded_at < self._ttl:
+                return self._snapshot
+            version = self._version
+            schemes = self._loader()
+            snap = (
+                schemes,
+                {s["name"].casefold(): s for s in schemes if s.get("name")},
+                {s["id"]: s for s in schemes},
+            )
+            # an invalidation that raced with the load wins: don't cache stale data
+            if version == self._version:
+                self._snapshot = snap
+                self._loaded_at = time.monotonic()
+            self._stats["loads"] += 1
+            return snap
+
+    def all(self):
+        return list(self._current()[0])
+
+    def get_by_name(self, name: str):
+        if not name:
+            return None
+        return self._current()[1].get(name.strip().casefold())
+
+    def get_by_id(self, scheme_id: int):
+        return self._current()[2].get(scheme_id)
+
+    @property
+    def version(self):
+        """Bumped on every invalidation; lets derived indexes know to rebuild."""
+        return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._version += 1
+            self._stats["invalidations"] += 1
+
+    def stats(self):
+        snap = self._snapshot
+        return {
+            **self._stats,
+            "loaded": snap is not None,
+            "schemes": len(snap[0]) if snap else 0,
+            "age_s": round(time.monotonic() - self._loaded_at, 1) if snap else None,
+            "ttl_s": self._ttl,
+        }
+
+
+catalog = SchemeCatalog()
+
+
+def list_schemes():
+    return catalog.all()
+
+
+def get_scheme(name: str):
+    return catalog.get_by_name(name)
+
+
+def get_scheme_by_id(scheme_id: int):
+    return catalog.get_by_id(scheme_id)
+
+
+def invalidate():
+    catalog.invalidate()
+
+
+# ---- Cross-worker invalidation (LISTEN/NOTIFY) ----
+
+# channel -> callbacks; other in-memory indexes (utils/gazetteer.py) register here
+_notify_handlers = {NOTIFY_CHANNEL: [catalog.invalidate]}
+
+
+def on_notify(channel: str, callback):
+    """Call `callback()` on every NOTIFY to `channel` (register before start_listener)."""
+    _notify_handlers.setdefault(channel, []).append(callback)
+
+
+def _dispatch(channels):
+    for channel in channels:
+        for callback in _notify_handlers.get(channel, ()):
+            callback()
+
+
+class _CatalogListener(threading.Thread):
+    def __init__(self):
+        super().__init__(name="scheme-catalog-listener", daemon=True)
+        self._stop_event = threading.Event()
+        self.connected = False
+
+    def run(self):
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            conn = None
+            try:
+                # dedicated connection: a LISTENing session can't go back to the pool
+                conn = psycopg2.connect(DATABASE_URL)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    for channel in _notify_handlers:
+                        cur.execute(f"LISTEN {channel}")
+                self.connected = True
+                backoff = 1.0
+                # anything may have changed while we were disconnected
+                _dispatch(list(_notify_handlers))
+                while not self._stop_event.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            channels = {n.channel for n in conn.notifies}
+                            conn.notifies.clear()
+                            _dispatch(channels)
+            except Exception as e:
+                print("⚠️ Scheme catalog listener error:", e)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60.0)
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_listener = None
+
+
+def start_listener():
+    """Start the NOTIFY listener (called from main.py startup)."""
+    global _listener
+    if _listener is None:
+        _listener = _CatalogListener()
+        _listener.start()
+
+
+def stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.join(timeout=5)
+        _listener = None
+
+
+def catalog_stats():
+    return {**catalog.stats(), "listener_connected": bool(_listener and _listener.connected)}
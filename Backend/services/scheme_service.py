@@ -1,97 +1,118 @@
-import re
 import psycopg2.extras
 from db import get_db_connection as get_conn
-from utils.llm_utils import convert_area_to_acres
-
-
-def parse_acres_from_text(area_text: str) -> float:
-    """Convert any area text (e.g. '2.5 acres') to float acres."""
-    if not area_text:
-        return 0.0
-    m = re.search(r"([\d\.]+)", str(area_text))
-    if not m:
-        return 0.0
-    return float(m.group(1))
-
-
-def normalize_gender(g: str) -> str:
-    """Normalize gender strings into 'male' / 'female' / 'other'."""
-    if not g:
-        return ""
-    g = g.lower().strip()
-    if g.startswith("m"):
-        return "male"
-    if g.startswith("f"):
-        return "female"
-    if g.startswith("o"):
-        return "other"
-    return g
-
-
-def matches_criteria(record: dict, criteria: dict) -> bool:
-    """Check if one DB record satisfies the scheme eligibility rules."""
-
-    # --- Age ---
-    age = None
-    if record.get("age"):  # DB column `age`
-        try:
-            age = int(re.search(r"\d+", str(record["age"])).group(0))
-        except Exception:
-            age = None
-
-    if criteria.get("min_age") is not None:
-        if age is None or age < int(criteria["min_age"]):
-            return False
-
-    if criteria.get("max_age") is not None:
-        if age is None or age > int(criteria["max_age"]):
-            return False
-
-    # --- State ---
-    if criteria.get("state"):
-        if not record.get("state") or criteria["state"].strip().lower() != record["state"].strip().lower():
-            return False
-
-    # --- Gender ---
-    if criteria.get("gender"):
-        if normalize_gender(criteria["gender"]) != normalize_gender(record.get("gender", "")):
-            return False
-
-    # --- Land area ---
-    if criteria.get("min_land_area_acres") is not None:
-        area_text = record.get("total_area_claimed", "")
-        acres = parse_acres_from_text(area_text)
-        if acres < float(criteria["min_land_area_acres"]):
-            return False
-
-    return True
-
-
-def find_eligible_people_by_scheme(
-    scheme_record: dict,
-    village: str = None,
-    district: str = None,
-    state: str = None
-):
-    q = "SELECT * FROM fra_documents WHERE 1=1"
+from utils.claim_fields import normalize_gender
+
+
+# ---------------------------------------------------------------------------
+# Eligibility rules → SQL
+#
+# Rules read the typed columns filled at ingest (utils/claim_fields.py);
+# run scripts/backfill_typed_columns.py after migration 004 so older rows
+# have them too.
+# ---------------------------------------------------------------------------
+
+# eligibility key -> (clause, value coercion).  `None` values are ignored.
+# Add new keys here; each clause takes exactly one parameter.
+ELIGIBILITY_RULES = {
+    "min_age": ("age_years >= %s", int),
+    "max_age": ("age_years <= %s", int),
+    "state": ("lower(btrim(state)) = %s", lambda v: str(v).strip().lower()),
+    "gender": ("gender_code::text = %s", normalize_gender),
+    "min_land_area_acres": ("COALESCE(area_acres, 0) >= %s", float),
+}
+
+# keys the SQL compiler treats as "no constraint" when empty, like the old matcher
+SKIP_IF_FALSY = {"state", "gender"}
+
+
+def compile_eligibility(criteria: dict):
+    """
+    Compile a scheme's `eligibility` JSON into a parameterized WHERE
+    fragment (starting with ' AND ...') and its parameters.
+    """
+    sql = ""
+    params = []
+    for key, value in (criteria or {}).items():
+        rule = ELIGIBILITY_RULES.get(key)
+        if rule is None:
+            print(f"⚠️ Unknown eligibility key ignored: {key}")
+            continue
+        if value is None or (key in SKIP_IF_FALSY and not value):
+            continue
+        clause, coerce = rule
+        sql += f" AND {clause}"
+        params.append(coerce(value))
+    return sql, params
+
+
+def build_region_filter(village: str = None, district: str = None, state: str = None):
+    sql = ""
     params = []
 
     if village:
-        q += " AND village_name ILIKE %s"
+        sql += " AND village_name ILIKE %s"
         params.append(f"%{village}%")
 
     if district:
-        q += " AND district ILIKE %s"
+        sql += " AND district ILIKE %s"
         params.append(f"%{district}%")
 
     if state:
-        q += " AND state ILIKE %s"
+        sql += " AND state ILIKE %s"
         params.append(f"%{state}%")
 
+    return sql, params
+
+
+def build_eligibility_query(scheme_record: dict, village=None, district=None, state=None):
+    region_sql, region_params = build_region_filter(village, district, state)
+    rules_sql, rules_params = compile_eligibility(scheme_record.get("eligibility", {}) or {})
+    return "WHERE 1=1" + region_sql + rules_sql, region_params + rules_params
+
+
+def find_eligible_people_by_scheme(
+    scheme_record: dict,
+    village: str = None,
+    district: str = None,
+    state: str = None,
+    limit: int = None,
+):
+    where, params = build_eligibility_query(scheme_record, village, district, state)
+    q = f"SELECT * FROM fra_documents {where} ORDER BY id"
+    if limit is not None:
+        q += " LIMIT %s"
+        params.append(limit)
+
+    with get_conn() as conn:
+        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(q, tuple(params))
+            return cur.fetchall()
+
+
+def count_and_sample_eligible(
+    scheme_record: dict,
+    village: str = None,
+    district: str = None,
+    state: str = None,
+    sample_size: int = 5,
+):
+    """Exact match count plus the first `sample_size` (>= 1) rows, in one query."""
+    where, params = build_eligibility_query(scheme_record, village, district, state)
+    q = (
+        f"SELECT *, count(*) OVER () AS _total FROM fra_documents {where} "
+        "ORDER BY id LIMIT %s"
+    )
+    params.append(sample_size)
+
     with get_conn() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
             cur.execute(q, tuple(params))
             rows = cur.fetchall()
 
-    criteria = scheme_record.get("eligibility", {}) or {}
-    return [r for r in rows if matches_criteria(r, criteria)]
+    if not rows:
+        return 0, []
+
+    total = rows[0]["_total"]
+    for r in rows:
+        r.pop("_total", None)
+    return total, rows
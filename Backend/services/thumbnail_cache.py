@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.disk_cache import DiskCache
+
+# ---------------------------------------------------------------------------
+# Satellite thumbnail cache
+#
+# Thumbnails are keyed on what determines their pixels: the imagery source,
+# the AOI polygon (rounded to THUMBNAIL_COORD_DECIMALS, ~1 m at 5), the
+# Earth Engine date range and the thumbnail size.  Repeat predictions for
+# the same claim skip Earth Engine and the download entirely.  Writes
+# happen behind the request on one background thread; until a write lands
+# the bytes are served from memory.  Storage is the size-bounded LRU DiskCache.
+# ---------------------------------------------------------------------------
+
+THUMBNAIL_CACHE_DIR = os.getenv("THUMBNAIL_CACHE_DIR", "cache/thumbnails")
+THUMBNAIL_CACHE_MAX_BYTES = int(os.getenv("THUMBNAIL_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+THUMBNAIL_COORD_DECIMALS = int(os.getenv("THUMBNAIL_COORD_DECIMALS", "5"))
+
+# bump if the imagery recipe (collection, bands, cloud filter, vis) changes
+THUMBNAIL_RECIPE_VERSION = 1
+
+
+def thumbnail_key(polygon, start_date: str, end_date: str, dim: int, source: str = "earth_engine") -> str:
+    """Content key for the thumbnail of `polygon` ([(lon, lat), ...])."""
+    rounded = [[round(lon, THUMBNAIL_COORD_DECIMALS), round(lat, THUMBNAIL_COORD_DECIMALS)] for lon, lat in polygon]
+    raw = json.dumps([THUMBNAIL_RECIPE_VERSION, source, rounded, start_date, end_date, dim], separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ThumbnailCache:
+    def __init__(self, directory: str = THUMBNAIL_CACHE_DIR, max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES):
+        self.store = DiskCache(directory, max_bytes)
+        self._pending = {}  # key -> bytes not yet on disk
+        self._lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="thumb-writer")
+        self._stats = {"memory_hits": 0, "write_errors": 0}
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._pending.get(key)
+        if data is not None:
+            self._stats["memory_hits"] += 1
+            return data
+        return self.store.get(f"{key}.png")
+
+    def put_async(self, key: str, data: bytes):
+        """Queue the write; the caller does not wait for the disk."""
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = data
+        self._writer.submit(self._write, key, data)
+
+    def _write(self, key: str, data: bytes):
+        try:
+            self.store.put(f"{key}.png", data)
+        except Exception as e:
+            self._stats["write_errors"] += 1
+            print("⚠️ Thumbnail cache write failed:", e)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def discard(self, key: str):
+        """Drop an entry that turned out to be unusable."""
+        with self._lock:
+            self._pending.pop(key, None)
+        self.store.delete(f"{key}.png")
+
+    def path(self, key: str):
+        """On-disk path of a cached thumbnail, or None."""
+        path = self.store.path_for(f"{key}.png")
+        return path if os.path.exists(path) else None
+
+    def flush(self):
+        """Wait for queued writes (shutdown)."""
+        self._writer.shutdown(wait=True)
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="thumb-writer")
+
+    def stats(self):
+        disk = self.store.stats()
+        hits = disk["hits"] + self._stats["memory_hits"]
+        lookups = hits + disk["misses"]
+        return {
+            **disk,
+            **self._stats,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+            "pending_writes": len(self._pending),
+        }
+
+
+thumbnails = ThumbnailCache()
@@ -0,0 +1,352 @@
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from db import get_db_connection, run_db, _json_serializer
+from services import document_dedup
+from services.upload_pipeline import aextract_stage, geocode_stage, insert_document
+from utils.ocr_utils import ocr_document
+from utils.ocr_engine import get_ocr_pool, shutdown_ocr_pool, OCR_WORKERS
+from utils.llm_client import LLM_CONCURRENCY
+
+# ---------------------------------------------------------------------------
+# Background upload jobs
+#
+# POST /upload/ stores the file under UPLOAD_DIR, records an upload_jobs row
+# (migration 007) and returns 202.  The pipeline then runs in this worker:
+# OCR on the pool of resident OCR engines (CPU bound), LLM extraction as
+# async calls bounded by the LLM client (utils/llm_client.py), geocoding on
+# its own bounded thread pool, the INSERT on the DB executor.
+# Job state lives in Postgres, so any API worker can answer
+# GET /upload/jobs/{id}.  Uploads whose content hash is already stored
+# return the existing doc_id instead of a job, and OCR / extraction results
+# are reused from the content-addressed cache (services/document_dedup.py).
+# Each worker heartbeats into upload_workers (migration 010); on startup a
+# worker only takes over jobs whose owner has stopped heartbeating.
+# ---------------------------------------------------------------------------
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+GEOCODE_CONCURRENCY = int(os.getenv("GEOCODE_CONCURRENCY", "1"))  # Nominatim allows ~1 req/s
+# a worker silent this long is presumed dead and its queued/running jobs are reclaimed
+STALE_JOB_SECONDS = int(os.getenv("STALE_JOB_SECONDS", "600"))
+WORKER_HEARTBEAT_S = float(os.getenv("WORKER_HEARTBEAT_S", str(min(30, STALE_JOB_SECONDS / 4))))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+_executors = {}
+_tasks = set()
+_heartbeat_task = None
+
+
+def start():
+    """Create the stage pools (called from main.py startup)."""
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    if not _executors:
+        _executors["ocr"] = get_ocr_pool()
+        _executors["geocode"] = ThreadPoolExecutor(GEOCODE_CONCURRENCY, thread_name_prefix="geocode")
+
+
+async def stop():
+    """Let in-flight jobs finish, then shut the pools down."""
+    global _heartbeat_task
+    if _tasks:
+        await asyncio.gather(*list(_tasks), return_exceptions=True)
+    if _heartbeat_task is not None:
+        _heartbeat_task.cancel()
+        _heartbeat_task = None
+        try:
+            await run_db(_retire_worker)
+        except Exception as e:
+            print("⚠️ Could not remove upload worker heartbeat:", e)
+    for stage, executor in _executors.items():
+        if stage != "ocr":
+            executor.shutdown(wait=True)
+    _executors.clear()
+    shutdown_ocr_pool()
+
+
+def executor_for(stage: str):
+    if not _executors:
+        start()
+    return _executors[stage]
+
+
+# ---- Job rows ----
+
+def _create_job(job_id: str, filename: str, file_path: str):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO upload_jobs (id, filename, file_path, owner) VALUES (%s, %s, %s, %s)",
+                (job_id, filename, file_path, WORKER_ID),
+            )
+
+
+def _update_job(job_id: str, stage_info: dict = None, **fields):
+    sets = ["updated_at = now()"]
+    params = []
+    for column, value in fields.items():
+        if column == "result":
+            value = json.dumps(value, default=_json_serializer)
+        sets.append(f"{column} = %s")
+        params.append(value)
+    if stage_info:
+        sets.append("stages = stages || %s::jsonb")
+        params.append(json.dumps(stage_info))
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"UPDATE upload_jobs SET {', '.join(sets)} WHERE id = %s", params + [job_id])
+
+
+def get_job(job_id: str):
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT id, filename, status, stage, stages, doc_id, result, error,
+                       created_at, updated_at
+                FROM upload_jobs WHERE id = %s
+                """,
+                (job_id,),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            columns = [desc[0] for desc in cur.description]
+    job = dict(zip(columns, row))
+    job["id"] = str(job["id"])
+    return job
+
+
+def _heartbeat():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                INSERT INTO upload_workers (worker_id, heartbeat_at) VALUES (%s, now())
+                ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = now()
+                """,
+                (WORKER_ID,),
+            )
+
+
+def _retire_worker():
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM upload_workers WHERE worker_id = %s", (WORKER_ID,))
+
+
+async def _heartbeat_loop():
+    while True:
+        await asyncio.sleep(WORKER_HEARTBEAT_S)
+        try:
+            await run_db(_heartbeat)
+        except Exception as e:
+            print("⚠️ Upload worker heartbeat failed:", e)
+
+
+async def start_heartbeat():
+    """Record this worker as alive now and keep doing so (startup hook)."""
+    global _heartbeat_task
+    try:
+        await run_db(_heartbeat)
+    except Exception as e:
+        print("⚠️ Upload worker heartbeat failed:", e)
+    if _heartbeat_task is None:
+        _heartbeat_task = asyncio.create_task(_heartbeat_loop())
+
+
+def _claim_stale_jobs():
+    """
+    Take over jobs whose owner stopped heartbeating (row-level, so each goes
+    to one worker).  Queued jobs of a live owner are left alone however long
+    they have been waiting.
+    """
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE upload_jobs j SET owner = %s, status = 'queued', updated_at = now()
+                WHERE j.status IN ('queued', 'running')
+                  AND j.owner IS DISTINCT FROM %s
+                  AND j.updated_at < now() - make_interval(secs => %s)
+                  AND NOT EXISTS (
+                      SELECT 1 FROM upload_workers w
+                      WHERE w.worker_id = j.owner
+                        AND w.heartbeat_at > now() - make_interval(secs => %s)
+                  )
+                RETURNING j.id, j.file_path
+                """,
+                (WORKER_ID, WORKER_ID, STALE_JOB_SECONDS, STALE_JOB_SECONDS),
+            )
+            return [(str(r[0]), r[1]) for r in cur.fetchall()]
+
+
+# ---- Pipeline ----
+
+async def _run_stage(job_id: str, stage: str, fn, *args):
+    await run_db(_update_job, job_id, {stage: {"status": "running"}}, status="running", stage=stage)
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    try:
+        if stage == "insert":
+            result = await run_db(fn, *args)
+        elif stage == "ocr":
+            # pages fan out across the OCR pool
+            result = await fn(*args, executor_for("ocr"))
+        elif asyncio.iscoroutinefunction(fn):
+            result = await fn(*args)
+        else:
+            result = await loop.run_in_executor(executor_for(stage), fn, *args)
+    except Exception as e:
+        info = {"status": "failed", "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+        await run_db(_update_job, job_id, {stage: info}, status="failed", error=f"{stage}: {e}")
+        raise
+    info = {"status": "done", "duration_ms": round((time.perf_counter() - started) * 1000, 1)}
+    await run_db(_update_job, job_id, {stage: info})
+    return result
+
+
+async def _mark_cached(job_id: str, *stages):
+    await run_db(_update_job, job_id, {stage: {"status": "cached"} for stage in stages})
+
+
+def _fail_job(job_id: str, error: str):
+    """Mark a job failed, keeping the more specific error a stage already recorded."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                UPDATE upload_jobs
+                SET status = 'failed', error = COALESCE(error, %s), updated_at = now()
+                WHERE id = %s
+                """,
+                (error, job_id),
+            )
+
+
+def _remove_upload(file_path: str):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ Could not remove upload {file_path}:", e)
+
+
+async def run_job(job_id: str, file_path: str, phash: int = None):
+    loop = asyncio.get_running_loop()
+    settled = False
+    try:
+        digest = await loop.run_in_executor(None, document_dedup.content_hash, file_path)
+        if phash is None and document_dedup.PHASH_ENABLED:
+            phash = await loop.run_in_executor(None, document_dedup.perceptual_hash, file_path)
+
+        data = await loop.run_in_executor(None, document_dedup.cached_extraction, digest)
+        if data is not None:
+            await _mark_cached(job_id, "ocr", "extract")
+        else:
+            ocr_text = await loop.run_in_executor(None, document_dedup.cached_ocr, digest)
+            if ocr_text is not None:
+                await _mark_cached(job_id, "ocr")
+            else:
+                ocr_text = await _run_stage(job_id, "ocr", ocr_document, file_path)
+                await loop.run_in_executor(None, document_dedup.store_ocr, digest, ocr_text)
+            data = await _run_stage(job_id, "extract", aextract_stage, ocr_text)
+            # results produced while the LLM was unavailable are not worth keeping
+            if data.get("_extraction", {}).get("source") != "fallback":
+                await loop.run_in_executor(None, document_dedup.store_extraction, digest, data)
+
+        data = await _run_stage(job_id, "geocode", geocode_stage, data)
+        doc_id = await _run_stage(job_id, "insert", insert_document, data, digest, phash)
+        await run_db(_update_job, job_id, status="succeeded", stage=None, doc_id=doc_id, result=data)
+        settled = True
+    except Exception as e:
+        print(f"⚠️ Upload job {job_id} failed:", e)
+        try:
+            await run_db(_fail_job, job_id, f"{type(e).__name__}: {e}")
+            settled = True
+        except Exception as db_error:
+            # left queued/running: resume_stale_jobs retries it, so keep the file
+            print(f"⚠️ Could not mark upload job {job_id} failed:", db_error)
+    finally:
+        if settled:
+            await loop.run_in_executor(None, _remove_upload, file_path)
+
+
+def _schedule(job_id: str, file_path: str, phash: int = None):
+    task = asyncio.create_task(run_job(job_id, file_path, phash))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def find_duplicate(file_bytes: bytes, near_duplicates: bool = False):
+    """
+    The stored document this upload duplicates, as {"match", "doc_id", "data"},
+    or None.  Returns the perceptual hash too so the job does not recompute it.
+    """
+    loop = asyncio.get_running_loop()
+    digest = await loop.run_in_executor(None, document_dedup.content_hash, file_bytes)
+    doc = await run_db(document_dedup.find_document_by_hash, digest)
+    if doc is not None:
+        return {"match": "exact", "doc_id": doc["id"], "data": doc}, None
+    if not near_duplicates:
+        return None, None
+    phash = await loop.run_in_executor(None, document_dedup.perceptual_hash, file_bytes)
+    near = await run_db(document_dedup.find_near_duplicate, phash)
+    if near is not None:
+        doc, distance = near
+        return {"match": "perceptual", "distance": distance, "doc_id": doc["id"], "data": doc}, phash
+    return None, phash
+
+
+async def submit_upload(filename: str, file_bytes: bytes, near_duplicates: bool = False) -> dict:
+    """
+    Persist the upload, record the job and start its pipeline.  Returns
+    {"status": "queued", "job_id"} or, for content already stored,
+    {"status": "duplicate", "doc_id", ...} without running anything.
+    """
+    duplicate, phash = await find_duplicate(file_bytes, near_duplicates)
+    if duplicate is not None:
+        return {"status": "duplicate", **duplicate}
+
+    job_id = str(uuid.uuid4())
+    ext = os.path.splitext(filename or "")[1][:10]
+    file_path = os.path.join(UPLOAD_DIR, f"{job_id}{ext}")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+    def _write():
+        with open(file_path, "wb") as fh:
+            fh.write(file_bytes)
+
+    await asyncio.get_running_loop().run_in_executor(None, _write)
+    await run_db(_create_job, job_id, filename, file_path)
+    _schedule(job_id, file_path, phash)
+    return {"status": "queued", "job_id": job_id}
+
+
+async def resume_stale_jobs():
+    """Restart orphaned jobs whose file is still on this host (startup hook)."""
+    try:
+        jobs = await run_db(_claim_stale_jobs)
+    except Exception as e:
+        print("⚠️ Could not check for stale upload jobs:", e)
+        return
+    for job_id, file_path in jobs:
+        if os.path.exists(file_path):
+            _schedule(job_id, file_path)
+        else:
+            await run_db(_update_job, job_id, status="failed", error="upload file missing on resume")
+
+
+def stats():
+    return {
+        "in_flight": len(_tasks),
+        "ocr_workers": OCR_WORKERS,
+        "llm_concurrency": LLM_CONCURRENCY,
+        "geocode_concurrency": GEOCODE_CONCURRENCY,
+    }
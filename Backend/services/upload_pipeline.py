@@ -0,0 +1,161 @@
+import psycopg2.extras
+
+from db import get_db_connection
+from utils.claim_fields import typed_fields, PARSER_VERSION
+from utils.gazetteer import gazetteer
+from utils.llm_utils import clean_with_llm, aclean_with_llm, aclean_many_with_llm  # rules first, LLM when needed
+from services.geocoding import geocoder
+
+# ---------------------------------------------------------------------------
+# Upload pipeline stages: OCR → LLM extraction → geocoding → INSERT
+#
+# Each stage is a plain blocking function so callers can run it inline, on
+# a thread pool or (OCR) on a process pool.  Extraction also has async
+# forms that go through the deadline/breaker-guarded LLM client.
+# ---------------------------------------------------------------------------
+
+STAGES = ("ocr", "extract", "geocode", "insert")
+
+
+def get_coordinates_from_address(address: str):
+    """Returns "lat, lon" or "" if not found (cached, rate-limited Nominatim)."""
+    return geocoder.geocode_address(address)
+
+
+DOCUMENT_COLUMNS = """
+    patta_holder_name, father_or_husband_name, age, gender, address,
+    village_name, block, district, state, total_area_claimed,
+    coordinates, land_use, claim_id, date_of_application,
+    water_bodies, forest_cover, homestead,
+    age_years, area_acres, gender_code, lat, lon, typed_version,
+    content_sha256, phash
+"""
+
+# the same scan uploaded twice (or concurrently) maps onto the existing row
+ON_DUPLICATE = "ON CONFLICT (content_sha256) WHERE content_sha256 IS NOT NULL DO NOTHING"
+
+INSERT_DOCUMENT_SQL = f"""
+INSERT INTO fra_documents ({DOCUMENT_COLUMNS}
+) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+          %s, %s, %s, %s, %s, %s, %s, %s)
+{ON_DUPLICATE}
+RETURNING id;
+"""
+
+# multi-row form for psycopg2.extras.execute_values
+INSERT_DOCUMENTS_SQL = (
+    f"INSERT INTO fra_documents ({DOCUMENT_COLUMNS}) VALUES %s {ON_DUPLICATE} RETURNING id, content_sha256"
+)
+
+
+def document_values(data: dict, content_sha256: str = None, phash: int = None) -> tuple:
+    """Map the extracted JSON onto INSERT_DOCUMENT_SQL's column order."""
+    typed = typed_fields(data)
+    return (
+        str(data.get("Patta-Holder Name") or ""),
+        str(data.get("Father/Husband Name") or ""),
+        str(data.get("Age") or ""),
+        str(data.get("Gender") or ""),
+        str(data.get("Address") or ""),
+        str(data.get("Village Name") or ""),
+        str(data.get("Block") or ""),
+        str(data.get("District") or ""),
+        str(data.get("State") or ""),
+        str(data.get("Total Area Claimed") or ""),
+        data.get("Coordinates", ""),
+        str(data.get("Land Use") or ""),
+        str(data.get("Claim ID") or ""),
+        str(data.get("Date of Application") or ""),
+        str(data.get("Water bodies") or ""),
+        str(data.get("Forest cover") or ""),
+        str(data.get("Homestead") or ""),
+        typed["age_years"],
+        typed["area_acres"],
+        typed["gender_code"],
+        typed["lat"],
+        typed["lon"],
+        PARSER_VERSION,
+        content_sha256,
+        phash,
+    )
+
+
+def _ids_by_hash(cur, digests: list) -> dict:
+    cur.execute(
+        "SELECT content_sha256, id FROM fra_documents WHERE content_sha256 = ANY(%s)",
+        (list(digests),),
+    )
+    return dict(cur.fetchall())
+
+
+def insert_document(data: dict, content_sha256: str = None, phash: int = None) -> int:
+    """Insert one document; returns the existing id if the same content is already stored."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(INSERT_DOCUMENT_SQL, document_values(data, content_sha256, phash))
+            row = cur.fetchone()
+            if row is None:
+                return _ids_by_hash(cur, [content_sha256])[content_sha256]
+            doc_id = row[0]
+    # new village/district names become resolvable by the DSS fast path
+    gazetteer.invalidate_places()
+    return doc_id
+
+
+def insert_documents(rows: list, hashes: list = None, phashes: list = None) -> list:
+    """
+    Insert many extracted documents in one statement; returns ids in input
+    order.  Rows whose content hash is already stored get the existing id.
+    """
+    if not rows:
+        return []
+    hashes = hashes or [None] * len(rows)
+    phashes = phashes or [None] * len(rows)
+    values = [document_values(d, h, p) for d, h, p in zip(rows, hashes, phashes)]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # one page keeps it one statement; skipped conflicts return nothing
+            returned = psycopg2.extras.execute_values(
+                cur, INSERT_DOCUMENTS_SQL, values, page_size=len(rows), fetch=True,
+            )
+            by_hash = {digest: doc_id for doc_id, digest in returned if digest}
+            missing = [h for h in hashes if h and h not in by_hash]
+            if missing:
+                by_hash.update(_ids_by_hash(cur, missing))
+    # un-hashed rows always insert, and RETURNING keeps their VALUES order
+    unhashed = iter([doc_id for doc_id, digest in returned if not digest])
+    ids = [by_hash[h] if h else next(unhashed) for h in hashes]
+    gazetteer.invalidate_places()
+    return ids
+
+
+def _checked(data: dict) -> dict:
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    return data
+
+
+def extract_stage(ocr_text: str) -> dict:
+    """LLM extraction with rule fallback; raises if the JSON is unusable."""
+    return _checked(clean_with_llm(ocr_text, geocode=False))
+
+
+async def aextract_stage(ocr_text: str) -> dict:
+    """Async `extract_stage`."""
+    return _checked(await aclean_with_llm(ocr_text))
+
+
+async def aextract_many(ocr_texts: list) -> list:
+    """Extract many documents with one batched LLM call; a dict or exception per text."""
+    results = []
+    for data in await aclean_many_with_llm(ocr_texts):
+        try:
+            results.append(_checked(data))
+        except RuntimeError as e:
+            results.append(e)
+    return results
+
+
+def geocode_stage(data: dict) -> dict:
+    """Ensure data["Coordinates"]: centroids, then cached/rate-limited Nominatim lookups."""
+    return geocoder.resolve_coordinates(data)
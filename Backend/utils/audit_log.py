@@ -0,0 +1,147 @@
+import os
+import queue
+import threading
+import time
+
+from db import write_dss_logs
+
+# ---------------------------------------------------------------------------
+# Asynchronous, batched writer for dss_logs
+#
+# Request handlers enqueue audit events and return immediately; a background
+# thread flushes them with one multi-row INSERT when AUDIT_BATCH_SIZE events
+# are waiting or AUDIT_FLUSH_INTERVAL seconds have passed.  When Postgres
+# falls behind and the queue is full, new events are dropped and counted
+# rather than slowing requests down.
+# ---------------------------------------------------------------------------
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))  # seconds
+AUDIT_MAX_RETRIES = 3
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    def __init__(self, maxsize=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE,
+                 flush_interval=AUDIT_FLUSH_INTERVAL, sink=write_dss_logs):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._sink = sink
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0, "written": 0, "dropped": 0, "failed": 0,
+            "batches": 0, "retries": 0, "queue_high_water": 0, "last_flush_ms": 0.0,
+        }
+
+    # ---- producer side ----
+    def enqueue(self, user_query: str, parsed: dict, scheme_id, count: int, sample: list) -> bool:
+        """Queue one audit event; returns False if it was dropped."""
+        event = {
+            "user_query": user_query,
+            "parsed": parsed,
+            "scheme_id": scheme_id,
+            "count": count,
+            "sample": sample,  # JSON-encoded later, on the writer thread
+        }
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._stats["dropped"] += 1
+            return False
+        self._stats["enqueued"] += 1
+        depth = self._queue.qsize()
+        if depth > self._stats["queue_high_water"]:
+            self._stats["queue_high_water"] = depth
+        return True
+
+    # ---- writer thread ----
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything still queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            batch, stopping = self._collect()
+            if batch:
+                self._flush(batch)
+            if stopping:
+                return
+
+    def _collect(self):
+        """Block for the first event, then gather until size or time trigger."""
+        batch = []
+        first = self._queue.get()
+        if first is _STOP:
+            return self._drain(batch), True
+        batch.append(first)
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return self._drain(batch), True
+            batch.append(item)
+        return batch, False
+
+    def _drain(self, batch):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch
+            if item is not _STOP:
+                batch.append(item)
+
+    def _flush(self, batch):
+        for start in range(0, len(batch), self._batch_size):
+            chunk = batch[start:start + self._batch_size]
+            for attempt in range(AUDIT_MAX_RETRIES):
+                started = time.perf_counter()
+                try:
+                    self._sink(chunk)
+                except Exception as e:
+                    if attempt + 1 == AUDIT_MAX_RETRIES:
+                        self._stats["failed"] += len(chunk)
+                        print(f"⚠️ Dropping {len(chunk)} DSS log events:", e)
+                        break
+                    self._stats["retries"] += 1
+                    time.sleep(0.5 * 2 ** attempt)
+                    continue
+                self._stats["written"] += len(chunk)
+                self._stats["batches"] += 1
+                self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                break
+
+    def stats(self):
+        return {
+            **self._stats,
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "running": bool(self._thread and self._thread.is_alive()),
+        }
+
+
+audit_log = AuditLogWriter()
@@ -0,0 +1,171 @@
+import re
+from typing import Optional, Tuple
+
+# -------------------------
+# Typed claim fields
+#
+# One parser for the free-text OCR values (age, area, gender, coordinates),
+# used at ingest and by the backfill job.  `parse_frame` is the vectorized
+# (pandas) twin of `typed_fields` and must stay semantically identical.
+# -------------------------
+
+# Bump when parsing rules change; the backfill job re-parses older rows.
+# Add a migration re-creating fra_documents_untyped_idx for the new version
+# (see migrations/014_untyped_idx_v3.sql) so the backfill stays indexed.
+PARSER_VERSION = 3
+
+ACRES_PER_M2 = 0.000247105
+M2_PER_ACRE = 4046.8564224
+
+# -------------------------
+# Conversion factors to acres
+# -------------------------
+UNIT_TO_ACRE = {
+    "acre": 1.0, "acres": 1.0,
+    "hectare": 2.47105, "hectares": 2.47105, "ha": 2.47105,
+    "sq m": ACRES_PER_M2, "sqm": ACRES_PER_M2, "m2": ACRES_PER_M2, "m": ACRES_PER_M2,
+    "sq mtr": ACRES_PER_M2, "mtr": ACRES_PER_M2, "mtrs": ACRES_PER_M2,
+    "meter": ACRES_PER_M2, "meters": ACRES_PER_M2, "metre": ACRES_PER_M2, "metres": ACRES_PER_M2,
+    "sq meter": ACRES_PER_M2, "sq meters": ACRES_PER_M2, "sq metre": ACRES_PER_M2, "sq metres": ACRES_PER_M2,
+    "square meter": ACRES_PER_M2, "square meters": ACRES_PER_M2,
+    "square metre": ACRES_PER_M2, "square metres": ACRES_PER_M2,
+    "sq ft": 2.2957e-5, "sqft": 2.2957e-5, "square feet": 2.2957e-5,
+    "bigha": 0.619, "cent": 0.0247, "guntha": 0.0247
+}
+# aliases as token tuples, longest first so "sq m" wins over a bare "sq ..." or "m"
+_UNIT_ALIASES = sorted(((tuple(a.split()), f) for a, f in UNIT_TO_ACRE.items()), key=lambda kv: -len(kv[0]))
+
+GENDERS = ("male", "female", "other")
+
+AGE_RE = re.compile(r"(\d+)")
+AREA_RE = re.compile(r"(\d+(?:\.\d+)?)\s*([A-Za-z][A-Za-z .²]*)?")
+COORD_RE = re.compile(r"(-?\d+(?:\.\d+)?)[,\s]+(-?\d+(?:\.\d+)?)")
+# digit-group commas ("2,500", "1,00,000"); a comma before a space is a separator
+THOUSANDS_RE = re.compile(r"(?<=\d),(?=(?:\d{2},)*\d{3}(?!\d))")
+
+MAX_AGE = 130
+
+
+def parse_age(text) -> Optional[int]:
+    """First integer in the text, if it is a plausible age."""
+    if text is None:
+        return None
+    m = AGE_RE.search(str(text))
+    if not m:
+        return None
+    age = int(m.group(1))
+    return age if 0 < age <= MAX_AGE else None
+
+
+def unit_to_acre_factor(unit: Optional[str]) -> float:
+    """
+    Acre conversion factor for a unit label, matched on whole words at its
+    start ("4000 m" is square metres, "2 acres approx" is acres); no or
+    unknown unit means acres.
+    """
+    if not unit:
+        return 1.0
+    tokens = tuple(unit.lower().replace(".", " ").replace("²", "2").split())
+    for alias, factor in _UNIT_ALIASES:
+        if tokens[:len(alias)] == alias:
+            return factor
+    return 1.0
+
+
+def parse_area_acres(text) -> Optional[float]:
+    """Unit-aware area parser: '0.5 ha', '2,500 sq m', '2 acres' -> acres."""
+    if text is None:
+        return None
+    m = AREA_RE.search(THOUSANDS_RE.sub("", str(text)))
+    if not m:
+        return None
+    return round(float(m.group(1)) * unit_to_acre_factor(m.group(2)), 4)
+
+
+def normalize_gender(g: str) -> str:
+    """Normalize gender strings into 'male' / 'female' / 'other'."""
+    if not g:
+        return ""
+    g = g.lower().strip()
+    if g.startswith("m"):
+        return "male"
+    if g.startswith("f"):
+        return "female"
+    if g.startswith("o"):
+        return "other"
+    return g
+
+
+def gender_code(g) -> Optional[str]:
+    """`claim_gender` enum value, or None when the text is not recognised."""
+    g = normalize_gender(str(g) if g is not None else "")
+    return g if g in GENDERS else None
+
+
+def parse_coordinates(text) -> Optional[Tuple[float, float]]:
+    """
+    Parse 'lat, lon' or 'lon, lat' into (lat, lon).  If the first value
+    cannot be a latitude but the second can, the pair is treated as swapped.
+    Pairs outside latitude/longitude range are rejected.
+    """
+    if text is None:
+        return None
+    m = COORD_RE.search(str(text))
+    if not m:
+        return None
+    a, b = float(m.group(1)), float(m.group(2))
+    if not (-90 <= a <= 90) and -90 <= b <= 90:
+        a, b = b, a
+    if not (-90 <= a <= 90 and -180 <= b <= 180):
+        return None
+    return a, b
+
+
+def typed_fields(data: dict) -> dict:
+    """Typed column values for one extracted document (LLM JSON keys)."""
+    coords = parse_coordinates(data.get("Coordinates"))
+    return {
+        "age_years": parse_age(data.get("Age")),
+        "area_acres": parse_area_acres(data.get("Total Area Claimed")),
+        "gender_code": gender_code(data.get("Gender")),
+        "lat": coords[0] if coords else None,
+        "lon": coords[1] if coords else None,
+    }
+
+
+def parse_frame(df):
+    """
+    Vectorized `typed_fields` over a DataFrame with the raw text columns
+    `age`, `total_area_claimed`, `gender`, `coordinates`.  Returns a new
+    DataFrame with the typed columns (NaN/None where unparseable).
+    """
+    import numpy as np
+    import pandas as pd
+
+    out = pd.DataFrame(index=df.index)
+
+    age = pd.to_numeric(df["age"].astype("string").str.extract(AGE_RE.pattern)[0], errors="coerce")
+    out["age_years"] = age.where((age > 0) & (age <= MAX_AGE)).astype("Int64")
+
+    area = (
+        df["total_area_claimed"].astype("string")
+        .str.replace(THOUSANDS_RE.pattern, "", regex=True)
+        .str.extract(AREA_RE.pattern)
+    )
+    value = pd.to_numeric(area[0], errors="coerce")
+    # few distinct unit labels, so map the uniques rather than every row
+    factor = area[1].map(unit_to_acre_factor, na_action="ignore").fillna(1.0).astype(float)
+    out["area_acres"] = (value * factor).round(4)
+
+    g = df["gender"].astype("string").str.strip().str.lower().str[:1]
+    out["gender_code"] = g.map({"m": "male", "f": "female", "o": "other"})
+
+    coords = df["coordinates"].astype("string").str.extract(COORD_RE.pattern)
+    a = pd.to_numeric(coords[0], errors="coerce").to_numpy(dtype=float)
+    b = pd.to_numeric(coords[1], errors="coerce").to_numpy(dtype=float)
+    swapped = ~((a >= -90) & (a <= 90)) & (b >= -90) & (b <= 90)
+    lat, lon = np.where(swapped, b, a), np.where(swapped, a, b)
+    valid = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+    out["lat"] = np.where(valid, lat, np.nan)
+    out["lon"] = np.where(valid, lon, np.nan)
+    return out
@@ -0,0 +1,114 @@
+import os
+import threading
+
+# ---------------------------------------------------------------------------
+# Content-addressed on-disk cache with size-based LRU eviction
+#
+# Entries are files named after their key (fanned out into 2-character
+# sub-directories).  Reads bump the file's mtime, and when the total size
+# exceeds `max_bytes` the least recently used files are deleted.  Writes go
+# through a temp file + os.replace, so concurrent processes never see a
+# partial entry.
+# ---------------------------------------------------------------------------
+
+
+class DiskCache:
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk, computed lazily
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str):
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            self._stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except OSError:
+            pass
+        self._stats["hits"] += 1
+        return data
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def put(self, key: str, data: bytes):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = 0
+        os.replace(tmp, path)
+        self._stats["writes"] += 1
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        path = self.path_for(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Delete least recently used entries down to 90% of max_bytes."""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        size = sum(e[1] for e in entries)
+        target = self.max_bytes * 0.9
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            size -= entry_size
+            self._stats["evictions"] += 1
+        self._size = size
+
+    def stats(self):
+        hits, misses = self._stats["hits"], self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "directory": self.directory,
+        }
@@ -0,0 +1,194 @@
+import os
+import re
+from typing import Dict, Tuple
+
+from utils.claim_fields import parse_age, parse_area_acres, gender_code, parse_coordinates
+
+# -------------------------
+# Rule-based form extraction
+#
+# Printed FRA claim forms carry "Label: value" lines that OCR reads
+# cleanly.  One precompiled pattern finds every known label; each OCR line
+# is scanned once and the text between a label and the next one becomes
+# that field's value.  Every field gets a confidence in [0, 1] from how the
+# label was matched and whether the value validates, so callers can decide
+# whether the LLM is needed at all.
+# -------------------------
+
+FIELDS = (
+    "Patta-Holder Name", "Father/Husband Name", "Age", "Gender", "Address",
+    "Village Name", "Block", "District", "State", "Total Area Claimed",
+    "Coordinates", "Land Use", "Claim ID", "Date of Application",
+    "Water bodies", "Forest cover", "Homestead",
+)
+
+# fields that must validate before the LLM round-trip is skipped
+REQUIRED_FIELDS = (
+    "Patta-Holder Name", "Father/Husband Name", "Age", "Gender",
+    "Village Name", "District", "State", "Total Area Claimed", "Claim ID",
+)
+MIN_CONFIDENCE = float(os.getenv("RULE_MIN_CONFIDENCE", "0.8"))
+
+# label spellings seen on the forms, longest alternative first
+LABELS = {
+    "Patta-Holder Name": r"patta[\s\-]*holder(?:'?s)?\s*name|name\s+of\s+(?:the\s+)?patta[\s\-]*holder|claimant(?:'?s)?\s+name",
+    "Father/Husband Name": r"(?:father|husband)(?:\s*/\s*(?:father|husband))?(?:'?s)?\s*name",
+    "Age": r"age",
+    "Gender": r"gender|sex",
+    "Address": r"address",
+    "Village Name": r"village\s*name|village",
+    "Block": r"block|tehsil|taluka",
+    "District": r"district",
+    "State": r"state",
+    "Total Area Claimed": r"total\s+area\s+claimed|total\s+area|area\s+claimed",
+    "Coordinates": r"coordinates|gps|lat(?:itude)?\s*/\s*lon(?:g(?:itude)?)?",
+    "Land Use": r"land\s*use",
+    "Claim ID": r"claim\s*(?:id|no\.?|number)",
+    "Date of Application": r"date\s+of\s+application|application\s+date",
+    "Water bodies": r"water\s*bodies",
+    "Forest cover": r"forest\s*cover",
+    "Homestead": r"homestead",
+}
+_GROUPS = {f"f{i}": field for i, field in enumerate(FIELDS)}
+
+# a label starts a line or follows a column gap / separator, and ends at a word boundary
+LABEL_RE = re.compile(
+    r"(?:^|(?<=\s\s)|(?<=[|;,\t]))\s*(?:"
+    + "|".join(f"(?P<f{i}>{LABELS[field]})" for i, field in enumerate(FIELDS))
+    + r")\b\s*(?P<sep>[:\-–=])?\s*",
+    re.IGNORECASE,
+)
+
+_NAME_RE = re.compile(r"^[A-Za-z][A-Za-z .']{1,80}$")
+_PLACE_RE = re.compile(r"^[A-Za-z][A-Za-z .\-()]{1,60}$")
+_CLAIM_ID_RE = re.compile(r"^(?=.*\d)[A-Za-z0-9/\-_.]{3,40}$")
+_DATE_RE = re.compile(
+    r"^(\d{1,2}[/\-.]\d{1,2}[/\-.]\d{2,4}|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}\s+[A-Za-z]{3,9},?\s+\d{4})$"
+)
+_STRIP = " \t:-–=|;,"
+
+
+def _name(v):
+    return v if _NAME_RE.match(v) else None
+
+
+def _place(v):
+    v = re.sub(r"^of\s+", "", v, flags=re.IGNORECASE)
+    return v if _PLACE_RE.match(v) else None
+
+
+def _age(v):
+    return str(parse_age(v)) if parse_age(v) is not None else None
+
+
+def _gender(v):
+    g = gender_code(v)
+    return g.capitalize() if g else None
+
+
+def _area(v):
+    return v if parse_area_acres(v) is not None else None
+
+
+def _coordinates(v):
+    coords = parse_coordinates(v)
+    if coords is None or not (-90 <= coords[0] <= 90 and -180 <= coords[1] <= 180):
+        return None
+    return f"{coords[0]}, {coords[1]}"
+
+
+def _claim_id(v):
+    return v if _CLAIM_ID_RE.match(v) else None
+
+
+def _date(v):
+    return v if _DATE_RE.match(v) else None
+
+
+def _text(v):
+    return v if 0 < len(v) <= 200 else None
+
+
+# field -> validator returning the normalized value, or None if it does not validate
+VALIDATORS = {
+    "Patta-Holder Name": _name,
+    "Father/Husband Name": _name,
+    "Age": _age,
+    "Gender": _gender,
+    "Address": _text,
+    "Village Name": _place,
+    "Block": _place,
+    "District": _place,
+    "State": _place,
+    "Total Area Claimed": _area,
+    "Coordinates": _coordinates,
+    "Land Use": _text,
+    "Claim ID": _claim_id,
+    "Date of Application": _date,
+    "Water bodies": _text,
+    "Forest cover": _text,
+    "Homestead": _text,
+}
+
+
+def _score(value: str, field: str, has_sep: bool, next_line: bool) -> Tuple[str, float]:
+    normalized = VALIDATORS[field](value)
+    confidence = 1.0 if has_sep else 0.7
+    if next_line:
+        confidence *= 0.8  # value printed under its label
+    if normalized is None:
+        return value, round(confidence * 0.3, 2)
+    return normalized, round(confidence, 2)
+
+
+def extract_fields(text: str) -> Tuple[Dict[str, str], Dict[str, float]]:
+    """
+    Single pass over the OCR lines.  Returns (data, confidence): data has
+    every FIELDS key ("" when not found, same shape as the LLM output) and
+    confidence maps each field to 0.0 (missing) .. 1.0 (labelled and valid).
+    """
+    data = {field: "" for field in FIELDS}
+    confidence = {field: 0.0 for field in FIELDS}
+    lines = (text or "").splitlines()
+
+    for n, line in enumerate(lines):
+        matches = [
+            m for m in LABEL_RE.finditer(line)
+            # mid-line labels need an explicit separator ("Age: 42")
+            if m.group("sep") or not line[:m.start()].strip()
+        ]
+        for i, m in enumerate(matches):
+            field = next(_GROUPS[g] for g in _GROUPS if m.group(g))
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(line)
+            value = line[m.end():end].strip(_STRIP)
+            next_line = False
+            if not value and i + 1 == len(matches) and n + 1 < len(lines):
+                below = lines[n + 1].strip(_STRIP)
+                if below and not LABEL_RE.match(lines[n + 1]):
+                    value, next_line = below, True
+            if not value:
+                continue
+
+            value, score = _score(value, field, bool(m.group("sep")), next_line)
+            if data[field] and data[field] != value:
+                # conflicting values: keep the better one, trust neither fully
+                if score > confidence[field]:
+                    data[field] = value
+                confidence[field] = round(max(score, confidence[field]) * 0.5, 2)
+            elif score > confidence[field]:
+                data[field], confidence[field] = value, score
+
+    return data, confidence
+
+
+def is_confident(confidence: Dict[str, float], required=REQUIRED_FIELDS, threshold: float = MIN_CONFIDENCE) -> bool:
+    """True when every required field was found and validated."""
+    return all(confidence.get(field, 0.0) >= threshold for field in required)
+
+
+def fill_missing(data: dict, rules: dict, confidence: Dict[str, float], threshold: float = 0.5) -> dict:
+    """Fill fields the LLM left empty with rule-extracted values that validated."""
+    for field, value in rules.items():
+        if value and not data.get(field) and confidence.get(field, 0.0) >= threshold:
+            data[field] = value
+    return data
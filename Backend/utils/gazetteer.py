@@ -0,0 +1,217 @@
+import os
+import re
+import threading
+import time
+
+from db import get_db_connection
+from services.scheme_catalog import catalog, on_notify
+
+# ---------------------------------------------------------------------------
+# Gazetteer fast path for DSS questions
+#
+# A token trie over scheme names (from the scheme catalog) and the distinct
+# village / district / state names in fra_documents.  A question is answered
+# locally only when it names exactly one scheme, every place resolves to a
+# single kind, and no unknown words are left over; anything else goes to
+# the LLM.  The trie is rebuilt when the scheme catalog is invalidated, when
+# fra_documents changes (NOTIFY from migration 011, in every worker), or
+# after GAZETTEER_TTL seconds.  Only the first build blocks a request:
+# rebuilds run on a background thread while the old trie keeps serving, and
+# document changes trigger one at most every GAZETTEER_MIN_REBUILD_S.
+# ---------------------------------------------------------------------------
+
+GAZETTEER_TTL = float(os.getenv("GAZETTEER_TTL", "300"))  # seconds
+GAZETTEER_MIN_REBUILD_S = float(os.getenv("GAZETTEER_MIN_REBUILD_S", "30"))
+PLACES_CHANNEL = "fra_places_changed"
+
+PLACE_KINDS = ("village", "district", "state")
+
+# Words that may appear around the entities without changing the meaning.
+# Anything outside this list (and outside the gazetteer) forces the LLM path.
+FILLER_WORDS = frozenset("""
+    a all am an and any are at be beneficiaries beneficiary can claimant claimants
+    claim claims count eligible eligibility find for from get give holder holders
+    how i in is list many me of people person persons please qualify qualifies
+    scheme schemes show tell the there under who whom which what with yojana
+""".split())
+
+# "Mandla district" / "village Bhimganga": a kind word next to a place name
+KIND_HINTS = {"village": "village", "gram": "village", "district": "district",
+              "zila": "district", "state": "state"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str):
+    return _TOKEN_RE.findall((text or "").casefold())
+
+
+class _Trie:
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children = {}
+        self.entries = None  # {(kind, value)} for a complete phrase
+
+    def add(self, tokens, kind, value):
+        node = self
+        for t in tokens:
+            node = node.children.setdefault(t, _Trie())
+        if node.entries is None:
+            node.entries = {}
+        # first spelling seen wins as the canonical value
+        node.entries.setdefault(kind, value)
+
+    def longest_match(self, tokens, start):
+        """(end, entries) of the longest phrase starting at `start`, or None."""
+        node, best = self, None
+        for i in range(start, len(tokens)):
+            node = node.children.get(tokens[i])
+            if node is None:
+                break
+            if node.entries:
+                best = (i + 1, node.entries)
+        return best
+
+
+def load_places():
+    """Distinct (village, district, state) names from fra_documents."""
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT DISTINCT btrim(village_name), btrim(district), btrim(state)
+                FROM fra_documents
+                """
+            )
+            return cur.fetchall()
+
+
+class Gazetteer:
+    def __init__(self, ttl=GAZETTEER_TTL, min_rebuild_s=GAZETTEER_MIN_REBUILD_S):
+        self._ttl = ttl
+        self._min_rebuild_s = min_rebuild_s
+        self._lock = threading.Lock()
+        self._trie = None
+        self._built_at = 0.0
+        self._catalog_version = None
+        self._places_dirty = False
+        self._rebuilding = False
+        self._stats = {"builds": 0, "resolved": 0, "unresolved": 0, "build_ms": 0.0, "build_errors": 0}
+
+    def invalidate_places(self):
+        self._places_dirty = True
+
+    def _build(self):
+        started = time.perf_counter()
+        version = catalog.version
+        self._places_dirty = False  # changes from here on need another build
+        trie = _Trie()
+        for s in catalog.all():
+            tokens = tokenize(s.get("name"))
+            if tokens:
+                trie.add(tokens, "scheme", s["name"])
+        for row in load_places():
+            for kind, value in zip(PLACE_KINDS, row):
+                tokens = tokenize(value)
+                if tokens:
+                    trie.add(tokens, kind, value)
+        self._trie = trie
+        self._built_at = time.monotonic()
+        self._catalog_version = version
+        self._stats["builds"] += 1
+        self._stats["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    def _stale(self):
+        age = time.monotonic() - self._built_at
+        return (
+            self._catalog_version != catalog.version
+            or age > self._ttl
+            or (self._places_dirty and age >= self._min_rebuild_s)
+        )
+
+    def _rebuild_in_background(self):
+        try:
+            self._build()
+        except Exception as e:
+            self._stats["build_errors"] += 1
+            self._built_at = time.monotonic()  # keep serving; retry after the min interval
+            self._places_dirty = True
+            print("⚠️ Gazetteer rebuild failed:", e)
+        finally:
+            self._rebuilding = False
+
+    def _current(self):
+        if self._trie is None:
+            with self._lock:
+                if self._trie is None:
+                    self._build()
+        elif self._stale() and not self._rebuilding:
+            with self._lock:
+                if self._rebuilding:
+                    return self._trie
+                self._rebuilding = True
+            threading.Thread(target=self._rebuild_in_background, name="gazetteer-rebuild", daemon=True).start()
+        return self._trie
+
+    def resolve(self, query: str):
+        """
+        {scheme, village, district, state} when the question is unambiguous
+        and fully understood, else None.
+        """
+        trie = self._current()
+        tokens = tokenize(query)
+        result = {"scheme": None, "village": None, "district": None, "state": None}
+        places = []  # (entries, hinted kind)
+        i = 0
+        while i < len(tokens):
+            match = trie.longest_match(tokens, i)
+            if match is None:
+                if tokens[i] not in FILLER_WORDS and tokens[i] not in KIND_HINTS:
+                    return self._miss()  # unknown word: maybe a place we don't know
+                i += 1
+                continue
+            end, entries = match
+            if "scheme" in entries:
+                if len(entries) > 1 or result["scheme"] not in (None, entries["scheme"]):
+                    return self._miss()  # scheme that is also a place, or two schemes
+                result["scheme"] = entries["scheme"]
+            else:
+                hint = None
+                if i > 0 and tokens[i - 1] in KIND_HINTS:
+                    hint = KIND_HINTS[tokens[i - 1]]
+                if end < len(tokens) and tokens[end] in KIND_HINTS:
+                    hint = KIND_HINTS[tokens[end]]
+                places.append((entries, hint))
+            i = end
+
+        if result["scheme"] is None:
+            return self._miss()
+
+        for entries, hint in places:
+            kinds = [k for k in PLACE_KINDS if k in entries]
+            if hint in kinds:
+                kinds = [hint]
+            if len(kinds) != 1 or result[kinds[0]] not in (None, entries[kinds[0]]):
+                return self._miss()  # ambiguous place, or two values for one kind
+            result[kinds[0]] = entries[kinds[0]]
+
+        self._stats["resolved"] += 1
+        return result
+
+    def _miss(self):
+        self._stats["unresolved"] += 1
+        return None
+
+    def stats(self):
+        return {
+            **self._stats,
+            "age_s": round(time.monotonic() - self._built_at, 1) if self._trie else None,
+            "ttl_s": self._ttl,
+            "places_dirty": self._places_dirty,
+            "rebuilding": self._rebuilding,
+        }
+
+
+gazetteer = Gazetteer()
+on_notify(PLACES_CHANNEL, gazetteer.invalidate_places)
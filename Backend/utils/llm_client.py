@@ -0,0 +1,333 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+# -------------------------
+# LLM client layer
+#
+# Every Gemini call goes through an LLMClient wrapping a LangChain runnable:
+# bounded concurrency, a per-call deadline, a small retry budget, a circuit
+# breaker and a latency histogram.  When the breaker is open (or the
+# deadline passes) callers get LLMUnavailable immediately and take their
+# regex / rule path instead of hanging with a slow upstream.
+#
+# GEMINI_API_ENDPOINT points the client at another host (for example
+# scripts/fake_llm_server.py) over REST.
+# -------------------------
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT")  # e.g. http://127.0.0.1:8090
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "20"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "1"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_S = float(os.getenv("LLM_BREAKER_RESET_S", "30"))
+
+# upper bounds in ms; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, math.inf)
+
+
+class LLMUnavailable(RuntimeError):
+    """The call was not made or did not finish in time (breaker open, deadline, errors)."""
+
+
+def gemini_kwargs() -> dict:
+    """Keyword arguments for ChatGoogleGenerativeAI, honouring GEMINI_API_ENDPOINT."""
+    kwargs = {
+        "model": GEMINI_MODEL,
+        "temperature": 0,
+        "google_api_key": os.getenv("GEMINI_API_KEY"),
+        "timeout": LLM_TIMEOUT_S,
+        "max_retries": 0,  # retries are budgeted by LLMClient
+    }
+    if GEMINI_API_ENDPOINT:
+        kwargs["client_options"] = {"api_endpoint": GEMINI_API_ENDPOINT}
+        kwargs["transport"] = "rest"
+    return kwargs
+
+
+class LatencyHistogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total_ms = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, ms: float):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if ms <= bound:
+                    self.counts[i] += 1
+                    break
+            self.total_ms += ms
+            self.count += 1
+
+    def quantile(self, q: float):
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {("+Inf" if math.isinf(b) else str(b)): n for b, n in zip(self.buckets, self.counts)},
+        }
+
+
+class CircuitBreaker:
+    """
+    closed → open after `failures` consecutive failures; open rejects calls
+    for `reset_s`, then half-open lets one probe through.
+    """
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, reset_s: float = LLM_BREAKER_RESET_S):
+        self.failures = failures
+        self.reset_s = reset_s
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self._probe_id = 0
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                self._probe_id += 1
+                return True
+            return False
+
+    @property
+    def probe_id(self):
+        """Id of the half-open probe in flight, or None."""
+        return self._probe_id if self._probing else None
+
+    def abandon(self, probe_id):
+        """
+        The call admitted as probe `probe_id` ended without an outcome
+        (cancelled, or its deadline ran out before an attempt); let the
+        next call probe instead of staying open forever.
+        """
+        with self._lock:
+            if probe_id is not None and self._probing and self._probe_id == probe_id:
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                if self._opened_at is None or self._probing:
+                    self.opened += 1
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class LLMClient:
+    """Deadline-, concurrency- and breaker-guarded access to one runnable (chain)."""
+
+    def __init__(self, name: str, runnable=None, load=None, timeout_s: float = LLM_TIMEOUT_S,
+                 concurrency: int = LLM_CONCURRENCY, retries: int = LLM_RETRIES):
+        """Pass the runnable, or `load` to build it on first use."""
+        self.name = name
+        self._runnable = runnable
+        self._load = load
+        self.timeout_s = timeout_s
+        self.concurrency = concurrency
+        self.retries = retries
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyHistogram()
+        self.outcomes = {"ok": 0, "timeout": 0, "error": 0, "rejected": 0}
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix=f"llm-{name}")
+        self._semaphore = None  # created on first async use, inside the running loop
+
+    @property
+    def runnable(self):
+        if self._runnable is None:
+            try:
+                self._runnable = self._load()
+            except Exception as e:
+                raise LLMUnavailable(f"{self.name}: client unavailable ({e})")
+        return self._runnable
+
+    async def _aresolve(self):
+        """`runnable` without blocking the event loop on first use."""
+        if self._runnable is None:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.runnable)
+        return self._runnable
+
+    def _admit(self):
+        """Raise when the breaker rejects the call; returns the probe id if this call is the probe."""
+        if not self.breaker.allow():
+            self.outcomes["rejected"] += 1
+            raise LLMUnavailable(f"{self.name}: circuit open")
+        return self.breaker.probe_id
+
+    def _record(self, started: float, error: Exception = None):
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        if error is None:
+            self.outcomes["ok"] += 1
+            self.breaker.record_success()
+            return
+        self.outcomes["timeout" if isinstance(error, (FutureTimeout, asyncio.TimeoutError)) else "error"] += 1
+        self.breaker.record_failure()
+
+    def _attempts(self, deadline: float):
+        """Yield the remaining time for each attempt the retry budget and deadline allow."""
+        for _ in range(self.retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            yield remaining
+
+    # ---- sync ----
+
+    def invoke(self, value, timeout_s: float = None):
+        runnable = self.runnable
+        probe = self._admit()
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        error = None
+        try:
+            for remaining in self._attempts(deadline):
+                started = time.perf_counter()
+                future = self._executor.submit(runnable.invoke, value)
+                try:
+                    result = future.result(timeout=remaining)
+                except Exception as e:
+                    future.cancel()
+                    self._record(started, e)
+                    error = e
+                    if isinstance(e, FutureTimeout) or self.breaker.state == "open":
+                        break
+                    continue
+                self._record(started)
+                return result
+        finally:
+            self.breaker.abandon(probe)
+        raise LLMUnavailable(f"{self.name}: {type(error).__name__ if error else 'deadline'} {error or ''}".strip())
+
+    def batch(self, values: list, timeout_s: float = None) -> list:
+        """Results (or LLMUnavailable) per input, via runnable.batch."""
+        if not values:
+            return []
+        runnable = self.runnable
+        probe = self._admit()
+        waves = math.ceil(len(values) / self.concurrency)
+        started = time.perf_counter()
+        try:
+            future = self._executor.submit(
+                runnable.batch, values,
+                config={"max_concurrency": self.concurrency}, return_exceptions=True,
+            )
+            try:
+                results = future.result(timeout=(timeout_s or self.timeout_s) * waves)
+            except Exception as e:
+                self._record(started, e)
+                return [LLMUnavailable(f"{self.name}: {type(e).__name__}")] * len(values)
+            return self._batch_results(results, started)
+        finally:
+            self.breaker.abandon(probe)
+
+    def _batch_results(self, results: list, started: float) -> list:
+        out = []
+        for r in results:
+            if isinstance(r, Exception):
+                self._record(started, r)
+                out.append(LLMUnavailable(f"{self.name}: {r}"))
+            else:
+                self._record(started)
+                out.append(r)
+        return out
+
+    # ---- async ----
+
+    def _sem(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def ainvoke(self, value, timeout_s: float = None):
+        runnable = await self._aresolve()
+        probe = self._admit()
+        deadline = time.monotonic() + (timeout_s or self.timeout_s)
+        error = None
+        try:
+            async with self._sem():
+                for remaining in self._attempts(deadline):
+                    started = time.perf_counter()
+                    try:
+                        result = await asyncio.wait_for(runnable.ainvoke(value), remaining)
+                    except Exception as e:
+                        self._record(started, e)
+                        error = e
+                        if isinstance(e, asyncio.TimeoutError) or self.breaker.state == "open":
+                            break
+                        continue
+                    self._record(started)
+                    return result
+        finally:
+            # cancelled, or the deadline ran out waiting for a slot
+            self.breaker.abandon(probe)
+        raise LLMUnavailable(f"{self.name}: {type(error).__name__ if error else 'deadline'} {error or ''}".strip())
+
+    async def abatch(self, values: list, timeout_s: float = None) -> list:
+        """Async `batch`: one runnable.abatch call, deadline scaled by the number of waves."""
+        if not values:
+            return []
+        runnable = await self._aresolve()
+        probe = self._admit()
+        waves = math.ceil(len(values) / self.concurrency)
+        started = time.perf_counter()
+        try:
+            results = await asyncio.wait_for(
+                runnable.abatch(values, config={"max_concurrency": self.concurrency}, return_exceptions=True),
+                (timeout_s or self.timeout_s) * waves,
+            )
+        except Exception as e:
+            self._record(started, e)
+            return [LLMUnavailable(f"{self.name}: {type(e).__name__}")] * len(values)
+        finally:
+            self.breaker.abandon(probe)
+        return self._batch_results(results, started)
+
+    def stats(self):
+        return {
+            "breaker": self.breaker.state,
+            "breaker_opened": self.breaker.opened,
+            "timeout_s": self.timeout_s,
+            "concurrency": self.concurrency,
+            "outcomes": dict(self.outcomes),
+            "latency": self.latency.snapshot(),
+        }
@@ -1,14 +1,15 @@
 import json
 import re
 import os
-import requests
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-# Added imports for DSS
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import Runnable
-from db import fetch_schemes
+from services.scheme_catalog import list_schemes
+from utils.query_cache import dss_query_cache
+from utils.gazetteer import gazetteer
+from utils.claim_fields import parse_area_acres
+from utils.form_extractor import extract_fields, is_confident, fill_missing
+from utils.llm_client import LLMClient, LLMUnavailable, gemini_kwargs
+from utils import subsystems
+from services.geocoding import geocoder, is_valid_coordinates  # noqa: F401
 from typing import Dict, Any
 
 # -------------------------
@@ -17,24 +18,6 @@ from typing import Dict, Any
 load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0,
-    google_api_key=GEMINI_API_KEY
-)
-
-# -------------------------
-# Conversion factors to acres
-# -------------------------
-UNIT_TO_ACRE = {
-    "acre": 1.0, "acres": 1.0,
-    "hectare": 2.47105, "hectares": 2.47105, "ha": 2.47105,
-    "sq m": 0.000247105, "sqm": 0.000247105,
-    "square meter": 0.000247105, "square meters": 0.000247105,
-    "sq ft": 2.2957e-5, "sqft": 2.2957e-5, "square feet": 2.2957e-5,
-    "bigha": 0.619, "cent": 0.0247, "guntha": 0.0247
-}
-
 # -------------------------
 # Prompt Template (OCR → JSON Schema)
 # -------------------------
@@ -72,8 +55,7 @@ JSON Format:
 OCR Text:
 {ocr_text}
 """
-prompt = PromptTemplate.from_template(SCHEMA_PROMPT)
-chain = prompt | llm
+extraction_client = LLMClient("extract", load=lambda: gemini.get()["chain"])
 
 # -------------------------
 # JSON Cleaning
@@ -99,121 +81,120 @@ def safe_json_parse(text: str) -> dict:
         except Exception:
             return {"raw_text": text, "error": "LLM JSON parse failed"}
 
-# -------------------------
-# Regex Fallback
-# -------------------------
-def fallback_extract(data: dict, text: str) -> dict:
-    patterns = {
-        "Patta-Holder Name": r"Patta[- ]Holder Name[:\-]?\s*(.+)",
-        "Father/Husband Name": r"(Father|Husband) Name[:\-]?\s*(.+)",
-        "Age": r"Age[:\-]?\s*(\d+)",
-        "Gender": r"Gender[:\-]?\s*(Male|Female|Other)",
-        "Address": r"Address[:\-]?\s*(.+)",
-        "Village Name": r"Village Name[:\-]?\s*(.+)",
-        "Block": r"Block[:\-]?\s*(.+)",
-        "District": r"District[:\-]?\s*(.+)",
-        "State": r"State[:\-]?\s*(.+)",
-        "Total Area Claimed": r"Total Area Claimed[:\-]?\s*([\d\.]+.*)",
-        "Coordinates": r"Coordinates[:\-]?\s*(.+)",
-        "Land Use": r"Land Use[:\-]?\s*(.+)",
-        "Claim ID": r"Claim ID[:\-]?\s*(.+)",
-        "Date of Application": r"Date of Application[:\-]?\s*(.+)",
-        "Water bodies": r"Water bodies[:\-]?\s*(.+)",
-        "Forest cover": r"Forest cover[:\-]?\s*(.+)",
-        "Homestead": r"Homestead[:\-]?\s*(.+)"
-    }
-    for field, pattern in patterns.items():
-        if not data.get(field) or data.get(field) == "":
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                data[field] = match.group(1).strip()
-    return data
-
 # -------------------------
 # Area Conversion
 # -------------------------
 def convert_area_to_acres(area_str: str) -> str:
     if not area_str:
         return ""
-    match = re.search(r"([\d\.]+)\s*([a-zA-Z ]+)?", area_str)
-    if not match:
+    acres = parse_area_acres(area_str)
+    if acres is None:
         return area_str
-    value = float(match.group(1))
-    unit = (match.group(2) or "acre").strip().lower()
-    for key, factor in UNIT_TO_ACRE.items():
-        if key in unit:
-            acres = value * factor
-            return f"{acres:.2f} acres"
-    return f"{value:.2f} acres"
+    return f"{acres:.2f} acres"
 
 # -------------------------
 # Coordinate Helpers
 # -------------------------
-def is_valid_coordinates(coords: str) -> bool:
-    if not coords:
-        return False
-    return bool(re.match(r"^-?\d+\.\d+,\s*-?\d+\.\d+$", coords))
-
 def fetch_coordinates_from_address(address: str) -> str:
-    if not address.strip():
-        return ""
-    url = "https://nominatim.openstreetmap.org/search"
-    params = {"q": address, "format": "json", "limit": 1}
-    headers = {"User-Agent": "FRA-System/1.0"}
-    try:
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        print("🔍 Geocoding request:", resp.url)
-        data = resp.json()
-        print("📍 Geocoding response:", data)
-        if data:
-            return f"{data[0]['lat']}, {data[0]['lon']}"
-    except Exception as e:
-        print("Geocoding error:", e)
-    return ""
+    return geocoder.geocode_address(address)
 
 # -------------------------
 # Main Cleaning
 # -------------------------
-def clean_with_llm(text: str) -> dict:
-    response = chain.invoke({"ocr_text": text})
-    data = safe_json_parse(response.content)
-    data = fallback_extract(data, text)
+# skip Gemini when the rule extractor validated every required field
+RULES_FIRST = os.getenv("RULES_FIRST", "true").lower() in ("1", "true", "yes")
+
+# which path extracted each uploaded document: rules | llm | fallback (LLM unavailable)
+EXTRACTION_PATH_COUNTS = {"rules": 0, "llm": 0, "fallback": 0}
+
+
+def _rules_first(text: str):
+    """(rules, confidence, done): done when the rule extractor alone is enough."""
+    rules, confidence = extract_fields(text)
+    return rules, confidence, RULES_FIRST and is_confident(confidence)
 
+
+def _finish(data: dict, source: str, confidence: dict, geocode: bool) -> dict:
+    EXTRACTION_PATH_COUNTS[source] += 1
     if "Total Area Claimed" in data and data["Total Area Claimed"]:
         data["Total Area Claimed"] = convert_area_to_acres(data["Total Area Claimed"])
+    data["_extraction"] = {"source": source, "confidence": confidence}
+    if geocode:
+        data = resolve_coordinates(data)
+    return data
 
-    # Try coordinates
-    coords = data.get("Coordinates", "").strip()
-    if not is_valid_coordinates(coords):
-        # Build full address
-        full_address = ", ".join(
-            filter(None, [
-                data.get("Address", ""),
-                data.get("Village Name", ""),
-                data.get("Block", ""),
-                data.get("District", ""),
-                data.get("State", ""),
-                "India"
-            ])
-        )
-        print("📌 Full Address for geocoding:", full_address)
-        new_coords = fetch_coordinates_from_address(full_address)
-
-        # If still empty, try District+State
-        if not new_coords and data.get("District") and data.get("State"):
-            alt_address = f"{data['District']}, {data['State']}, India"
-            new_coords = fetch_coordinates_from_address(alt_address)
-
-        # If still empty, try pincode inside Address
-        if not new_coords:
-            pincode_match = re.search(r"\b\d{6}\b", full_address)
-            if pincode_match:
-                new_coords = fetch_coordinates_from_address(pincode_match.group(0) + ", India")
-
-        if new_coords:
-            data["Coordinates"] = new_coords
 
-    return data
+def _from_llm(response, rules: dict, confidence: dict):
+    """(data, source) from an LLM response, or the validated rule values if the call failed."""
+    if isinstance(response, Exception):
+        print("⚠️ LLM extraction unavailable, using rule values:", response)
+        return fill_missing({}, rules, confidence), "fallback"
+    return fill_missing(safe_json_parse(response.content), rules, confidence), "llm"
+
+
+def clean_with_llm(text: str, geocode: bool = True) -> dict:
+    """
+    OCR text → claim JSON.  Clean printed forms are handled by the rule
+    extractor alone; otherwise Gemini extracts and the rule values fill
+    whatever it left empty.  If Gemini is slow or failing (deadline,
+    circuit open) the validated rule values are returned instead.
+    data["_extraction"] records the path taken and the per-field rule
+    confidence.
+    """
+    rules, confidence, done = _rules_first(text)
+    if done:
+        return _finish(dict(rules), "rules", confidence, geocode)
+    try:
+        response = extraction_client.invoke({"ocr_text": text})
+    except LLMUnavailable as e:
+        response = e
+    data, source = _from_llm(response, rules, confidence)
+    return _finish(data, source, confidence, geocode)
+
+
+async def aclean_with_llm(text: str, geocode: bool = False) -> dict:
+    """Async `clean_with_llm` (geocoding is left to the caller's pool)."""
+    rules, confidence, done = _rules_first(text)
+    if done:
+        return _finish(dict(rules), "rules", confidence, geocode)
+    try:
+        response = await extraction_client.ainvoke({"ocr_text": text})
+    except LLMUnavailable as e:
+        response = e
+    data, source = _from_llm(response, rules, confidence)
+    return _finish(data, source, confidence, geocode)
+
+
+async def aclean_many_with_llm(texts: list, geocode: bool = False) -> list:
+    """
+    Extract many OCR texts: rule-complete forms locally, the rest in one
+    batched LLM call.  Returns one dict per text, in order.
+    """
+    prepared = [_rules_first(text) for text in texts]
+    pending = [i for i, (_, _, done) in enumerate(prepared) if not done]
+    try:
+        responses = await extraction_client.abatch([{"ocr_text": texts[i]} for i in pending])
+    except LLMUnavailable as e:
+        responses = [e] * len(pending)
+    by_index = dict(zip(pending, responses))
+
+    results = []
+    for i, (rules, confidence, done) in enumerate(prepared):
+        if done:
+            data, source = dict(rules), "rules"
+        else:
+            data, source = _from_llm(by_index[i], rules, confidence)
+        results.append(_finish(data, source, confidence, geocode))
+    return results
+
+
+def llm_stats():
+    return {"extract": extraction_client.stats(), "dss": dss_client.stats()}
+
+
+def resolve_coordinates(data: dict) -> dict:
+    """Fill data["Coordinates"] via the shared geocoding service when missing or invalid."""
+    return geocoder.resolve_coordinates(data)
 
 # -------------------------
 # DSS Query Parsing
@@ -248,20 +229,74 @@ Answer:
 """
 
 
-dss_prompt = PromptTemplate.from_template(DSS_PROMPT)
-dss_chain: Runnable = dss_prompt | llm | StrOutputParser()
+# The Gemini client (and LangChain) is built on first use or WARMUP, not at import
+def _init_gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from langchain.prompts import PromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    llm = ChatGoogleGenerativeAI(**gemini_kwargs())
+    return {
+        "llm": llm,
+        "chain": PromptTemplate.from_template(SCHEMA_PROMPT) | llm,
+        "dss_chain": PromptTemplate.from_template(DSS_PROMPT) | llm | StrOutputParser(),
+    }
+
+
+gemini = subsystems.register("gemini", _init_gemini, "Gemini client and LangChain chains")
+dss_client = LLMClient("dss", load=lambda: gemini.get()["dss_chain"])
+
+# which path answered each DSS question: gazetteer | cache | llm | regex
+PARSE_PATH_COUNTS = {"gazetteer": 0, "cache": 0, "llm": 0, "regex": 0}
 
-def parse_dss_query(user_query: str) -> Dict[str, Any]:
+
+def parse_dss_query(user_query: str, use_cache: bool = True) -> Dict[str, Any]:
+    return parse_dss_query_with_source(user_query, use_cache=use_cache)[0]
+
+
+def parse_dss_query_with_source(user_query: str, use_cache: bool = True):
+    """
+    Parse a DSS question into {scheme, village, district, state} and report
+    which path answered it.  Unambiguous questions are resolved locally by
+    the gazetteer and successful LLM parses are cached; `use_cache=False`
+    skips both and forces a fresh LLM parse that refreshes the cached entry.
+    """
+    result = None
+    if use_cache:
+        source = "gazetteer"
+        try:
+            result = gazetteer.resolve(user_query)
+        except Exception as e:
+            print("⚠️ Gazetteer lookup failed:", e)
+
+        if result is None:
+            source = "cache"
+            result = dss_query_cache.get(user_query)
+    else:
+        dss_query_cache.note_bypass()
+
+    if result is None:
+        result, source = _parse_with_llm(user_query)
+
+    PARSE_PATH_COUNTS[source] += 1
+    return result, source
+
+
+def _parse_with_llm(user_query: str):
     result = {"scheme": None, "village": None, "district": None, "state": None}
 
     try:
-        llm_out = dss_chain.invoke(user_query)
+        llm_out = dss_client.invoke(user_query)
         parsed = json.loads(llm_out)
 
         for key in result.keys():
             if key in parsed:
                 result[key] = parsed[key]
 
+        # only cache real LLM answers, never the regex fallback
+        dss_query_cache.put(user_query, result)
+        return result, "llm"
+
     except Exception as e:
         print("⚠️ LLM parse failed, fallback:", e)
 
@@ -271,10 +306,10 @@ def parse_dss_query(user_query: str) -> Dict[str, Any]:
             result["village"] = m.group(1)
 
         # Match scheme from DB
-        schemes = fetch_schemes()
+        schemes = list_schemes()
         for s in schemes:
             if s["name"].lower() in user_query.lower():
                 result["scheme"] = s["name"]
                 break
 
-    return result
+    return result, "regex"
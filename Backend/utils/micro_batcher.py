@@ -0,0 +1,112 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+# -------------------------
+# Micro-batching scheduler
+#
+# Concurrent callers submit one input each; a single worker thread collects
+# them into a batch (up to `max_batch_size`, waiting at most `max_wait_ms`
+# after the first arrival), runs one forward pass and hands every caller
+# its own row of the output.  One pass over 32 images costs little more
+# than a pass over one, so throughput scales with concurrency instead of
+# paying the per-call overhead per request.
+# -------------------------
+
+
+class MicroBatcher:
+    def __init__(self, predict_batch, max_batch_size: int = 32, max_wait_ms: float = 5.0, name: str = "batcher"):
+        """`predict_batch(np.ndarray[N, ...]) -> sequence of N outputs`."""
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "batches": 0, "errors": 0, "busy_s": 0.0}
+        self._sizes = {}  # batch size -> count
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, x) -> Future:
+        """Queue one input (without a batch axis); the Future resolves to its output row."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((np.asarray(x), future))
+        return future
+
+    def predict(self, x, timeout: float = None):
+        return self.submit(x).result(timeout=timeout)
+
+    async def apredict(self, x):
+        return await asyncio.wrap_future(self.submit(x))
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_s
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let the loop see the stop marker next
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            live = [(x, f) for x, f in batch if f.set_running_or_notify_cancel()]  # drop cancelled
+            if not live:
+                continue
+            inputs, futures = zip(*live)
+            started = time.perf_counter()
+            try:
+                outputs = self.predict_batch(np.stack(inputs))
+            except Exception as e:
+                self._stats["errors"] += 1
+                for f in futures:
+                    f.set_exception(e)
+            else:
+                for f, out in zip(futures, outputs):
+                    f.set_result(out)
+            self._stats["busy_s"] += time.perf_counter() - started
+            self._stats["requests"] += len(futures)
+            self._stats["batches"] += 1
+            self._sizes[len(futures)] = self._sizes.get(len(futures), 0) + 1
+
+    def stop(self):
+        """Finish queued work, then stop the worker thread."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def stats(self):
+        batches = self._stats["batches"]
+        return {
+            **{k: round(v, 3) if isinstance(v, float) else v for k, v in self._stats.items()},
+            "mean_batch_size": round(self._stats["requests"] / batches, 2) if batches else None,
+            "batch_sizes": dict(sorted(self._sizes.items())),
+            "queued": self._queue.qsize(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_s * 1000,
+        }
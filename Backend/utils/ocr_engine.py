@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import shutil
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ---------------------------------------------------------------------------
+# OCR engines
+#
+# `tesserocr` drives libtesseract in-process: the language model is loaded
+# once per engine and stays resident, so a page costs only recognition time.
+# `pytesseract` is the fallback: it writes a temp file and spawns a fresh
+# `tesseract` process (reloading traineddata) for every call.
+#
+# Engines are cached per thread (libtesseract handles are not thread-safe),
+# which makes every worker of the OCR process pool a long-lived engine.
+# ---------------------------------------------------------------------------
+
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")  # auto | tesserocr | pytesseract
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 1)))
+# tesseract executable for the pytesseract engine; defaults to the one on PATH
+TESSERACT_CMD = os.getenv("TESSERACT_CMD") or shutil.which("tesseract") or "tesseract"
+# directory holding *.traineddata for the tesserocr engine (None = library default)
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX")
+
+
+class TesserocrEngine:
+    name = "tesserocr"
+
+    def __init__(self, lang=OCR_LANG):
+        from tesserocr import PyTessBaseAPI
+
+        kwargs = {"lang": lang}
+        if TESSDATA_PREFIX:
+            kwargs["path"] = TESSDATA_PREFIX
+        self._api = PyTessBaseAPI(**kwargs)
+
+    def recognize(self, image) -> str:
+        self._api.SetImage(image)
+        try:
+            return self._api.GetUTF8Text()
+        finally:
+            self._api.Clear()
+
+    def close(self):
+        self._api.End()
+
+
+class PytesseractEngine:
+    name = "pytesseract"
+
+    def __init__(self, lang=OCR_LANG):
+        import pytesseract
+
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+        self._lang = lang
+
+    def recognize(self, image) -> str:
+        return self._pytesseract.image_to_string(image, lang=self._lang)
+
+    def close(self):
+        pass
+
+
+ENGINES = {"tesserocr": TesserocrEngine, "pytesseract": PytesseractEngine}
+
+
+def create_engine(name: str = OCR_ENGINE, lang: str = OCR_LANG):
+    if name != "auto":
+        return ENGINES[name](lang)
+    try:
+        return TesserocrEngine(lang)
+    except (ImportError, RuntimeError) as e:
+        # not installed, or missing / unreadable tessdata
+        if not isinstance(e, ImportError):
+            print("⚠️ tesserocr unavailable, falling back to pytesseract:", e)
+        return PytesseractEngine(lang)
+
+
+_local = threading.local()
+
+
+def get_engine():
+    """This thread's resident engine, created on first use."""
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        engine = _local.engine = create_engine()
+    return engine
+
+
+def _init_worker():
+    # load the language model before the first job arrives
+    get_engine()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Process pool of OCR_WORKERS long-lived engines."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process already runs background threads
+            _pool = ProcessPoolExecutor(
+                max_workers=OCR_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def shutdown_ocr_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def engine_info():
+    return {
+        "engine": OCR_ENGINE,
+        "lang": OCR_LANG,
+        "workers": OCR_WORKERS,
+        "pool_started": _pool is not None,
+        "tesseract_cmd": TESSERACT_CMD,
+    }
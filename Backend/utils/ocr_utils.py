@@ -1,25 +1,162 @@
 from PIL import Image
-import pytesseract
+import asyncio
 import io
+import os
 
-# ✅ Explicitly tell pytesseract where Tesseract is installed (Windows fix)
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+import numpy as np
+
+from utils.ocr_engine import get_engine
+
+# -------------------------
+# Page handling
+#
+# Multi-page PDFs (rendered with pypdfium2) and multi-frame TIFFs are split
+# into pages; each page is normalized to OCR_TARGET_DPI, converted to
+# grayscale and binarized before recognition, since Tesseract's runtime
+# grows with pixel count.  `ocr_document` OCRs pages in parallel on the OCR
+# pool and reassembles the text in page order.
+# -------------------------
+
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "4000"))  # px cap on the longest side after scaling
+UNTRUSTED_DPI = {72, 96}
+OCR_BINARIZE = os.getenv("OCR_BINARIZE", "true").lower() in ("1", "true", "yes")
+PAGE_SEPARATOR = "\n\n"
+
+
+def _read(source) -> bytes:
+    """`source` is the upload's bytes or a path to it on disk."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, "rb") as fh:
+        return fh.read()
+
+
+def is_pdf(data: bytes) -> bool:
+    return data[:5] == b"%PDF-"
+
+
+def count_pages(source) -> int:
+    data = _read(source)
+    if is_pdf(data):
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    with Image.open(io.BytesIO(data)) as img:
+        return getattr(img, "n_frames", 1)
+
+
+def iter_pages(data: bytes, indices=None):
+    """
+    Yield (index, PIL image) for `indices` (default: every page), opening
+    the document once.  PDFs are rasterized at OCR_TARGET_DPI.
+    """
+    if is_pdf(data):
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(data)
+        try:
+            for index in range(len(pdf)) if indices is None else indices:
+                bitmap = pdf[index].render(scale=OCR_TARGET_DPI / 72, grayscale=True)
+                yield index, bitmap.to_pil()
+        finally:
+            pdf.close()
+        return
+    with Image.open(io.BytesIO(data)) as img:
+        for index in range(getattr(img, "n_frames", 1)) if indices is None else indices:
+            if index:
+                img.seek(index)
+            page = img.copy()
+            page.info.update(img.info)
+            yield index, page
+
+
+def load_page(data: bytes, index: int) -> Image.Image:
+    """Page `index` as a PIL image, rasterized at OCR_TARGET_DPI for PDFs."""
+    for _, page in iter_pages(data, [index]):
+        return page
+
+
+def _otsu_threshold(gray: np.ndarray) -> int:
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    total = hist.sum()
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+
+def normalize_page(img: Image.Image) -> Image.Image:
+    """Rescale to OCR_TARGET_DPI (capped at OCR_MAX_SIDE), grayscale and (optionally) Otsu-binarize."""
+    dpi = img.info.get("dpi")
+    scale = 1.0
+    # 72/96 dpi are editor and camera defaults, not a scan resolution: treat as unknown
+    if dpi and dpi[0] and round(float(dpi[0])) not in UNTRUSTED_DPI:
+        scale = min(2.0, max(0.25, OCR_TARGET_DPI / float(dpi[0])))
+    if max(img.size) * scale > OCR_MAX_SIDE:
+        scale = OCR_MAX_SIDE / max(img.size)
+
+    img = img.convert("L")
+    if abs(scale - 1.0) > 0.05:
+        img = img.resize(
+            (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+            Image.LANCZOS if scale < 1 else Image.BICUBIC,
+        )
+    if OCR_BINARIZE:
+        gray = np.asarray(img)
+        img = Image.fromarray(np.where(gray > _otsu_threshold(gray), 255, 0).astype(np.uint8))
+    return img
+
+
+def ocr_page(source, index: int) -> str:
+    """Load, normalize and OCR one page.  Runs inside an OCR pool worker."""
+    page = normalize_page(load_page(_read(source), index))
+    return get_engine().recognize(page).strip()
 
 
 def extract_text_from_file(file_bytes: bytes) -> str:
     """
-    Extract text from an uploaded image file (bytes) using Tesseract OCR.
-    Supports PNG, JPG, JPEG, etc.
+    Extract text from an uploaded scan (bytes) using Tesseract OCR.
+    Supports PNG, JPG, JPEG, multi-page TIFF and PDF.  Pages are processed
+    one after another in this thread; see `ocr_document` for the parallel
+    version.
     """
     try:
-        # Open the uploaded file as an image
-        image = Image.open(io.BytesIO(file_bytes))
+        engine = get_engine()
+        texts = [engine.recognize(normalize_page(page)).strip() for _, page in iter_pages(_read(file_bytes))]
+        return PAGE_SEPARATOR.join(t for t in texts if t).strip()
+
+    except Exception as e:
+        # Return clean error message if OCR fails
+        raise RuntimeError(f"OCR extraction failed: {str(e)}")
+
 
-        # Perform OCR with English language
-        text = pytesseract.image_to_string(image, lang="eng")
+def extract_text_from_path(path: str) -> str:
+    """Same as extract_text_from_file, reading the upload from disk (process-pool friendly)."""
+    return extract_text_from_file(_read(path))
 
-        return text.strip()
 
+async def ocr_document(source, executor) -> str:
+    """
+    OCR every page of a scan in parallel on `executor` (the OCR process
+    pool) and join the text in page order.  Pass a file path when the
+    upload is on disk so workers read it themselves instead of receiving
+    a pickled copy per page.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        pages = await loop.run_in_executor(None, count_pages, source)
+        texts = await asyncio.gather(
+            *(loop.run_in_executor(executor, ocr_page, source, i) for i in range(pages))
+        )
     except Exception as e:
-        # Return clean error message if OCR fails
         raise RuntimeError(f"OCR extraction failed: {str(e)}")
+    return PAGE_SEPARATOR.join(t for t in texts if t).strip()
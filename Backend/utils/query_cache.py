@@ -0,0 +1,147 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from db import get_db_connection
+
+# ---------------------------------------------------------------------------
+# Two-tier cache for parsed DSS questions ({scheme, village, district, state})
+#
+#   L1: per-process LRU (DSS_CACHE_SIZE entries)
+#   L2: Postgres table dss_query_cache (migration 006), shared by workers
+#
+# Keys are the normalized question text; entries expire after DSS_CACHE_TTL.
+# ---------------------------------------------------------------------------
+
+DSS_CACHE_SIZE = int(os.getenv("DSS_CACHE_SIZE", "2048"))
+DSS_CACHE_TTL = float(os.getenv("DSS_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+PRUNE_EVERY = 500  # L2 puts between expired-row cleanups
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WS_RE.sub(" ", (text or "").casefold()).strip().rstrip("?.!").strip()
+
+
+class QueryParseCache:
+    def __init__(self, maxsize=DSS_CACHE_SIZE, ttl=DSS_CACHE_TTL, persistent=True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.persistent = persistent
+        self._lru = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+
+    # ---- L1 ----
+    def _l1_get(self, key):
+        with self._lock:
+            item = self._lru.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return value
+
+    def _l1_put(self, key, value, ttl=None):
+        with self._lock:
+            self._lru[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # ---- L2 ----
+    def _l2_get(self, key):
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT parsed, EXTRACT(EPOCH FROM (now() - created_at))
+                    FROM dss_query_cache
+                    WHERE query_key = %s AND created_at > now() - make_interval(secs => %s)
+                    """,
+                    (key, self.ttl),
+                )
+                row = cur.fetchone()
+        if row is None:
+            return None, None
+        return row[0], self.ttl - float(row[1])
+
+    def _l2_put(self, key, value):
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO dss_query_cache (query_key, parsed) VALUES (%s, %s)
+                    ON CONFLICT (query_key) DO UPDATE
+                        SET parsed = EXCLUDED.parsed, created_at = now()
+                    """,
+                    (key, json.dumps(value)),
+                )
+                self._puts += 1
+                if self._puts % PRUNE_EVERY == 0:
+                    cur.execute(
+                        "DELETE FROM dss_query_cache WHERE created_at < now() - make_interval(secs => %s)",
+                        (self.ttl,),
+                    )
+
+    # ---- public ----
+    def get(self, query: str):
+        """Cached parse for `query`, or None.  Returns a fresh dict."""
+        key = normalize_query(query)
+        value = self._l1_get(key)
+        if value is not None:
+            self._stats["l1_hits"] += 1
+            return dict(value)
+        if self.persistent:
+            try:
+                value, remaining = self._l2_get(key)
+            except Exception as e:
+                self._stats["errors"] += 1
+                print("⚠️ DSS cache read failed:", e)
+                value = None
+            if value is not None:
+                self._stats["l2_hits"] += 1
+                self._l1_put(key, value, ttl=remaining)
+                return dict(value)
+        self._stats["misses"] += 1
+        return None
+
+    def put(self, query: str, value: dict):
+        key = normalize_query(query)
+        self._l1_put(key, dict(value))
+        if self.persistent:
+            try:
+                self._l2_put(key, value)
+            except Exception as e:
+                self._stats["errors"] += 1
+                print("⚠️ DSS cache write failed:", e)
+
+    def note_bypass(self):
+        self._stats["bypassed"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self):
+        lookups = self._stats["l1_hits"] + self._stats["l2_hits"] + self._stats["misses"]
+        hits = self._stats["l1_hits"] + self._stats["l2_hits"]
+        return {
+            **self._stats,
+            "size": len(self._lru),
+            "maxsize": self.maxsize,
+            "ttl_s": self.ttl,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+
+dss_query_cache = QueryParseCache()
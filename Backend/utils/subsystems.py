@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+# -------------------------
+# Lazily initialized subsystems
+#
+# Heavy dependencies (TensorFlow + the classifier, Earth Engine, the Gemini
+# client) are registered here with a loader instead of being set up at
+# import time.  The first `get()` loads them once (thread-safe), so a worker
+# that only serves /search never pays for them.  WARMUP lists the ones to
+# load eagerly in the background at startup ("all" for every subsystem);
+# /health/ready waits for those.
+# -------------------------
+
+WARMUP = os.getenv("WARMUP", "")
+SUBSYSTEM_RETRY_S = float(os.getenv("SUBSYSTEM_RETRY_S", "30"))  # min gap between retries of a failed load
+
+NOT_LOADED, LOADING, READY, FAILED = "not_loaded", "loading", "ready", "failed"
+
+
+class SubsystemUnavailable(RuntimeError):
+    """The subsystem failed to initialize."""
+
+
+class Subsystem:
+    def __init__(self, name: str, loader, description: str = ""):
+        self.name = name
+        self.description = description
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value = None
+        self.state = NOT_LOADED
+        self.error = None
+        self.load_ms = None
+        self.loaded_at = None
+        self._failed_at = 0.0
+
+    def get(self):
+        """The loaded value, initializing on first use; raises SubsystemUnavailable on failure."""
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            recently_failed = self.state == FAILED and time.monotonic() - self._failed_at < SUBSYSTEM_RETRY_S
+            if self.state != READY and not recently_failed:
+                self._load()
+        if self.state == FAILED:
+            raise SubsystemUnavailable(f"{self.name}: {self.error}")
+        return self._value
+
+    def _load(self):
+        self.state = LOADING
+        started = time.perf_counter()
+        try:
+            self._value = self._loader()
+        except Exception as e:
+            self.state, self.error = FAILED, str(e)
+            self._failed_at = time.monotonic()
+            print(f"⚠️ {self.name} failed to initialize:", e)
+        else:
+            self.state, self.error = READY, None
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    def reset(self):
+        """Forget a failed (or loaded) value so the next get() retries."""
+        with self._lock:
+            self._value, self.state, self.error = None, NOT_LOADED, None
+
+    def info(self):
+        return {
+            "state": self.state,
+            "error": self.error,
+            "load_ms": self.load_ms,
+            "loaded_at": self.loaded_at,
+            "description": self.description,
+        }
+
+
+_registry = {}
+
+
+def register(name: str, loader, description: str = "") -> Subsystem:
+    subsystem = _registry.get(name)
+    if subsystem is None:
+        subsystem = _registry[name] = Subsystem(name, loader, description)
+    return subsystem
+
+
+def get(name: str):
+    return _registry[name].get()
+
+
+def warmup_names() -> list:
+    names = [n.strip() for n in WARMUP.split(",") if n.strip()]
+    if "all" in names:
+        return list(_registry)
+    return [n for n in names if n in _registry]
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Load the WARMUP subsystems on a background thread (startup must not
+    block), retrying failed ones every SUBSYSTEM_RETRY_S until all are ready.
+    """
+    names = warmup_names()
+    unknown = [n.strip() for n in WARMUP.split(",") if n.strip() and n.strip() not in _registry and n.strip() != "all"]
+    if unknown:
+        print("⚠️ Unknown WARMUP subsystems ignored:", ", ".join(unknown))
+
+    def _run():
+        pending = list(names)
+        while pending:
+            for name in pending:
+                try:
+                    _registry[name].get()
+                except SubsystemUnavailable:
+                    pass
+            # keep retrying failed loads: nothing else calls get() while
+            # /health/ready keeps the worker out of the load balancer
+            pending = [n for n in pending if _registry[n].state != READY]
+            if pending:
+                time.sleep(SUBSYSTEM_RETRY_S)
+
+    thread = threading.Thread(target=_run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def states() -> dict:
+    return {name: s.info() for name, s in _registry.items()}
+
+
+def ready() -> bool:
+    """Every WARMUP subsystem has loaded."""
+    return all(_registry[name].state == READY for name in warmup_names())
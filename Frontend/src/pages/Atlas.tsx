@@ -106,13 +106,21 @@ const Atlas = () => {
   useEffect(() => {
     const loadAll = async () => {
       try {
-        const res = await fetch(
-          `${BACKEND_URL.replace(/\/search$/, "")}/upload/all`
-        );
-        if (!res.ok) throw new Error(`HTTP error ${res.status}`);
-        const data = await res.json();
+        // /upload/all is keyset-paginated: follow next_cursor until exhausted
+        const baseUrl = `${BACKEND_URL.replace(/\/search$/, "")}/upload/all`;
+        const results: Claim[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ limit: "1000" });
+          if (cursor) params.append("after", cursor);
+          const res = await fetch(`${baseUrl}?${params.toString()}`);
+          if (!res.ok) throw new Error(`HTTP error ${res.status}`);
+          const data = await res.json();
+
+          results.push(...(Array.isArray(data) ? data : (data.results || [])));
+          cursor = data.next_cursor || null;
+        } while (cursor);
 
-        const results = Array.isArray(data) ? data : (data.results || []);
         setClaims(results);
         setFilteredClaims(results);
       } catch (err) {
@@ -143,8 +143,33 @@ const Upload = () => {
 
       if (!res.ok) throw new Error("Upload failed");
 
-      const raw = await res.json();
-      const normalized = normalizeKeys(raw.data);
+      const submitted = await res.json();
+      if (submitted.status === "duplicate") {
+        // Same document already stored — the backend returns the existing row
+        setFiles(prev => prev.map(f => 
+          f.id === file.id 
+            ? { ...f, status: 'completed', progress: 100, extractedData: { ...submitted.data, age: Number(submitted.data?.age || 0) } }
+            : f
+        ));
+        toast({
+          title: "Already uploaded",
+          description: `${file.name} matches document #${submitted.doc_id}.`,
+        });
+        return;
+      }
+
+      // The backend queues the pipeline (202) — poll the job until it finishes
+      const { job_id } = submitted;
+      let job;
+      do {
+        await new Promise((resolve) => setTimeout(resolve, 1500));
+        const jobRes = await fetch(`${BACKEND_URL}/upload/jobs/${job_id}`);
+        if (!jobRes.ok) throw new Error("Job status unavailable");
+        job = await jobRes.json();
+      } while (job.status === "queued" || job.status === "running");
+
+      if (job.status !== "succeeded") throw new Error(job.error || "Processing failed");
+      const normalized = normalizeKeys(job.result);
 
       setFiles(prev => prev.map(f => 
         f.id === file.id 